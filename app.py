@@ -2,6 +2,8 @@ import streamlit as st
 import os
 import pandas as pd
 from backend.database.db_handler import db_handler
+from backend.processors import start_prewarm
+from backend.processors.instrumentation import start_metrics_server
 
 # Set page configuration
 st.set_page_config(
@@ -11,6 +13,12 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Prometheus endpoint, if LEGALEASE_METRICS_PORT is set
+start_metrics_server()
+
+# Load models in the background, if LEGALEASE_PREWARM=1
+start_prewarm()
+
 # Ensure data directories exist
 os.makedirs("data/documents", exist_ok=True)
 os.makedirs("data/analyses", exist_ok=True)
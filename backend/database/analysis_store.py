@@ -0,0 +1,426 @@
+import os
+import json
+import uuid
+import shutil
+import tempfile
+from collections.abc import Mapping
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator, IO
+
+from backend.database.locking import atomic_open
+from backend.database.cache import ByteLRUCache
+
+# Version of the on-disk analysis layout
+ANALYSIS_FORMAT = 2
+
+# Entity fields stored as columns; anything else goes into the sparse "extra" map
+ENTITY_COLUMNS = ("text", "label", "start_char", "end_char")
+
+# Clause fields stored as columns; clause text is resolved from the document content
+CLAUSE_COLUMNS = ("title", "type", "confidence", "importance", "start_char", "end_char")
+
+# Fields of each chunk summary; offsets locate the chunk in the document so it can be reused
+SUMMARY_CHUNK_COLUMNS = ("start", "end", "summary")
+
+# Write compact JSON; these files are read by code, not people
+COMPACT = {"separators": (",", ":")}
+
+# Bytes of each entity column kept in memory by write_entities before it spools to disk
+SPOOL_BYTES = 1024 * 1024
+
+
+def encode_entities(entities: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert a list of entity dicts into parallel columns.
+
+    Labels and entity texts are dictionary-encoded (each distinct value is
+    stored once and rows refer to it by index), offsets are plain integer
+    columns, and rare per-entity fields such as definitions or citation
+    parts are kept in a sparse row -> fields map.
+    """
+    labels: Dict[str, int] = {}
+    texts: Dict[str, int] = {}
+    columns = {"label": [], "text": [], "start_char": [], "end_char": []}
+    extra = {}
+
+    for row, entity in enumerate(entities):
+        columns["label"].append(labels.setdefault(entity["label"], len(labels)))
+        columns["text"].append(texts.setdefault(entity["text"], len(texts)))
+        columns["start_char"].append(entity["start_char"])
+        columns["end_char"].append(entity["end_char"])
+
+        fields = {key: value for key, value in entity.items() if key not in ENTITY_COLUMNS}
+        if fields:
+            extra[str(row)] = fields
+
+    return {
+        "count": len(entities),
+        "labels": list(labels),
+        "texts": list(texts),
+        "columns": columns,
+        "extra": extra,
+    }
+
+
+def write_entities(f: IO[str], entities: Iterable[Dict[str, Any]], spool_dir: Optional[str] = None) -> int:
+    """
+    Write entities as JSON in the layout of encode_entities, reading them only once
+
+    Column values are spooled to temporary files as the entities are read
+    (on disk in spool_dir once a column outgrows SPOOL_BYTES) and then
+    copied into place, so only the label and text dictionaries are held in
+    memory. This lets an analysis whose entities were spilled to disk be
+    saved without loading them.
+
+    Returns:
+        Number of entities written
+    """
+    labels: Dict[str, int] = {}
+    texts: Dict[str, int] = {}
+    names = ("label", "text", "start_char", "end_char", "extra")
+    spools = {name: tempfile.SpooledTemporaryFile(SPOOL_BYTES, mode="w+", encoding="utf-8", dir=spool_dir)
+              for name in names}
+    try:
+        count = 0
+        extra_count = 0
+        for row, entity in enumerate(entities):
+            separator = "," if row else ""
+            spools["label"].write(f"{separator}{labels.setdefault(entity['label'], len(labels))}")
+            spools["text"].write(f"{separator}{texts.setdefault(entity['text'], len(texts))}")
+            spools["start_char"].write(separator + json.dumps(entity["start_char"]))
+            spools["end_char"].write(separator + json.dumps(entity["end_char"]))
+
+            fields = {key: value for key, value in entity.items() if key not in ENTITY_COLUMNS}
+            if fields:
+                spools["extra"].write(f'{"," if extra_count else ""}"{row}":{json.dumps(fields, **COMPACT)}')
+                extra_count += 1
+            count = row + 1
+
+        f.write(f'{{"count":{count},"labels":{json.dumps(list(labels), **COMPACT)},'
+                f'"texts":{json.dumps(list(texts), **COMPACT)},"columns":{{')
+        for i, name in enumerate(names[:-1]):
+            f.write(f'{"," if i else ""}"{name}":[')
+            spools[name].seek(0)
+            shutil.copyfileobj(spools[name], f)
+            f.write("]")
+        f.write('},"extra":{')
+        spools["extra"].seek(0)
+        shutil.copyfileobj(spools["extra"], f)
+        f.write("}}")
+        return count
+    finally:
+        for spool in spools.values():
+            spool.close()
+
+
+def decode_entities(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Rebuild entity dicts from columnar data"""
+    labels = data["labels"]
+    texts = data["texts"]
+    columns = data["columns"]
+
+    entities = [
+        {"text": texts[text], "label": labels[label], "start_char": start, "end_char": end}
+        for text, label, start, end in zip(columns["text"], columns["label"],
+                                           columns["start_char"], columns["end_char"])
+    ]
+    for row, fields in data["extra"].items():
+        entities[int(row)].update(fields)
+    return entities
+
+
+def encode_clauses(clauses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert a list of clause dicts into parallel columns.
+
+    Clause text is not stored: it is the document content between
+    start_char and end_char. Clauses whose offsets are unknown keep their
+    text in the sparse "extra" map.
+    """
+    columns = {name: [] for name in CLAUSE_COLUMNS}
+    extra = {}
+
+    for row, clause in enumerate(clauses):
+        for name in CLAUSE_COLUMNS:
+            columns[name].append(clause.get(name))
+
+        fields = {key: value for key, value in clause.items() if key not in CLAUSE_COLUMNS}
+        if clause.get("start_char", -1) >= 0:
+            fields.pop("text", None)
+        if fields:
+            extra[str(row)] = fields
+
+    return {"count": len(clauses), "columns": columns, "extra": extra}
+
+
+def decode_clauses(data: Dict[str, Any], read_span: Callable[[int, int], str]) -> List[Dict[str, Any]]:
+    """Rebuild clause dicts from columnar data, reading clause text from the document"""
+    columns = data["columns"]
+    extra = data["extra"]
+
+    clauses = []
+    for row in range(data["count"]):
+        clause = {name: columns[name][row] for name in CLAUSE_COLUMNS}
+        clause.update(extra.get(str(row), {}))
+        if "text" not in clause:
+            clause["text"] = read_span(clause["start_char"], clause["end_char"])
+        clauses.append(clause)
+    return clauses
+
+
+def encode_summary_chunks(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convert chunk summaries with their source offsets into parallel columns"""
+    return {
+        "count": len(chunks),
+        "columns": {name: [chunk[name] for chunk in chunks] for name in SUMMARY_CHUNK_COLUMNS},
+    }
+
+
+def decode_summary_chunks(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Rebuild chunk summary dicts from columnar data"""
+    columns = data["columns"]
+    return [dict(zip(SUMMARY_CHUNK_COLUMNS, row)) for row in zip(*(columns[name] for name in SUMMARY_CHUNK_COLUMNS))]
+
+
+class LazyAnalysis(Mapping):
+    """
+    Read-only view of a stored analysis that loads large sections on first access.
+
+    Small fields (summary, document type, timestamp) are loaded up front;
+    sections such as entities and key clauses are read and decoded only
+    when a caller indexes them.
+    """
+
+    def __init__(self, meta: Dict[str, Any], load_section: Callable[[str], Any]):
+        self._meta = {key: value for key, value in meta.items() if key not in ("format", "generation", "sections")}
+        self._section_names = list(meta.get("sections", []))
+        self._load_section = load_section
+        self._sections: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._meta:
+            return self._meta[key]
+        if key in self._section_names:
+            if key not in self._sections:
+                self._sections[key] = self._load_section(key)
+            return self._sections[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._meta
+        yield from self._section_names
+
+    def __len__(self) -> int:
+        return len(self._meta) + len(self._section_names)
+
+    def loaded_sections(self) -> List[str]:
+        """Names of sections that have been loaded so far"""
+        return list(self._sections)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Load every section and return a plain dictionary"""
+        return {key: self[key] for key in self}
+
+
+class AnalysisStore:
+    """
+    Stores each analysis as a directory of independently loadable sections:
+
+        <doc_id>/meta.json                    summary, document type, timestamp, ...
+        <doc_id>/entities.<generation>.json   entities as columns
+        <doc_id>/key_clauses.<generation>.json clauses as columns (offsets only, no text)
+        <doc_id>/summary_chunks.<generation>.json per-chunk summaries with their offsets
+
+    Every save writes its sections under a new generation and then
+    atomically replaces meta.json, which names the generation to read. A
+    reader therefore always sees one complete analysis. The previous
+    generation is kept so readers that loaded the old meta can still load
+    its sections.
+
+    Analyses written by older versions as a single <doc_id>.json are still
+    readable.
+    """
+
+    SECTION_CODECS = {
+        "entities": (encode_entities, decode_entities),
+        "key_clauses": (encode_clauses, decode_clauses),
+        "summary_chunks": (encode_summary_chunks, decode_summary_chunks),
+    }
+
+    def __init__(self, directory: str, cache: Optional[ByteLRUCache] = None):
+        self.directory = directory
+        self.cache = cache
+        os.makedirs(directory, exist_ok=True)
+
+    def _legacy_path(self, document_id: str) -> str:
+        return os.path.join(self.directory, f"{document_id}.json")
+
+    def _meta_path(self, document_id: str) -> str:
+        return os.path.join(self.directory, document_id, "meta.json")
+
+    def _section_path(self, document_id: str, section: str, generation: Optional[str]) -> str:
+        filename = f"{section}.{generation}.json" if generation else f"{section}.json"
+        return os.path.join(self.directory, document_id, filename)
+
+    def exists(self, document_id: str) -> bool:
+        """Check whether an analysis is stored for a document"""
+        return os.path.exists(self._meta_path(document_id)) or os.path.exists(self._legacy_path(document_id))
+
+    def save(self, document_id: str, analysis: Dict[str, Any]) -> None:
+        """Write an analysis, replacing any previous version"""
+        os.makedirs(os.path.join(self.directory, document_id), exist_ok=True)
+
+        previous = self._read_json(self._meta_path(document_id)) if os.path.exists(self._meta_path(document_id)) else {}
+        generation = uuid.uuid4().hex[:12]
+
+        meta = {"format": ANALYSIS_FORMAT, "generation": generation, "sections": []}
+        for key, value in analysis.items():
+            if key == "entities":
+                # Streamed, since entities of a very large document may be spilled to disk
+                path = self._section_path(document_id, key, generation)
+                with atomic_open(path, 'w') as f:
+                    write_entities(f, value, spool_dir=os.path.dirname(path))
+                meta["sections"].append(key)
+            elif key in self.SECTION_CODECS:
+                encode, _ = self.SECTION_CODECS[key]
+                self._write_json(self._section_path(document_id, key, generation), encode(value))
+                meta["sections"].append(key)
+            else:
+                meta[key] = value
+
+        # Switching meta.json publishes the new generation in one step
+        self._write_json(self._meta_path(document_id), meta)
+
+        # Remove generations older than the one just replaced
+        keep = {generation, previous.get("generation")}
+        for filename in os.listdir(os.path.join(self.directory, document_id)):
+            parts = filename.split(".")
+            if len(parts) == 3 and parts[0] in self.SECTION_CODECS and parts[1] not in keep:
+                os.remove(os.path.join(self.directory, document_id, filename))
+
+        legacy_path = self._legacy_path(document_id)
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
+
+        # The finished analysis supersedes any partial summary
+        self.delete_partial_summary(document_id)
+
+        if self.cache is not None:
+            self.cache.invalidate_document(document_id, kinds=("analysis",))
+
+    def load(self, document_id: str, read_span: Callable[[int, int], str]) -> Optional[Mapping]:
+        """
+        Load an analysis lazily
+
+        Args:
+            document_id: Document ID
+            read_span: Callable (start, end) -> document text, used for clause text
+
+        Returns:
+            A LazyAnalysis (or a plain dict for legacy files), or None if missing
+        """
+        meta_path = self._meta_path(document_id)
+        if os.path.exists(meta_path):
+            try:
+                meta = self._load(("analysis", document_id, "meta"), meta_path, lambda: self._read_json(meta_path))
+            except FileNotFoundError:
+                return None
+            generation = meta.get("generation")
+            return LazyAnalysis(meta, lambda section: self.load_section(document_id, section, read_span, generation))
+
+        legacy_path = self._legacy_path(document_id)
+        if os.path.exists(legacy_path):
+            return self._read_json(legacy_path)
+
+        return None
+
+    def load_section(self, document_id: str, section: str,
+                     read_span: Callable[[int, int], str], generation: Optional[str] = None) -> Any:
+        """Load and decode a single section of an analysis"""
+        path = self._section_path(document_id, section, generation)
+        _, decode = self.SECTION_CODECS[section]
+        if section == "key_clauses":
+            return self._load(("analysis", document_id, section, generation), path,
+                              lambda: decode(self._read_json(path), read_span))
+        return self._load(("analysis", document_id, section, generation), path,
+                          lambda: decode(self._read_json(path)))
+
+    def modified_time(self, document_id: str) -> Optional[float]:
+        """When the stored analysis was last written (seconds since the epoch), or None if there is none"""
+        for path in (self._meta_path(document_id), self._legacy_path(document_id)):
+            try:
+                return os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+        return None
+
+    def load_encoded(self, document_id: str, sections: Iterable[str] = tuple(SECTION_CODECS)) -> Optional[Dict[str, Any]]:
+        """
+        Read an analysis with its sections left in their columnar form
+
+        For bulk readers: nothing is decoded into rows, clause text is not
+        read and the cache is bypassed. Analyses in the legacy single-file
+        format are encoded on the fly.
+
+        Args:
+            document_id: Document ID
+            sections: Sections to read (default: all)
+
+        Returns:
+            The analysis fields, with each requested section as produced by
+            its encoder (e.g. encode_entities), or None if there is none
+        """
+        try:
+            meta = self._read_json(self._meta_path(document_id))
+        except FileNotFoundError:
+            try:
+                legacy = self._read_json(self._legacy_path(document_id))
+            except FileNotFoundError:
+                return None
+            analysis = {key: value for key, value in legacy.items() if key not in self.SECTION_CODECS}
+            for section in sections:
+                if section in legacy:
+                    encode, _ = self.SECTION_CODECS[section]
+                    analysis[section] = encode(legacy[section])
+            return analysis
+
+        analysis = {key: value for key, value in meta.items() if key not in ("format", "generation", "sections")}
+        for section in sections:
+            if section in meta.get("sections", []):
+                analysis[section] = self._read_json(self._section_path(document_id, section, meta.get("generation")))
+        return analysis
+
+    def _partial_summary_path(self, document_id: str) -> str:
+        return os.path.join(self.directory, document_id, "partial_summary.json")
+
+    def save_partial_summary(self, document_id: str, chunks: Dict[str, str]) -> None:
+        """Store the chunk summaries produced so far, keyed by chunk fingerprint"""
+        os.makedirs(os.path.join(self.directory, document_id), exist_ok=True)
+        self._write_json(self._partial_summary_path(document_id), chunks)
+
+    def load_partial_summary(self, document_id: str) -> Dict[str, str]:
+        """Chunk summaries saved by an interrupted run, or an empty dict"""
+        try:
+            return self._read_json(self._partial_summary_path(document_id))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def delete_partial_summary(self, document_id: str) -> None:
+        path = self._partial_summary_path(document_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _load(self, key: tuple, path: str, load: Callable[[], Any]) -> Any:
+        """Load through the cache when one is configured"""
+        if self.cache is None:
+            return load()
+        return self.cache.get_file(key, path, load)
+
+    @staticmethod
+    def _write_json(path: str, data: Any) -> None:
+        with atomic_open(path, 'w') as f:
+            json.dump(data, f, **COMPACT)
+
+    @staticmethod
+    def _read_json(path: str) -> Any:
+        with open(path, 'r') as f:
+            return json.load(f)
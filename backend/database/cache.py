@@ -0,0 +1,133 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Lists longer than this are sized from a sample of their items
+SIZE_SAMPLE = 100
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a value in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        items = list(value) if isinstance(value, set) else value
+        if len(items) > SIZE_SAMPLE:
+            sample = items[:SIZE_SAMPLE]
+            size += sum(estimate_size(item) for item in sample) * len(items) // SIZE_SAMPLE
+        else:
+            size += sum(estimate_size(item) for item in items)
+    return size
+
+
+def file_stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    """Identity of a file's current version, or None if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class ByteLRUCache:
+    """
+    Thread-safe LRU cache bounded by the total estimated size of its values.
+
+    Keys are tuples whose second element is the document ID, so all entries
+    for a document can be invalidated together. Values must be treated as
+    read-only by callers, since the same object is handed to every reader.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, stamp: Any = None) -> Optional[Any]:
+        """Return a cached value, or None on a miss or if its stamp doesn't match"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None, stamp: Any = None) -> None:
+        """Store a value, evicting least recently used entries to stay within max_bytes"""
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, stamp)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_file(self, key: Hashable, path: str, load: Callable[[], Any]) -> Any:
+        """
+        Return the cached value derived from a file, reloading it if the file changed
+
+        A changed file (e.g. rewritten by another worker process) is detected
+        from its inode, mtime and size, so only a stat is needed on a hit.
+        """
+        stamp = file_stamp(path)
+        if stamp is None:
+            self.invalidate(key)
+            raise FileNotFoundError(path)
+
+        value = self.get(key, stamp)
+        if value is None:
+            value = load()
+            self.put(key, value, stamp=stamp)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_document(self, document_id: str, kinds: Optional[Tuple[str, ...]] = None) -> None:
+        """Drop every entry for a document, optionally only those of the given kinds"""
+        with self._lock:
+            for key in [key for key in self._entries
+                        if isinstance(key, tuple) and len(key) > 1 and key[1] == document_id
+                        and (kinds is None or key[0] in kinds)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters plus current usage"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
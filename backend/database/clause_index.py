@@ -0,0 +1,216 @@
+import os
+import sqlite3
+from contextlib import closing
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from backend.database.locking import FileLock
+
+# Dimensionality of en_core_web_lg word vectors
+DEFAULT_DIMENSIONS = 300
+
+# Random hyperplanes per LSH code; one uint64 per stored clause
+CODE_BITS = 64
+HYPERPLANE_SEED = 7
+
+# Below this many stored clauses, queries compare against every vector
+EXACT_SEARCH_LIMIT = 5000
+
+# Candidates kept by Hamming distance for exact re-ranking, per requested result
+CANDIDATES_PER_RESULT = 50
+MIN_CANDIDATES = 500
+
+# Number of set bits in each byte value
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+class ClauseIndex:
+    """
+    Approximate nearest-neighbour index over clause embeddings.
+
+    Vectors are unit-normalized float32 rows appended to one contiguous
+    file and read through a memory map, so the whole matrix is never
+    loaded. Each row also gets a 64-bit random-hyperplane code; a query
+    ranks all codes by Hamming distance (a cheap prefilter that
+    approximates angular distance) and re-ranks the best candidates by
+    exact cosine similarity. Clause metadata lives in SQLite. Re-indexing a
+    document tombstones its old rows instead of rewriting the files.
+
+    The number of committed rows is stored in SQLite and only advanced,
+    together with the rows' metadata, once both files have been written
+    and synced. Readers map just that many rows, so they never see a
+    partial append, and the next writer truncates whatever an interrupted
+    one left past it.
+    """
+
+    def __init__(self, directory: str, dimensions: int = DEFAULT_DIMENSIONS):
+        self.directory = directory
+        self.dimensions = dimensions
+        os.makedirs(directory, exist_ok=True)
+
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.codes_path = os.path.join(directory, "codes.u64")
+        self.db_path = os.path.join(directory, "clauses.sqlite3")
+        self.lock = FileLock(os.path.join(directory, "clauses.lock"))
+
+        rng = np.random.default_rng(HYPERPLANE_SEED)
+        self.hyperplanes = rng.standard_normal((CODE_BITS, dimensions)).astype(np.float32)
+
+        with closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS clauses (
+                    row INTEGER PRIMARY KEY,
+                    doc_id TEXT NOT NULL,
+                    start_char INTEGER NOT NULL,
+                    end_char INTEGER NOT NULL,
+                    type TEXT,
+                    title TEXT,
+                    deleted INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_clauses_doc ON clauses(doc_id);
+                CREATE TABLE IF NOT EXISTS state (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+            """)
+            # Indexes created before the row count was stored: rows past the metadata were never committed
+            conn.execute("INSERT OR IGNORE INTO state (key, value) "
+                         "SELECT 'rows', COALESCE(MAX(row) + 1, 0) FROM clauses")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the metadata database"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        """Pack the signs of the hyperplane projections into one uint64 per vector"""
+        bits = (vectors @ self.hyperplanes.T) > 0
+        return np.packbits(bits, axis=1, bitorder="little").view("<u8").ravel()
+
+    def _row_count(self) -> int:
+        """Number of committed rows; the files may be longer while a write is in progress"""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT value FROM state WHERE key = 'rows'").fetchone()[0]
+
+    @staticmethod
+    def _write_at(path: str, offset: int, data: bytes) -> None:
+        """Write data at offset, dropping anything after it, and sync it to disk"""
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        with os.fdopen(fd, "r+b") as f:
+            # Only an interrupted write leaves the file longer than the committed rows
+            if os.fstat(f.fileno()).st_size != offset:
+                f.truncate(offset)
+            f.seek(offset)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def add_document(self, document_id: str, clauses: List[Dict[str, Any]], vectors: np.ndarray) -> None:
+        """
+        Index a document's clauses, replacing any previously indexed for it
+
+        Args:
+            document_id: Document ID
+            clauses: Clause dicts with start_char, end_char, type and title
+            vectors: One embedding per clause (rows)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(clauses), self.dimensions)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+        with self.lock:
+            first_row = self._row_count()
+
+            # Write vectors and codes after the committed rows; readers ignore them until the count moves
+            self._write_at(self.vectors_path, first_row * self.dimensions * 4, vectors.astype("<f4").tobytes())
+            self._write_at(self.codes_path, first_row * 8, self._codes(vectors).tobytes())
+
+            with closing(self._connect()) as conn, conn:
+                conn.execute("UPDATE clauses SET deleted = 1 WHERE doc_id = ?", (document_id,))
+                conn.executemany(
+                    "INSERT INTO clauses (row, doc_id, start_char, end_char, type, title) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(first_row + i, document_id, clause["start_char"], clause["end_char"],
+                      clause.get("type"), clause.get("title"))
+                     for i, clause in enumerate(clauses)])
+                conn.execute("UPDATE state SET value = ? WHERE key = 'rows'", (first_row + len(clauses),))
+
+    def remove_document(self, document_id: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE clauses SET deleted = 1 WHERE doc_id = ?", (document_id,))
+
+    def search(self, vector: np.ndarray, k: int = 10, clause_type: Optional[str] = None,
+               exclude_document: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find the clauses most similar to an embedding
+
+        Args:
+            vector: Query embedding
+            k: Number of results
+            clause_type: Only return clauses of this type
+            exclude_document: Leave out clauses of this document
+
+        Returns:
+            Up to k clauses with document_id, start_char, end_char, type,
+            title and cosine similarity, most similar first
+        """
+        query = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+
+        rows = self._row_count()
+        if rows == 0:
+            return []
+        vectors = np.memmap(self.vectors_path, dtype="<f4", mode="r", shape=(rows, self.dimensions))
+
+        # Filters shrink the result set, so look further when they are used
+        wanted = k * 4 if clause_type or exclude_document else k
+        if rows <= EXACT_SEARCH_LIMIT:
+            candidates = np.arange(rows)
+        else:
+            codes = np.memmap(self.codes_path, dtype="<u8", mode="r", shape=(rows,))
+            distances = _POPCOUNT[(codes ^ self._codes(query[None, :])[0]).view(np.uint8)].reshape(rows, 8).sum(axis=1)
+            count = min(rows, max(MIN_CANDIDATES, CANDIDATES_PER_RESULT * wanted))
+            candidates = np.sort(np.argpartition(distances, count - 1)[:count])
+
+        similarities = np.asarray(vectors[candidates] @ query)
+        order = candidates[np.argsort(-similarities, kind="stable")]
+        scores = dict(zip(candidates.tolist(), similarities.tolist()))
+
+        # Resolve metadata in order, skipping tombstoned and filtered rows
+        results = []
+        with closing(self._connect()) as conn:
+            for start in range(0, len(order), 500):
+                batch = order[start:start + 500].tolist()
+                placeholders = ",".join("?" * len(batch))
+                metadata = {row[0]: row for row in conn.execute(
+                    f"SELECT row, doc_id, start_char, end_char, type, title FROM clauses "
+                    f"WHERE deleted = 0 AND row IN ({placeholders})", batch)}
+                for row in batch:
+                    if row not in metadata:
+                        continue
+                    _, doc_id, start_char, end_char, kind, title = metadata[row]
+                    if clause_type and kind != clause_type or doc_id == exclude_document:
+                        continue
+                    results.append({
+                        "document_id": doc_id,
+                        "start_char": start_char,
+                        "end_char": end_char,
+                        "type": kind,
+                        "title": title,
+                        "similarity": scores[row],
+                    })
+                    if len(results) == k:
+                        return results
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """Stored rows, live clauses and tombstones"""
+        with closing(self._connect()) as conn:
+            live = conn.execute("SELECT COUNT(*) FROM clauses WHERE deleted = 0").fetchone()[0]
+            deleted = conn.execute("SELECT COUNT(*) FROM clauses WHERE deleted = 1").fetchone()[0]
+        return {"rows": self._row_count(), "clauses": live, "tombstones": deleted}
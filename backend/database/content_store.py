@@ -0,0 +1,182 @@
+import os
+import mmap
+import zlib
+import struct
+from typing import List, Tuple, Iterable
+
+from backend.database.locking import atomic_open
+
+# File layout:
+#   header:  magic (4s) | frame_chars (I) | frame_count (I) | total_chars (Q) | table_offset (Q)
+#   frames:  zlib-compressed UTF-8 text, frame_chars characters each (last may be shorter)
+#   table:   frame_count x (byte_offset (Q), byte_length (I))
+# The frame table goes last so content can be written as a stream.
+MAGIC = b"LECS"
+HEADER = struct.Struct("<4sIIQQ")
+FRAME_ENTRY = struct.Struct("<QI")
+
+# Characters per compressed frame; a range read decompresses only the frames it overlaps
+DEFAULT_FRAME_CHARS = 64 * 1024
+
+CONTENT_EXTENSION = ".lecs"
+
+
+class ContentStore:
+    """
+    Stores document text compressed in independently decodable frames.
+
+    Each frame holds a fixed number of characters, so a character range
+    maps directly to the frames that contain it. Reads memory-map the file
+    and decompress only those frames, which lets excerpt views read a
+    clause or page without loading the whole document.
+    """
+
+    def __init__(self, directory: str, frame_chars: int = DEFAULT_FRAME_CHARS, level: int = 6):
+        self.directory = directory
+        self.frame_chars = frame_chars
+        self.level = level
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, document_id: str) -> str:
+        """Path of a document's content file"""
+        return os.path.join(self.directory, f"{document_id}{CONTENT_EXTENSION}")
+
+    def exists(self, document_id: str) -> bool:
+        """Check whether content is stored for a document"""
+        return os.path.exists(self.path(document_id))
+
+    def write(self, document_id: str, content: str) -> int:
+        """
+        Compress and store a document's content
+
+        Args:
+            document_id: Document ID
+            content: Full document text
+
+        Returns:
+            Number of characters stored
+        """
+        frames = (content[i:i + self.frame_chars] for i in range(0, len(content), self.frame_chars))
+        return self.write_frames(document_id, frames)
+
+    def write_stream(self, document_id: str, pieces: Iterable[str]) -> int:
+        """Store content given as pieces of any size, holding at most one frame of it at a time"""
+        def frames():
+            # Pieces are joined once a frame's worth has arrived, so each character is copied a bounded number of times
+            pending: List[str] = []
+            pending_chars = 0
+            for piece in pieces:
+                pending.append(piece)
+                pending_chars += len(piece)
+                if pending_chars >= self.frame_chars:
+                    buffer = "".join(pending)
+                    full = len(buffer) - len(buffer) % self.frame_chars
+                    for start in range(0, full, self.frame_chars):
+                        yield buffer[start:start + self.frame_chars]
+                    rest = buffer[full:]
+                    pending = [rest] if rest else []
+                    pending_chars = len(rest)
+            if pending:
+                yield "".join(pending)
+
+        return self.write_frames(document_id, frames())
+
+    def write_frames(self, document_id: str, frames: Iterable[str]) -> int:
+        """Store content given as consecutive frame_chars-sized pieces (the last may be shorter)"""
+        table = []
+        total_chars = 0
+        previous_length = self.frame_chars
+
+        with atomic_open(self.path(document_id), "wb") as f:
+            # Placeholder header, rewritten once the frame count is known
+            f.write(HEADER.pack(MAGIC, self.frame_chars, 0, 0, 0))
+            offset = HEADER.size
+
+            for frame in frames:
+                # Offsets are computed from frame_chars, so only the final frame may be short
+                if previous_length != self.frame_chars:
+                    raise ValueError("Only the last frame may be shorter than frame_chars")
+                data = zlib.compress(frame.encode("utf-8"), self.level)
+                f.write(data)
+                table.append(FRAME_ENTRY.pack(offset, len(data)))
+                offset += len(data)
+                total_chars += len(frame)
+                previous_length = len(frame)
+
+            f.write(b"".join(table))
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, self.frame_chars, len(table), total_chars, offset))
+
+        return total_chars
+
+    def length(self, document_id: str) -> int:
+        """Number of characters stored for a document"""
+        with open(self.path(document_id), "rb") as f:
+            _, _, _, total_chars, _ = self._read_header(f.read(HEADER.size))
+        return total_chars
+
+    def read(self, document_id: str) -> str:
+        """Read a document's full content"""
+        return self.read_span(document_id, 0, None)
+
+    def read_span(self, document_id: str, start: int = 0, end: int = None) -> str:
+        """
+        Read characters [start, end) of a document
+
+        Offsets work as in str slicing: negative ones count from the end
+        of the document, and out-of-range ones are clamped to it.
+
+        Args:
+            document_id: Document ID
+            start: First character offset
+            end: End character offset, or None for the end of the document
+
+        Returns:
+            The requested text
+        """
+        with open(self.path(document_id), "rb") as f:
+            if os.fstat(f.fileno()).st_size <= HEADER.size:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                _, frame_chars, _, total_chars, table_offset = self._read_header(mapped[:HEADER.size])
+
+                start = max(0, total_chars + start) if start < 0 else start
+                if end is None:
+                    end = total_chars
+                else:
+                    end = max(0, total_chars + end) if end < 0 else min(end, total_chars)
+                if start >= end:
+                    return ""
+
+                first_frame = start // frame_chars
+                last_frame = (end - 1) // frame_chars
+
+                pieces = []
+                for offset, length in self._frame_entries(mapped, table_offset, first_frame, last_frame):
+                    pieces.append(zlib.decompress(mapped[offset:offset + length]).decode("utf-8"))
+
+        text = "".join(pieces)
+        base = first_frame * frame_chars
+        return text[start - base:end - base]
+
+    def delete(self, document_id: str) -> None:
+        """Remove a document's content file"""
+        if self.exists(document_id):
+            os.remove(self.path(document_id))
+
+    @staticmethod
+    def _read_header(data: bytes) -> Tuple[bytes, int, int, int, int]:
+        """Parse and validate a content file header"""
+        header = HEADER.unpack(data)
+        if header[0] != MAGIC:
+            raise ValueError("Not a LegalEase content file")
+        return header
+
+    @staticmethod
+    def _frame_entries(mapped: mmap.mmap, table_offset: int, first: int, last: int) -> List[Tuple[int, int]]:
+        """Read (byte_offset, byte_length) table entries for frames first..last"""
+        start = table_offset + first * FRAME_ENTRY.size
+        return [
+            FRAME_ENTRY.unpack_from(mapped, start + i * FRAME_ENTRY.size)
+            for i in range(last - first + 1)
+        ]
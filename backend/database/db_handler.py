@@ -1,111 +1,418 @@
-import os
-import json
-import datetime
-from typing import Dict, List, Any, Optional
-
-class DatabaseHandler:
-    """
-    Simple file-based database handler for storing documents and analyses.
-    In a production environment, this would be replaced with a proper database.
-    """
-    
-    def __init__(self, data_dir: str = "data"):
-        self.data_dir = data_dir
-        self.documents_dir = os.path.join(data_dir, "documents")
-        self.analyses_dir = os.path.join(data_dir, "analyses")
-        
-        # Create directories if they don't exist
-        os.makedirs(self.documents_dir, exist_ok=True)
-        os.makedirs(self.analyses_dir, exist_ok=True)
-    
-    def save_document(self, document: Dict[str, Any]) -> str:
-        """
-        Save a document to the database
-        
-        Args:
-            document: Dictionary containing document data
-            
-        Returns:
-            Document ID
-        """
-        document_id = document.get("id")
-        
-        # Create metadata and content files
-        metadata = document.copy()
-        # Store content separately to avoid large metadata files
-        content = metadata.pop("content")
-        
-        # Save metadata
-        metadata_path = os.path.join(self.documents_dir, f"{document_id}.json")
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
-        # Save content
-        content_path = os.path.join(self.documents_dir, f"{document_id}.txt")
-        with open(content_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        return document_id
-    
-    def get_document(self, document_id: str) -> Optional[Dict[str, Any]]:
-        """Get a document by ID"""
-        metadata_path = os.path.join(self.documents_dir, f"{document_id}.json")
-        content_path = os.path.join(self.documents_dir, f"{document_id}.txt")
-        
-        # Check if document exists
-        if not os.path.exists(metadata_path) or not os.path.exists(content_path):
-            return None
-        
-        # Load metadata
-        with open(metadata_path, 'r') as f:
-            document = json.load(f)
-        
-        # Load content
-        with open(content_path, 'r', encoding='utf-8') as f:
-            document["content"] = f.read()
-        
-        return document
-    
-    def list_documents(self) -> List[Dict[str, Any]]:
-        """List all documents (without content)"""
-        documents = []
-        
-        for filename in os.listdir(self.documents_dir):
-            if filename.endswith(".json"):
-                file_path = os.path.join(self.documents_dir, filename)
-                with open(file_path, 'r') as f:
-                    document = json.load(f)
-                    documents.append(document)
-        
-        # Sort by upload date (newest first)
-        documents.sort(key=lambda x: x.get("upload_date", ""), reverse=True)
-        
-        return documents
-    
-    def save_analysis(self, document_id: str, analysis: Dict[str, Any]) -> None:
-        """Save analysis results for a document"""
-        analysis_path = os.path.join(self.analyses_dir, f"{document_id}.json")
-        
-        # Add timestamp to analysis
-        analysis["timestamp"] = self.get_current_time()
-        
-        with open(analysis_path, 'w') as f:
-            json.dump(analysis, f, indent=2)
-    
-    def get_analysis(self, document_id: str) -> Optional[Dict[str, Any]]:
-        """Get analysis for a document"""
-        analysis_path = os.path.join(self.analyses_dir, f"{document_id}.json")
-        
-        if not os.path.exists(analysis_path):
-            return None
-        
-        with open(analysis_path, 'r') as f:
-            return json.load(f)
-    
-    def get_current_time(self) -> str:
-        """Get current time in ISO format"""
-        return datetime.datetime.now().isoformat()
-
-
-# Singleton instance
+import os
+import json
+import datetime
+from collections.abc import Mapping
+from typing import Dict, List, Any, Optional, Callable, Iterator
+
+from backend.database.search_index import SearchIndex
+from backend.database.dedup_index import DedupIndex, NEAR_DUPLICATE_THRESHOLD
+from backend.database.clause_index import ClauseIndex
+from backend.database.entity_index import EntityIndex
+from backend.database.content_store import ContentStore
+from backend.database.analysis_store import AnalysisStore
+from backend.database.locking import FileLock, SingleFlight, atomic_open
+from backend.database.cache import ByteLRUCache, file_stamp
+
+class DatabaseHandler:
+    """
+    Simple file-based database handler for storing documents and analyses.
+    In a production environment, this would be replaced with a proper database.
+    """
+    
+    def __init__(self, data_dir: str = "data", cache_bytes: int = 256 * 1024 * 1024):
+        self.data_dir = data_dir
+        self.documents_dir = os.path.join(data_dir, "documents")
+        self.analyses_dir = os.path.join(data_dir, "analyses")
+        self.index_dir = os.path.join(data_dir, "index")
+        self.locks_dir = os.path.join(data_dir, "locks")
+        
+        # Create directories if they don't exist
+        os.makedirs(self.documents_dir, exist_ok=True)
+        os.makedirs(self.analyses_dir, exist_ok=True)
+        
+        # In-process cache of metadata, content and analysis sections, bounded by size
+        self.cache = ByteLRUCache(cache_bytes)
+        
+        # Compressed, range-readable document text
+        self.content_store = ContentStore(self.documents_dir)
+        
+        # Columnar, lazily loaded analyses
+        self.analysis_store = AnalysisStore(self.analyses_dir, cache=self.cache)
+        
+        # Full-text index across all documents
+        self.search_index = SearchIndex(os.path.join(self.index_dir, "search.sqlite3"))
+        self.dedup_index = DedupIndex(os.path.join(self.index_dir, "dedup.sqlite3"))
+        
+        # Clause embeddings for similarity search across documents
+        self.clause_index = ClauseIndex(os.path.join(self.index_dir, "clauses"))
+        
+        # Entity mentions and per-document counts across all analyses
+        self.entity_index = EntityIndex(os.path.join(self.index_dir, "entities.sqlite3"))
+        
+        # Concurrent analyze requests for the same document share one computation
+        self._analysis_flights = SingleFlight()
+    
+    def save_document(self, document: Dict[str, Any], signature=None) -> str:
+        """
+        Save a document to the database
+        
+        Args:
+            document: Dictionary containing document data; a "parent_id"
+                marks it as a revision of that document
+            signature: MinHash signature of the content, if already computed
+                (e.g. for find_duplicates before saving)
+            
+        Returns:
+            Document ID
+            
+        Raises:
+            ValueError: If parent_id names a document that doesn't exist
+        """
+        document_id = document.get("id")
+        
+        # Create metadata and content files
+        metadata = document.copy()
+        # Store content separately to avoid large metadata files
+        content = metadata.pop("content")
+        metadata["content_length"] = len(content)
+        
+        # Link revisions to the first version of the document
+        parent_id = metadata.get("parent_id")
+        if parent_id:
+            try:
+                parent = self._load_metadata(parent_id)
+            except FileNotFoundError:
+                # e.g. deleted since the Upload page listed it
+                raise ValueError(f"The document this is a revision of ({parent_id}) no longer exists")
+            metadata["root_id"] = parent.get("root_id", parent_id)
+            metadata["version"] = parent.get("version", 1) + 1
+        
+        with self.lock_document(document_id):
+            # Save content as compressed frames, replacing any legacy plain-text copy
+            self.content_store.write(document_id, content)
+            legacy_path = os.path.join(self.documents_dir, f"{document_id}.txt")
+            if os.path.exists(legacy_path):
+                os.remove(legacy_path)
+            
+            # Save metadata last so the document only appears once its content exists
+            metadata_path = os.path.join(self.documents_dir, f"{document_id}.json")
+            with atomic_open(metadata_path, 'w') as f:
+                json.dump(metadata, f, indent=2)
+            
+            # Keep the corpus-wide search index up to date
+            self.search_index.add_document(document_id, content, metadata.get("filename"))
+            self.dedup_index.add_document(document_id, content, signature=signature)
+            
+            self.cache.invalidate_document(document_id)
+        
+        return document_id
+    
+    def get_document(self, document_id: str, include_content: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Get a document by ID
+        
+        Args:
+            document_id: Document ID
+            include_content: Load the full text into "content"; pass False for
+                metadata-only views and use read_span for excerpts
+            
+        Returns:
+            Document dictionary, or None if it doesn't exist
+        """
+        # Check if document exists
+        if not self._has_content(document_id):
+            return None
+        
+        # Load metadata (a copy, since cached values are shared)
+        try:
+            document = dict(self._load_metadata(document_id))
+        except FileNotFoundError:
+            return None
+        
+        # Load content
+        if include_content:
+            document["content"] = self.read_span(document_id, 0, None)
+        
+        return document
+    
+    def read_span(self, document_id: str, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Read characters [start, end) of a document's content without loading the rest
+        
+        Args:
+            document_id: Document ID
+            start: First character offset
+            end: End character offset, or None for the end of the document
+            
+        Returns:
+            The requested text
+        """
+        content_path = self.content_store.path(document_id)
+        if self.content_store.exists(document_id):
+            if start <= 0 and end is None:
+                return self.cache.get_file(("content", document_id), content_path,
+                                           lambda: self.content_store.read(document_id))
+            
+            # Serve excerpts from a cached full copy when there is one
+            cached = self.cache.get(("content", document_id), file_stamp(content_path))
+            if cached is not None:
+                return cached[start:end]
+            return self.content_store.read_span(document_id, start, end)
+        
+        # Documents saved before the content store existed are plain text files
+        content_path = os.path.join(self.documents_dir, f"{document_id}.txt")
+        with open(content_path, 'r', encoding='utf-8') as f:
+            return f.read()[start:end]
+    
+    def _load_metadata(self, document_id: str) -> Dict[str, Any]:
+        """Load a document's metadata through the cache"""
+        metadata_path = os.path.join(self.documents_dir, f"{document_id}.json")
+        
+        def load():
+            with open(metadata_path, 'r') as f:
+                return json.load(f)
+        
+        return self.cache.get_file(("meta", document_id), metadata_path, load)
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters of the in-process cache"""
+        return self.cache.stats()
+    
+    def _has_content(self, document_id: str) -> bool:
+        """Check whether content is stored for a document in either format"""
+        return (self.content_store.exists(document_id)
+                or os.path.exists(os.path.join(self.documents_dir, f"{document_id}.txt")))
+    
+    def list_documents(self) -> List[Dict[str, Any]]:
+        """List all documents (without content)"""
+        documents = []
+        
+        for filename in os.listdir(self.documents_dir):
+            if filename.endswith(".json"):
+                try:
+                    documents.append(dict(self._load_metadata(filename[:-len(".json")])))
+                except FileNotFoundError:
+                    continue
+        
+        # Sort by upload date (newest first)
+        documents.sort(key=lambda x: x.get("upload_date", ""), reverse=True)
+        
+        return documents
+    
+    def iter_documents(self, changed_since: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the metadata of each document, one at a time and in no particular order
+        
+        Unlike list_documents, nothing is collected or cached, so this scales
+        to corpora whose metadata doesn't fit in memory.
+        
+        Args:
+            changed_since: Only documents whose metadata or analysis was written
+                at or after this time (seconds since the epoch)
+        """
+        with os.scandir(self.documents_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                document_id = entry.name[:-len(".json")]
+                try:
+                    if changed_since is not None and entry.stat().st_mtime < changed_since:
+                        analysis_time = self.analysis_store.modified_time(document_id)
+                        if analysis_time is None or analysis_time < changed_since:
+                            continue
+                    with open(entry.path, 'r') as f:
+                        metadata = json.load(f)
+                except FileNotFoundError:
+                    continue
+                yield metadata
+    
+    def get_revisions(self, document_id: str) -> List[Dict[str, Any]]:
+        """All versions of a document (without content), oldest first"""
+        try:
+            metadata = self._load_metadata(document_id)
+        except FileNotFoundError:
+            return []
+        root_id = metadata.get("root_id", document_id)
+        
+        revisions = [doc for doc in self.list_documents() if doc.get("root_id", doc.get("id")) == root_id]
+        revisions.sort(key=lambda x: x.get("version", 1))
+        return revisions
+    
+    def search_documents(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Search across all documents
+        
+        Args:
+            query: Terms, "quoted phrases" and prefix* queries (all must match)
+            limit: Maximum number of results
+            
+        Returns:
+            Ranked results with document ID, filename, score and snippet
+        """
+        return self.search_index.search(query, limit=limit, content_reader=self.read_span)
+    
+    def find_duplicates(self, content: str, threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                        limit: int = 5, exclude: Optional[str] = None, signature=None) -> List[Dict[str, Any]]:
+        """
+        Find stored documents whose content is an exact or near copy of the given text
+        
+        Args:
+            content: Document text
+            threshold: Minimum estimated Jaccard similarity of 5-word shingles
+            limit: Maximum number of results
+            exclude: Document ID to leave out
+            signature: MinHash signature of the content, if already computed
+                (see dedup_index.minhash_signature)
+            
+        Returns:
+            Matches with document ID, similarity and whether the copy is exact, best first
+        """
+        return self.dedup_index.find_duplicates(content, threshold=threshold, limit=limit, exclude=exclude,
+                                                signature=signature)
+    
+    def index_clauses(self, document_id: str, clauses: List[Dict[str, Any]], vectors) -> None:
+        """Add a document's analyzed clauses and their embeddings to the clause index"""
+        self.clause_index.add_document(document_id, clauses, vectors)
+    
+    def find_similar_clauses(self, vector, limit: int = 10, clause_type: Optional[str] = None,
+                             exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find clauses across all documents similar to an embedding
+        
+        Args:
+            vector: Clause embedding (see ClauseIdentifier.embed_text)
+            limit: Maximum number of results
+            clause_type: Only return clauses of this type
+            exclude: Document ID to leave out
+            
+        Returns:
+            Clauses with document ID, filename, offsets, type, title,
+            similarity and text, most similar first
+        """
+        results = self.clause_index.search(vector, k=limit, clause_type=clause_type, exclude_document=exclude)
+        for result in results:
+            try:
+                result["filename"] = self._load_metadata(result["document_id"]).get("filename")
+                result["text"] = self.read_span(result["document_id"], result["start_char"], result["end_char"])
+            except FileNotFoundError:
+                result["filename"], result["text"] = None, ""
+        return results
+    
+    def get_entity_counts(self, document_id: str, label: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Distinct entities of a document's analysis with precomputed occurrence counts
+        
+        Analyses saved before the entity index existed are indexed on first use.
+        """
+        if not self.entity_index.has_document(document_id):
+            analysis = self.get_analysis(document_id)
+            if analysis is None:
+                return []
+            self.entity_index.add_document(document_id, analysis.get("entities", []))
+        return self.entity_index.document_entities(document_id, label)
+    
+    def find_documents_by_entity(self, text: str, label: Optional[str] = None,
+                                 limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Find documents whose analysis mentions an entity
+        
+        Args:
+            text: Entity text; case, punctuation and spacing are ignored
+            label: Only match entities with this label (e.g. "ORG" or "STATUTE_CITATION")
+            limit: Maximum number of results
+            
+        Returns:
+            Documents with document ID, filename, matched labels and mention count
+        """
+        results = self.entity_index.find_documents(text, label=label, limit=limit)
+        for result in results:
+            try:
+                result["filename"] = self._load_metadata(result["document_id"]).get("filename")
+            except FileNotFoundError:
+                result["filename"] = None
+        return results
+    
+    def rebuild_search_index(self) -> int:
+        """Index every stored document (e.g. documents saved before the index existed)"""
+        documents = (self.get_document(doc["id"]) for doc in self.list_documents())
+        return self.search_index.add_documents(doc for doc in documents if doc is not None)
+    
+    def save_analysis(self, document_id: str, analysis: Dict[str, Any]) -> None:
+        """Save analysis results for a document"""
+        # Add timestamp to analysis
+        analysis["timestamp"] = self.get_current_time()
+        
+        with self.lock_document(document_id):
+            self.analysis_store.save(document_id, analysis)
+            self.entity_index.add_document(document_id, analysis.get("entities", []))
+    
+    def get_analysis(self, document_id: str) -> Optional[Mapping]:
+        """
+        Get analysis for a document
+        
+        Summary, document type and timestamp are read immediately; entities
+        and key clauses are loaded the first time they are accessed.
+        """
+        return self.analysis_store.load(document_id, self._span_reader(document_id))
+    
+    def get_partial_summary(self, document_id: str) -> Dict[str, str]:
+        """Chunk summaries saved by an unfinished summarization run, keyed by chunk fingerprint"""
+        return self.analysis_store.load_partial_summary(document_id)
+    
+    def save_partial_summary(self, document_id: str, chunks: Dict[str, str]) -> None:
+        """Persist chunk summaries so an interrupted summarization can resume"""
+        self.analysis_store.save_partial_summary(document_id, chunks)
+    
+    def get_or_create_analysis(self, document_id: str,
+                               compute: Callable[[], Dict[str, Any]]) -> Mapping:
+        """
+        Return the stored analysis for a document, computing and saving it if missing
+        
+        Concurrent callers for the same document share one computation: threads
+        in this process wait on the first caller, and other processes wait on a
+        per-document lock and then pick up the saved result.
+        
+        Args:
+            document_id: Document ID
+            compute: Callable producing the analysis dictionary
+            
+        Returns:
+            The analysis
+        """
+        analysis = self.get_analysis(document_id)
+        if analysis is not None:
+            return analysis
+        return self._analysis_flights.do(document_id, lambda: self._compute_analysis(document_id, compute))
+    
+    def _compute_analysis(self, document_id: str, compute: Callable[[], Dict[str, Any]]) -> Mapping:
+        """Compute and save an analysis while holding the document's analysis lock"""
+        with FileLock(os.path.join(self.locks_dir, f"{document_id}.analyze.lock")):
+            # Another process may have finished while we waited for the lock
+            analysis = self.get_analysis(document_id)
+            if analysis is not None:
+                return analysis
+            
+            analysis = compute()
+            self.save_analysis(document_id, analysis)
+            return analysis
+    
+    def lock_document(self, document_id: str) -> FileLock:
+        """Lock serializing writes to a document's files across threads and processes"""
+        return FileLock(os.path.join(self.locks_dir, f"{document_id}.lock"))
+    
+    def get_analysis_section(self, document_id: str, section: str) -> Any:
+        """Load a single section (e.g. "entities" or "key_clauses") of an analysis"""
+        analysis = self.get_analysis(document_id)
+        return None if analysis is None else analysis.get(section)
+    
+    def _span_reader(self, document_id: str):
+        """Bind read_span to a document"""
+        return lambda start, end: self.read_span(document_id, start, end)
+    
+    def get_current_time(self) -> str:
+        """Get current time in ISO format"""
+        return datetime.datetime.now().isoformat()
+
+
+# Singleton instance
 db_handler = DatabaseHandler()
\ No newline at end of file
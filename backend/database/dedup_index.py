@@ -0,0 +1,192 @@
+import os
+import re
+import zlib
+import random
+import hashlib
+import sqlite3
+from contextlib import closing
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+# Documents are compared as sets of overlapping word n-grams ("shingles")
+SHINGLE_WORDS = 5
+
+# MinHash signature length, split into LSH bands of BAND_ROWS values. Two
+# documents share a band bucket with high probability once their Jaccard
+# similarity passes roughly (1 / LSH_BANDS) ** (1 / BAND_ROWS), about 0.7
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16
+BAND_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+# Universal hashing h(x) = (a * x + b) mod p over 32-bit shingle hashes; with
+# p < 2**32 every intermediate value fits in an unsigned 64-bit integer
+MERSENNE_PRIME = 4294967291
+PERMUTATION_SEED = 20240229
+
+# Shingles hashed per block, bounding memory to NUM_PERMUTATIONS x block values
+SHINGLE_BLOCK = 8192
+
+# Default estimated Jaccard similarity for reporting a near duplicate
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+_rng = random.Random(PERMUTATION_SEED)
+_PERM_A = np.array([_rng.randrange(1, MERSENNE_PRIME) for _ in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+_PERM_B = np.array([_rng.randrange(0, MERSENNE_PRIME) for _ in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of a text, identifying exact duplicates"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def shingle_hashes(text: str, k: int = SHINGLE_WORDS) -> np.ndarray:
+    """Distinct 32-bit hashes of the text's k-word shingles (case-insensitive)"""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if not tokens:
+        return np.zeros(0, dtype=np.uint64)
+
+    # Hash each distinct token once; crc32 is stable across processes, unlike hash()
+    vocabulary: Dict[str, int] = {}
+    ids = np.fromiter((vocabulary.setdefault(token, len(vocabulary)) for token in tokens),
+                      dtype=np.int64, count=len(tokens))
+    token_hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in vocabulary),
+                               dtype=np.uint64, count=len(vocabulary))[ids]
+
+    # Polynomial rolling combination over each window, wrapping at 64 bits
+    k = min(k, len(tokens))
+    count = len(tokens) - k + 1
+    combined = np.zeros(count, dtype=np.uint64)
+    for offset in range(k):
+        combined = combined * np.uint64(1000003) + token_hashes[offset:offset + count]
+
+    folded = (combined ^ (combined >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+    return np.unique(folded)
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERMUTATIONS uint32 values) of a text's shingle set"""
+    shingles = shingle_hashes(text)
+    signature = np.full(NUM_PERMUTATIONS, MERSENNE_PRIME, dtype=np.uint64)
+    for start in range(0, len(shingles), SHINGLE_BLOCK):
+        block = shingles[start:start + SHINGLE_BLOCK]
+        hashed = (_PERM_A[:, None] * block[None, :] + _PERM_B[:, None]) % np.uint64(MERSENNE_PRIME)
+        np.minimum(signature, hashed.min(axis=1), out=signature)
+    return signature.astype(np.uint32)
+
+
+def band_buckets(signature: np.ndarray) -> List[int]:
+    """LSH bucket of each band of a signature"""
+    rows = signature.astype("<u4").reshape(LSH_BANDS, BAND_ROWS)
+    # 7-byte digests fit in SQLite's signed 64-bit INTEGER
+    return [int.from_bytes(hashlib.blake2b(row.tobytes(), digest_size=7).digest(), "little") for row in rows]
+
+
+def estimate_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two documents from their signatures"""
+    return float(np.mean(a == b))
+
+
+class DedupIndex:
+    """
+    Exact and near-duplicate lookup over stored documents, in SQLite.
+
+    Each document keeps the SHA-256 of its content and a MinHash signature
+    of its 5-word shingles. The signature is split into LSH bands, and a
+    query only compares signatures of documents that share at least one
+    band bucket with it, so lookups stay fast as the corpus grows.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS signatures (
+                    doc_id TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    signature BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_signatures_sha256 ON signatures(sha256);
+                CREATE TABLE IF NOT EXISTS bands (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    doc_id TEXT NOT NULL,
+                    PRIMARY KEY (band, bucket, doc_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_bands_doc ON bands(doc_id);
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the index database"""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def add_document(self, document_id: str, text: str, signature: Optional[np.ndarray] = None) -> None:
+        """Index (or re-index) a document's content, with its signature if already computed"""
+        if signature is None:
+            signature = minhash_signature(text)
+        sha256 = content_hash(text)
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM bands WHERE doc_id = ?", (document_id,))
+            conn.execute("INSERT OR REPLACE INTO signatures VALUES (?, ?, ?)",
+                         (document_id, sha256, signature.astype("<u4").tobytes()))
+            conn.executemany("INSERT OR IGNORE INTO bands VALUES (?, ?, ?)",
+                             [(band, bucket, document_id) for band, bucket in enumerate(band_buckets(signature))])
+
+    def remove_document(self, document_id: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM bands WHERE doc_id = ?", (document_id,))
+            conn.execute("DELETE FROM signatures WHERE doc_id = ?", (document_id,))
+
+    def find_duplicates(self, text: str, threshold: float = NEAR_DUPLICATE_THRESHOLD, limit: int = 5,
+                        exclude: Optional[str] = None,
+                        signature: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        Find stored documents that are exact or near duplicates of a text
+
+        Args:
+            text: Content to check
+            threshold: Minimum estimated Jaccard similarity of shingle sets
+            limit: Maximum number of results
+            exclude: Document ID to leave out (e.g. the document itself)
+            signature: minhash_signature(text), if already computed
+
+        Returns:
+            Matches sorted by similarity, each with "document_id",
+            "similarity" (1.0 for exact copies) and "exact"
+        """
+        if signature is None:
+            signature = minhash_signature(text)
+        sha256 = content_hash(text)
+
+        with closing(self._connect()) as conn:
+            exact = {row[0] for row in conn.execute("SELECT doc_id FROM signatures WHERE sha256 = ?", (sha256,))}
+
+            candidates = set()
+            for band, bucket in enumerate(band_buckets(signature)):
+                candidates.update(row[0] for row in conn.execute(
+                    "SELECT doc_id FROM bands WHERE band = ? AND bucket = ?", (band, bucket)))
+            candidates -= exact
+
+            signatures = {}
+            for doc_id in candidates:
+                row = conn.execute("SELECT signature FROM signatures WHERE doc_id = ?", (doc_id,)).fetchone()
+                if row is not None:
+                    signatures[doc_id] = np.frombuffer(row[0], dtype="<u4")
+
+        matches = [{"document_id": doc_id, "similarity": 1.0, "exact": True} for doc_id in sorted(exact)]
+        for doc_id, candidate in signatures.items():
+            similarity = estimate_similarity(signature, candidate)
+            if similarity >= threshold:
+                matches.append({"document_id": doc_id, "similarity": similarity, "exact": False})
+
+        matches = [match for match in matches if match["document_id"] != exclude]
+        matches.sort(key=lambda match: (match["exact"], match["similarity"]), reverse=True)
+        return matches[:limit]
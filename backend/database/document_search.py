@@ -0,0 +1,287 @@
+import re
+import weakref
+import itertools
+import threading
+import multiprocessing
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+from backend.database.search_index import TOKEN_PATTERN
+
+# Search modes supported by DocumentSearcher
+SEARCH_MODES = ("literal", "word", "regex")
+
+# Upper bound on matches kept per query so a one-character search can't exhaust memory
+MAX_MATCHES = 100000
+
+
+def _regex_worker(conn) -> None:
+    """Serve regex searches in the helper process until the parent closes the pipe"""
+    content = ""
+    while True:
+        try:
+            new_content, pattern, limit = conn.recv()
+        except EOFError:
+            return
+        # Content is only sent when the searched document changes
+        if new_content is not None:
+            content = new_content
+
+        spans = []
+        for match in re.finditer(pattern, content, re.IGNORECASE):
+            if match.end() > match.start():
+                spans.append((match.start(), match.end()))
+                if len(spans) >= limit:
+                    break
+        conn.send(spans)
+
+
+class _RegexHelper:
+    """
+    Long-lived helper process for regex searches
+
+    The helper is started with spawn, so it holds none of the parent's
+    threads or models, and it keeps the last document it searched so
+    further queries on that document only send the pattern. A search
+    that exceeds its timeout kills the helper; the next search starts a
+    new one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._process = None
+        self._conn = None
+        self._document = None
+
+    def search(self, document: "_IndexedDocument", pattern: str, limit: int,
+               timeout: float) -> List[Tuple[int, int]]:
+        with self._lock:
+            if self._process is None or not self._process.is_alive():
+                self._start()
+
+            loaded = self._document is not None and self._document() is document
+            self._conn.send((None if loaded else document.content, pattern, limit))
+            self._document = weakref.ref(document)
+
+            if not self._conn.poll(timeout):
+                self._stop()
+                raise TimeoutError(f"Regular expression search exceeded {timeout:.1f}s")
+            try:
+                return self._conn.recv()
+            except EOFError:
+                self._stop()
+                raise ValueError("Regular expression search failed")
+
+    def _start(self) -> None:
+        self._stop()
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_regex_worker, args=(child_conn,), name="regex-search",
+                                        daemon=True)
+        self._process.start()
+        child_conn.close()
+
+    def _stop(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        if self._process is not None:
+            if self._process.is_alive():
+                self._process.kill()
+            self._process.join()
+        self._process = self._conn = self._document = None
+
+
+class _IndexedDocument:
+    """Cached search structures for one version of a document"""
+
+    def __init__(self, content: str):
+        self.content = content
+
+        # Case-folded copy for literal search; only usable when lowering keeps offsets aligned
+        lowered = content.lower()
+        self.lowered = lowered if len(lowered) == len(content) else None
+
+        # Token index is built on first whole-word search
+        self._tokens = None
+        self.results: "OrderedDict[Tuple[str, str], List[Tuple[int, int]]]" = OrderedDict()
+
+    @property
+    def tokens(self) -> Tuple[List[int], List[int], Dict[str, List[int]]]:
+        """Token start offsets, end offsets and token -> token positions"""
+        if self._tokens is None:
+            starts, ends, positions = [], [], {}
+            for i, match in enumerate(TOKEN_PATTERN.finditer(self.content)):
+                starts.append(match.start())
+                ends.append(match.end())
+                positions.setdefault(match.group().lower(), []).append(i)
+            self._tokens = (starts, ends, positions)
+        return self._tokens
+
+
+class DocumentSearcher:
+    """
+    Searches within a single document.
+
+    Queries are literal (case-insensitive) by default. Whole-word queries
+    use a cached token/position index, and regular expressions are an
+    opt-in that runs in a long-lived helper process with a timeout so a
+    pathological pattern cannot hang the worker. Match lists are cached
+    per document version, so paging through results never rescans.
+    """
+
+    def __init__(self, max_documents: int = 16, max_queries_per_document: int = 32,
+                 regex_timeout: float = 2.0):
+        self.max_documents = max_documents
+        self.max_queries_per_document = max_queries_per_document
+        self.regex_timeout = regex_timeout
+        self._documents: "OrderedDict[Tuple[str, Any], _IndexedDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._regex_helper = _RegexHelper()
+
+    def search(self, document_id: str, query: str, load_content: Callable[[], str],
+               version: Any = None, mode: str = "literal", page: int = 1,
+               page_size: int = 10, context_chars: int = 100) -> Dict[str, Any]:
+        """
+        Search a document and return one page of matches.
+
+        Args:
+            document_id: Document ID (cache key)
+            query: Search string
+            load_content: Callable returning the document content; only called on a cache miss
+            version: Anything identifying the stored content version (e.g. upload date)
+            mode: "literal", "word" (whole words) or "regex"
+            page: 1-based page number
+            page_size: Matches per page
+            context_chars: Characters of context on each side of a match
+
+        Returns:
+            Dictionary with total, page, page_count and matches; each match has
+            start/end offsets plus before/text/after strings for highlighting
+
+        Raises:
+            ValueError: For an unknown mode or an invalid regular expression
+            TimeoutError: If a regex search exceeds the timeout
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode: {mode}")
+
+        document = self._get_document(document_id, version, load_content)
+        spans = self._find_all(document, query, mode)
+
+        page_count = max(1, -(-len(spans) // page_size))
+        page = min(max(1, page), page_count)
+        content = document.content
+
+        matches = []
+        for number, (start, end) in enumerate(spans[(page - 1) * page_size:page * page_size],
+                                              start=(page - 1) * page_size + 1):
+            matches.append({
+                "number": number,
+                "start": start,
+                "end": end,
+                "before": content[max(0, start - context_chars):start],
+                "text": content[start:end],
+                "after": content[end:end + context_chars],
+            })
+
+        return {
+            "total": len(spans),
+            "truncated": len(spans) >= MAX_MATCHES,
+            "page": page,
+            "page_count": page_count,
+            "matches": matches,
+        }
+
+    def invalidate(self, document_id: str) -> None:
+        """Drop all cached data for a document"""
+        with self._lock:
+            for key in [key for key in self._documents if key[0] == document_id]:
+                del self._documents[key]
+
+    def _get_document(self, document_id: str, version: Any,
+                      load_content: Callable[[], str]) -> _IndexedDocument:
+        """Return the cached index for a document version, building it on a miss"""
+        key = (document_id, version)
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+                return document
+
+        document = _IndexedDocument(load_content())
+
+        with self._lock:
+            self._documents[key] = document
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+        return document
+
+    def _find_all(self, document: _IndexedDocument, query: str, mode: str) -> List[Tuple[int, int]]:
+        """Return all match spans for a query, using the per-document result cache"""
+        key = (mode, query)
+        with self._lock:
+            spans = document.results.get(key)
+            if spans is not None:
+                document.results.move_to_end(key)
+                return spans
+
+        if not query.strip():
+            spans = []
+        elif mode == "literal":
+            spans = self._find_literal(document, query)
+        elif mode == "word":
+            spans = self._find_words(document, query)
+        else:
+            spans = self._find_regex(document, query)
+
+        with self._lock:
+            document.results[key] = spans
+            while len(document.results) > self.max_queries_per_document:
+                document.results.popitem(last=False)
+        return spans
+
+    def _find_literal(self, document: _IndexedDocument, query: str) -> List[Tuple[int, int]]:
+        """Case-insensitive substring search"""
+        if document.lowered is None or len(query.lower()) != len(query):
+            # Case folding changes lengths for this text; let re handle the offsets
+            matches = re.finditer(re.escape(query), document.content, re.IGNORECASE)
+            return [(m.start(), m.end()) for m in itertools.islice(matches, MAX_MATCHES)]
+
+        needle = query.lower()
+        haystack = document.lowered
+        spans = []
+        position = haystack.find(needle)
+        while position != -1 and len(spans) < MAX_MATCHES:
+            spans.append((position, position + len(needle)))
+            position = haystack.find(needle, position + len(needle))
+        return spans
+
+    def _find_words(self, document: _IndexedDocument, query: str) -> List[Tuple[int, int]]:
+        """Whole-word (token sequence) search using the token index"""
+        terms = [match.group().lower() for match in TOKEN_PATTERN.finditer(query)]
+        if not terms:
+            return []
+
+        starts, ends, positions = document.tokens
+        following = [set(positions.get(term, ())) for term in terms[1:]]
+
+        spans = []
+        for position in positions.get(terms[0], ()):
+            if all(position + i + 1 in later for i, later in enumerate(following)):
+                spans.append((starts[position], ends[position + len(terms) - 1]))
+                if len(spans) >= MAX_MATCHES:
+                    break
+        return spans
+
+    def _find_regex(self, document: _IndexedDocument, pattern: str) -> List[Tuple[int, int]]:
+        """Regex search in the helper process, killed if it exceeds the timeout"""
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression: {e}")
+
+        return self._regex_helper.search(document, pattern, MAX_MATCHES, self.regex_timeout)
+
+
+# Singleton instance
+document_searcher = DocumentSearcher()
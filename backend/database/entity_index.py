@@ -0,0 +1,198 @@
+import os
+import re
+import sqlite3
+from collections import defaultdict
+from contextlib import closing
+from typing import Dict, List, Any, Optional, Iterable
+
+# Words of an entity key; periods are dropped first so "U.S.C." and "USC" agree
+KEY_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def entity_key(text: str) -> str:
+    """
+    Normalized lookup key of an entity text
+
+    Case, punctuation and spacing are ignored, so "Acme Corp." and
+    "ACME Corp", or "42 U.S.C. § 1983" and "42 USC 1983", share a key.
+    """
+    return " ".join(KEY_TOKEN_PATTERN.findall(text.replace(".", "").casefold()))
+
+
+def _entity_key(entity: Dict[str, Any]) -> str:
+    # Citations and amounts carry a normalized form from the rule engine
+    return entity_key(entity.get("normalized") or entity["text"])
+
+
+class EntityIndex:
+    """
+    Corpus-wide index of analyzed entities, stored in SQLite.
+
+    Every entity is filed under its label and normalized key with its
+    document and offsets, and per-document counts are kept alongside, so
+    "which documents name Acme Corp" or "how often does each entity occur
+    in this document" are index lookups rather than scans of every stored
+    analysis.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    doc_id TEXT PRIMARY KEY,
+                    entities INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS entity_counts (
+                    label TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    doc_id TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    definition TEXT,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (key, label, doc_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_entity_counts_doc ON entity_counts(doc_id, label);
+                CREATE TABLE IF NOT EXISTS mentions (
+                    key TEXT NOT NULL,
+                    label TEXT NOT NULL,
+                    doc_id TEXT NOT NULL,
+                    start_char INTEGER NOT NULL,
+                    end_char INTEGER NOT NULL,
+                    PRIMARY KEY (key, label, doc_id, start_char)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_mentions_doc ON mentions(doc_id);
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the index database"""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def add_document(self, document_id: str, entities: Iterable[Dict[str, Any]]) -> int:
+        """
+        Index (or re-index) the entities of a document's analysis
+
+        Returns:
+            Number of entity mentions indexed
+        """
+        groups: Dict[tuple, Dict[str, Any]] = {}
+        mention_count = 0
+
+        def mentions():
+            # Generated while inserting, so very long entity lists are never held as rows
+            nonlocal mention_count
+            for entity in entities:
+                key = _entity_key(entity)
+                if not key:
+                    continue
+                label = entity["label"]
+                mention_count += 1
+
+                group = groups.get((key, label))
+                if group is None:
+                    # The first mention's text is shown for the group
+                    groups[(key, label)] = {"text": entity["text"], "definition": entity.get("definition"), "count": 1}
+                else:
+                    group["count"] += 1
+
+                yield key, label, document_id, entity["start_char"], entity["end_char"]
+
+        with closing(self._connect()) as conn, conn:
+            self._delete(conn, document_id)
+            conn.executemany("INSERT OR IGNORE INTO mentions VALUES (?, ?, ?, ?, ?)", mentions())
+            conn.executemany("INSERT INTO entity_counts VALUES (?, ?, ?, ?, ?, ?)",
+                             [(label, key, document_id, group["text"], group["definition"], group["count"])
+                              for (key, label), group in groups.items()])
+            conn.execute("INSERT INTO documents VALUES (?, ?)", (document_id, mention_count))
+        return mention_count
+
+    def remove_document(self, document_id: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            self._delete(conn, document_id)
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, document_id: str) -> None:
+        conn.execute("DELETE FROM mentions WHERE doc_id = ?", (document_id,))
+        conn.execute("DELETE FROM entity_counts WHERE doc_id = ?", (document_id,))
+        conn.execute("DELETE FROM documents WHERE doc_id = ?", (document_id,))
+
+    def has_document(self, document_id: str) -> bool:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT 1 FROM documents WHERE doc_id = ?", (document_id,)).fetchone() is not None
+
+    def document_entities(self, document_id: str, label: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Distinct entities of one document with their occurrence counts
+
+        Args:
+            document_id: Document ID
+            label: Only return entities with this label
+
+        Returns:
+            Entities with text, label, definition and count, most frequent first
+        """
+        sql = "SELECT text, label, definition, count FROM entity_counts WHERE doc_id = ?"
+        params = [document_id]
+        if label:
+            sql += " AND label = ?"
+            params.append(label)
+        sql += " ORDER BY count DESC, text"
+
+        with closing(self._connect()) as conn:
+            return [{"text": text, "label": label, "definition": definition or "", "count": count}
+                    for text, label, definition, count in conn.execute(sql, params)]
+
+    def document_labels(self, document_id: str) -> List[str]:
+        """Entity labels present in a document"""
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT label FROM entity_counts WHERE doc_id = ? ORDER BY label", (document_id,))]
+
+    def find_documents(self, text: str, label: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Documents mentioning an entity
+
+        Args:
+            text: Entity text, e.g. "Acme Corp" or "42 U.S.C. § 1983"
+            label: Only match entities with this label
+            limit: Maximum number of documents
+
+        Returns:
+            Documents with document ID, matched text and labels and the
+            number of mentions, most mentions first
+        """
+        sql = "SELECT doc_id, label, text, count FROM entity_counts WHERE key = ?"
+        params: List[Any] = [entity_key(text)]
+        if label:
+            sql += " AND label = ?"
+            params.append(label)
+
+        documents = defaultdict(lambda: {"labels": [], "count": 0})
+        with closing(self._connect()) as conn:
+            for doc_id, matched_label, matched_text, count in conn.execute(sql, params):
+                document = documents[doc_id]
+                document.setdefault("text", matched_text)
+                document["labels"].append(matched_label)
+                document["count"] += count
+
+        results = [{"document_id": doc_id, **document} for doc_id, document in documents.items()]
+        results.sort(key=lambda result: (-result["count"], result["document_id"]))
+        return results[:limit]
+
+    def mentions(self, document_id: str, text: str, label: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Offsets of an entity's mentions in a document, in document order"""
+        sql = "SELECT label, start_char, end_char FROM mentions WHERE key = ? AND doc_id = ?"
+        params: List[Any] = [entity_key(text), document_id]
+        if label:
+            sql += " AND label = ?"
+            params.append(label)
+        sql += " ORDER BY start_char"
+
+        with closing(self._connect()) as conn:
+            return [{"label": label, "start_char": start, "end_char": end}
+                    for label, start, end in conn.execute(sql, params)]
@@ -0,0 +1,151 @@
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, IO
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = "w", encoding: str = None) -> Iterator[IO]:
+    """
+    Open a file for writing so that readers only ever see the old or the new
+    contents, never a partial write.
+
+    Data goes to a temporary file in the same directory, which is flushed,
+    fsynced and then renamed over the target. If the block raises, the
+    target is left untouched.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class _LockState:
+    """Per-path lock state shared by every FileLock on that path in this process"""
+
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.file = None
+
+
+class FileLock:
+    """
+    Exclusive inter-process lock backed by a lock file.
+
+    Threads in the same process are serialized with an in-process lock as
+    well, and the lock is re-entrant for the thread holding it, so it can be
+    taken from Streamlit's script threads and from separate worker processes.
+    """
+
+    _states: Dict[str, _LockState] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        with FileLock._registry_lock:
+            self._state = FileLock._states.setdefault(self.path, _LockState())
+
+    def acquire(self) -> None:
+        state = self._state
+        state.thread_lock.acquire()
+        state.depth += 1
+        if state.depth > 1:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            state.file = open(self.path, "a+b")
+            if fcntl is not None:
+                fcntl.flock(state.file.fileno(), fcntl.LOCK_EX)
+            else:
+                state.file.seek(0)
+                msvcrt.locking(state.file.fileno(), msvcrt.LK_LOCK, 1)
+        except BaseException:
+            state.depth -= 1
+            if state.file is not None:
+                state.file.close()
+                state.file = None
+            state.thread_lock.release()
+            raise
+
+    def release(self) -> None:
+        state = self._state
+        state.depth -= 1
+        if state.depth == 0:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(state.file.fileno(), fcntl.LOCK_UN)
+                else:
+                    state.file.seek(0)
+                    msvcrt.locking(state.file.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                state.file.close()
+                state.file = None
+        state.thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+
+class _Flight:
+    """A computation in progress and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls: while a call for a key is running, other
+    callers with the same key wait for it and receive the same result (or
+    exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Any, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
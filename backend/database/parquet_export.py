@@ -0,0 +1,271 @@
+"""
+Bulk export of the corpus to Parquet for analytics.
+
+Writes three tables under the output directory, each partitioned by
+upload month (upload_month=YYYY-MM):
+
+    documents/  one row per document: metadata, document type, analysis
+                timestamp and entity / clause counts
+    clauses/    one row per key clause (offsets, no text)
+    entities/   one row per entity mention
+
+Documents are streamed from DatabaseHandler and written in batches of
+bounded size, so memory use does not grow with the corpus. After the
+first run only documents whose metadata or analysis changed since the
+previous run are exported; their new rows are appended with a later
+exported_at, and read_table() keeps just the latest rows per document.
+
+Usage:
+    python -m backend.database.parquet_export --out data/exports
+    python -m backend.database.parquet_export --out data/exports --full
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+import datetime
+from typing import Dict, List, Any, Optional
+
+from backend.database.locking import FileLock, atomic_open
+
+TABLES = ("documents", "clauses", "entities")
+
+PARTITION_COLUMN = "upload_month"
+
+# Column types per table, so every batch writes the same Parquet schema
+# even when a column happens to be empty in it
+SCHEMAS = {
+    "documents": {
+        "doc_id": "string", "filename": "string", "upload_date": "datetime64[ns]", "upload_month": "string",
+        "version": "Int64", "parent_id": "string", "root_id": "string", "duplicate_of": "string",
+        "content_length": "Int64", "analyzed": "boolean", "document_type": "string",
+        "analysis_timestamp": "datetime64[ns]", "summary_backend": "string", "entity_count": "Int64",
+        "clause_count": "Int64", "exported_at": "datetime64[ns]",
+    },
+    "clauses": {
+        "doc_id": "string", "upload_month": "string", "document_type": "string", "title": "string",
+        "type": "string", "confidence": "float64", "importance": "float64", "start_char": "Int64",
+        "end_char": "Int64", "exported_at": "datetime64[ns]",
+    },
+    "entities": {
+        "doc_id": "string", "upload_month": "string", "document_type": "string", "text": "string",
+        "label": "string", "normalized": "string", "start_char": "Int64", "end_char": "Int64",
+        "exported_at": "datetime64[ns]",
+    },
+}
+
+# A batch is written once it holds this many documents or entity and clause rows
+DEFAULT_BATCH_DOCUMENTS = 1000
+DEFAULT_BATCH_ROWS = 250_000
+
+# Run bookkeeping; the leading underscore keeps Parquet readers from treating it as data
+STATE_FILENAME = "_export_state.json"
+
+
+def _upload_month(upload_date: Optional[str]) -> str:
+    return upload_date[:7] if upload_date and len(upload_date) >= 7 else "unknown"
+
+
+class ParquetExporter:
+    """Streams documents and analyses from a DatabaseHandler into partitioned Parquet tables"""
+
+    def __init__(self, db, directory: str, batch_documents: int = DEFAULT_BATCH_DOCUMENTS,
+                 batch_rows: int = DEFAULT_BATCH_ROWS):
+        """
+        Args:
+            db: DatabaseHandler to export
+            directory: Output directory; one subdirectory per table
+            batch_documents: Documents per written batch
+            batch_rows: Clause and entity rows per written batch (a single
+                document's rows are never split)
+        """
+        self.db = db
+        self.directory = directory
+        self.batch_documents = batch_documents
+        self.batch_rows = batch_rows
+        self.state_path = os.path.join(directory, STATE_FILENAME)
+        os.makedirs(directory, exist_ok=True)
+
+    def load_state(self) -> Dict[str, Any]:
+        """Bookkeeping of the last run, or an empty dict before the first one"""
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def export(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Export documents changed since the last run (all of them on the first run)
+
+        Args:
+            full: Replace the existing tables with a fresh export of everything
+
+        Returns:
+            Run statistics: document, clause and entity rows written, batches,
+            seconds, and the time of the previous run (None for a full export)
+        """
+        import pandas  # noqa: F401 - fail before touching the tables if pandas is missing
+
+        with FileLock(os.path.join(self.directory, "_export.lock")):
+            state = self.load_state()
+            since = None if full else state.get("started")
+            if since is None:
+                for table in TABLES:
+                    shutil.rmtree(os.path.join(self.directory, table), ignore_errors=True)
+
+            # Anything written from here on is picked up again by the next run
+            started = time.time()
+            exported_at = datetime.datetime.now().isoformat()
+            stats = {"documents": 0, "clauses": 0, "entities": 0, "batches": 0}
+
+            batch = self._new_batch()
+            for metadata in self.db.iter_documents(changed_since=since):
+                self._add_document(batch, metadata, exported_at)
+                if (len(batch["documents"]["doc_id"]) >= self.batch_documents
+                        or len(batch["clauses"]["doc_id"]) + len(batch["entities"]["doc_id"]) >= self.batch_rows):
+                    self._flush(batch, stats)
+                    batch = self._new_batch()
+            self._flush(batch, stats)
+
+            stats["seconds"] = round(time.time() - started, 2)
+            stats["since"] = datetime.datetime.fromtimestamp(since).isoformat() if since else None
+            with atomic_open(self.state_path, 'w') as f:
+                json.dump({"started": started, "exported_at": exported_at, "runs": state.get("runs", 0) + 1,
+                           "last_run": stats}, f, indent=2)
+            return stats
+
+    @staticmethod
+    def _new_batch() -> Dict[str, Dict[str, List[Any]]]:
+        return {table: {column: [] for column in SCHEMAS[table]} for table in TABLES}
+
+    def _add_document(self, batch: Dict[str, Dict[str, List[Any]]], metadata: Dict[str, Any],
+                      exported_at: str) -> None:
+        """Append one document's rows to the batch, reading its analysis in columnar form"""
+        doc_id = metadata["id"]
+        month = _upload_month(metadata.get("upload_date"))
+        analysis = self.db.analysis_store.load_encoded(doc_id) or {}
+        document_type = analysis.get("document_type")
+        entities = analysis.get("entities")
+        clauses = analysis.get("key_clauses")
+
+        row = {
+            "doc_id": doc_id,
+            "filename": metadata.get("filename"),
+            "upload_date": metadata.get("upload_date"),
+            "upload_month": month,
+            "version": metadata.get("version", 1),
+            "parent_id": metadata.get("parent_id"),
+            "root_id": metadata.get("root_id"),
+            "duplicate_of": metadata.get("duplicate_of"),
+            "content_length": metadata.get("content_length"),
+            "analyzed": bool(analysis),
+            "document_type": document_type,
+            "analysis_timestamp": analysis.get("timestamp"),
+            "summary_backend": (analysis.get("summary_settings") or {}).get("backend"),
+            "entity_count": entities["count"] if entities else None,
+            "clause_count": clauses["count"] if clauses else None,
+            "exported_at": exported_at,
+        }
+        for column, value in row.items():
+            batch["documents"][column].append(value)
+
+        shared = {"doc_id": doc_id, "upload_month": month, "document_type": document_type, "exported_at": exported_at}
+
+        if clauses and clauses["count"]:
+            columns = batch["clauses"]
+            for column, value in shared.items():
+                columns[column].extend([value] * clauses["count"])
+            for column in ("title", "type", "confidence", "importance", "start_char", "end_char"):
+                columns[column].extend(clauses["columns"][column])
+
+        if entities and entities["count"]:
+            columns = batch["entities"]
+            for column, value in shared.items():
+                columns[column].extend([value] * entities["count"])
+            # Labels and texts are dictionary-encoded in the stored analysis
+            labels, texts = entities["labels"], entities["texts"]
+            columns["label"].extend(labels[i] for i in entities["columns"]["label"])
+            columns["text"].extend(texts[i] for i in entities["columns"]["text"])
+            columns["start_char"].extend(entities["columns"]["start_char"])
+            columns["end_char"].extend(entities["columns"]["end_char"])
+            extra = entities["extra"]
+            columns["normalized"].extend(extra.get(str(i), {}).get("normalized") for i in range(entities["count"]))
+
+    def _flush(self, batch: Dict[str, Dict[str, List[Any]]], stats: Dict[str, int]) -> None:
+        """Write each table's rows of the batch as new files in its partitions"""
+        import pandas as pd
+
+        written = False
+        for table in TABLES:
+            columns = batch[table]
+            if not columns["doc_id"]:
+                continue
+            frame = pd.DataFrame(columns)
+            for column, dtype in SCHEMAS[table].items():
+                if dtype.startswith("datetime"):
+                    frame[column] = pd.to_datetime(frame[column], errors="coerce")
+                else:
+                    frame[column] = frame[column].astype(dtype)
+            frame.to_parquet(os.path.join(self.directory, table), engine="pyarrow", index=False,
+                             partition_cols=[PARTITION_COLUMN])
+            stats[table] += len(frame)
+            written = True
+        if written:
+            stats["batches"] += 1
+
+
+def read_table(directory: str, table: str, latest_only: bool = True, **kwargs: Any):
+    """
+    Load an exported table into a pandas DataFrame
+
+    Args:
+        directory: Export directory
+        table: One of TABLES
+        latest_only: Drop rows superseded by a later incremental export of
+            the same document
+        **kwargs: Passed to pandas.read_parquet (e.g. columns, filters)
+
+    Returns:
+        The table as a DataFrame
+    """
+    import pandas as pd
+
+    path = os.path.join(directory, table)
+    if not latest_only:
+        return pd.read_parquet(path, engine="pyarrow", **kwargs)
+
+    columns = kwargs.get("columns")
+    if columns is not None:
+        kwargs["columns"] = list(dict.fromkeys(list(columns) + ["doc_id", "exported_at"]))
+    frame = pd.read_parquet(path, engine="pyarrow", **kwargs)
+
+    # Every export writes a documents row, even for a document whose analysis now has no clauses
+    # or entities, so its latest export is taken from there rather than from the rows read
+    documents = pd.read_parquet(os.path.join(directory, "documents"), engine="pyarrow",
+                                columns=["doc_id", "exported_at"])
+    latest = documents.groupby("doc_id", observed=True)["exported_at"].max()
+    frame = frame[frame["exported_at"] == frame["doc_id"].map(latest)].reset_index(drop=True)
+    return frame[list(columns)] if columns is not None else frame
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=os.path.join("data", "exports"), help="Output directory")
+    parser.add_argument("--full", action="store_true", help="Re-export everything instead of changes since the last run")
+    parser.add_argument("--batch-documents", type=int, default=DEFAULT_BATCH_DOCUMENTS)
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS)
+    args = parser.parse_args()
+
+    from backend.database.db_handler import db_handler
+
+    exporter = ParquetExporter(db_handler, args.out, args.batch_documents, args.batch_rows)
+    stats = exporter.export(full=args.full)
+    since = f" changed since {stats['since']}" if stats["since"] else ""
+    print(f"Exported {stats['documents']} documents{since}, {stats['clauses']} clauses and "
+          f"{stats['entities']} entities in {stats['batches']} batches ({stats['seconds']}s) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
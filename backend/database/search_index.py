@@ -0,0 +1,390 @@
+import os
+import re
+import math
+import heapq
+import sqlite3
+from contextlib import closing
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
+
+# Tokens are runs of word characters, matched case-insensitively
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# BM25 ranking parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Maximum number of index terms a single prefix query may expand to
+MAX_PREFIX_EXPANSIONS = 64
+
+# Candidate sets up to this size are resolved with key lookups instead of scans
+CANDIDATE_LOOKUP_LIMIT = 500
+
+
+def tokenize(text: str) -> List[Tuple[str, int]]:
+    """Split text into (lowercased token, character offset) pairs"""
+    return [(match.group().lower(), match.start()) for match in TOKEN_PATTERN.finditer(text)]
+
+
+def parse_query(query: str) -> List[Dict[str, Any]]:
+    """
+    Parse a search query into clauses.
+
+    Supported syntax:
+        liquidated damages     -> two term clauses (both must match)
+        "liquidated damages"   -> one phrase clause
+        indemn*                -> one prefix clause
+
+    Args:
+        query: Raw query string
+
+    Returns:
+        List of clauses, each with a "type" and "terms"
+    """
+    clauses = []
+    for match in re.finditer(r'"([^"]*)"|(\S+)', query):
+        if match.group(1) is not None:
+            terms = [token for token, _ in tokenize(match.group(1))]
+            if len(terms) == 1:
+                clauses.append({"type": "term", "terms": terms})
+            elif terms:
+                clauses.append({"type": "phrase", "terms": terms})
+            continue
+
+        word = match.group(2)
+        is_prefix = word.endswith("*")
+        terms = [token for token, _ in tokenize(word)]
+        if not terms:
+            continue
+        if is_prefix and len(terms) == 1:
+            clauses.append({"type": "prefix", "terms": terms})
+        elif len(terms) == 1:
+            clauses.append({"type": "term", "terms": terms})
+        else:
+            # Words like "non-compete" tokenize to several terms; treat as a phrase
+            clauses.append({"type": "phrase", "terms": terms})
+
+    return clauses
+
+
+def _parse_ints(value: str) -> List[int]:
+    """Decode a comma-separated integer list"""
+    return [int(item) for item in value.split(",")] if value else []
+
+
+class SearchIndex:
+    """
+    On-disk inverted index over document content, stored in SQLite.
+
+    Each (term, document) pair keeps its term frequency, token positions
+    (for phrase queries) and character offsets (for snippets). Documents
+    are indexed incrementally: re-indexing a document only replaces its
+    own postings.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+
+        with closing(self._connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    doc_id TEXT PRIMARY KEY,
+                    filename TEXT,
+                    length INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    doc_id TEXT NOT NULL,
+                    tf INTEGER NOT NULL,
+                    positions TEXT NOT NULL,
+                    offsets TEXT NOT NULL,
+                    PRIMARY KEY (term, doc_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings(doc_id);
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the index database"""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def add_document(self, document_id: str, text: str, filename: Optional[str] = None) -> None:
+        """
+        Index (or re-index) a single document.
+
+        Args:
+            document_id: Document ID
+            text: Full document content
+            filename: Optional filename shown in results
+        """
+        with closing(self._connect()) as conn, conn:
+            self._write_document(conn, document_id, text, filename)
+
+    def add_documents(self, documents: Iterable[Dict[str, Any]], batch_size: int = 500) -> int:
+        """Index several documents given as dicts with id, content and filename"""
+        count = 0
+        with closing(self._connect()) as conn:
+            for document in documents:
+                self._write_document(conn, document["id"], document["content"], document.get("filename"))
+                count += 1
+                # Commit in batches so bulk loads don't pay one transaction per document
+                if count % batch_size == 0:
+                    conn.commit()
+            conn.commit()
+        return count
+
+    def _write_document(self, conn: sqlite3.Connection, document_id: str, text: str,
+                        filename: Optional[str]) -> None:
+        """Replace a document's postings within the current transaction"""
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        tokens = tokenize(text)
+        for position, (token, offset) in enumerate(tokens):
+            entry = postings.setdefault(token, ([], []))
+            entry[0].append(position)
+            entry[1].append(offset)
+
+        rows = [
+            (term, document_id, len(positions),
+             ",".join(map(str, positions)), ",".join(map(str, offsets)))
+            for term, (positions, offsets) in postings.items()
+        ]
+
+        conn.execute("DELETE FROM postings WHERE doc_id = ?", (document_id,))
+        conn.execute(
+            "INSERT OR REPLACE INTO documents (doc_id, filename, length) VALUES (?, ?, ?)",
+            (document_id, filename, len(tokens)),
+        )
+        conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?, ?)", rows)
+
+    def remove_document(self, document_id: str) -> None:
+        """Remove a document from the index"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM postings WHERE doc_id = ?", (document_id,))
+            conn.execute("DELETE FROM documents WHERE doc_id = ?", (document_id,))
+
+    def document_count(self) -> int:
+        """Number of indexed documents"""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def search(self, query: str, limit: int = 10,
+               content_reader: Optional[Callable[[str, int, int], str]] = None,
+               snippet_chars: int = 80) -> List[Dict[str, Any]]:
+        """
+        Search the corpus.
+
+        Args:
+            query: Query string (see parse_query for the syntax)
+            limit: Maximum number of results
+            content_reader: Optional callable (doc_id, start, end) -> text used
+                to build snippets around the first match
+            snippet_chars: Characters of context on each side of a snippet
+
+        Returns:
+            Ranked list of results with document_id, filename, score, matches
+            and (if a content reader is given) snippet and highlight spans
+        """
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+
+        with closing(self._connect()) as conn:
+            total_docs, avg_length = conn.execute(
+                "SELECT COUNT(*), AVG(length) FROM documents").fetchone()
+            if not total_docs:
+                return []
+
+            # Evaluate each clause, starting with the rarest to keep candidate sets small
+            clause_hits = []
+            candidates = None
+            estimates = sorted(((self._estimate_df(conn, c), i) for i, c in enumerate(clauses)))
+            for df, i in estimates:
+                hits = self._evaluate_clause(conn, clauses[i], candidates)
+                if not hits:
+                    return []
+                clause_hits.append((min(max(df, len(hits)), total_docs), hits))
+                candidates = set(hits) if candidates is None else candidates & set(hits)
+                if not candidates:
+                    return []
+
+            lengths = self._fetch_lengths(conn, candidates)
+
+            # Rank candidates with BM25 over all clauses
+            results = []
+            for doc_id in candidates:
+                length, filename = lengths.get(doc_id, (0, None))
+                score = 0.0
+                matches = 0
+                for df, hits in clause_hits:
+                    tf = hits[doc_id]["tf"]
+                    idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / (avg_length or 1))
+                    score += idf * tf * (BM25_K1 + 1) / norm
+                    matches += tf
+                results.append({
+                    "document_id": doc_id,
+                    "filename": filename,
+                    "score": score,
+                    "matches": matches,
+                })
+
+            results = heapq.nlargest(limit, results, key=lambda r: r["score"])
+
+            # Build snippets around the first occurrence of the rarest clause
+            if content_reader is not None:
+                rarest_hits = clause_hits[0][1]
+                for result in results:
+                    span = rarest_hits[result["document_id"]]["span"](conn)
+                    if span is not None:
+                        result.update(self._build_snippet(result["document_id"], span,
+                                                          content_reader, snippet_chars))
+
+        return results
+
+    def _estimate_df(self, conn: sqlite3.Connection, clause: Dict[str, Any]) -> int:
+        """Estimate how many documents a clause matches (used for evaluation order)"""
+        if clause["type"] == "prefix":
+            low, high = self._prefix_bounds(clause["terms"][0])
+            row = conn.execute(
+                "SELECT COUNT(*) FROM postings WHERE term >= ? AND term < ?", (low, high)).fetchone()
+        else:
+            row = conn.execute(
+                "SELECT MIN(cnt) FROM (SELECT COUNT(*) AS cnt FROM postings WHERE term IN (%s) GROUP BY term)"
+                % ",".join("?" * len(clause["terms"])), clause["terms"]).fetchone()
+        return row[0] or 0
+
+    @staticmethod
+    def _prefix_bounds(prefix: str) -> Tuple[str, str]:
+        """Range of index terms sharing a prefix"""
+        return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+    def _fetch_postings(self, conn: sqlite3.Connection, term: str, candidates: Optional[set],
+                        with_positions: bool = True) -> Dict[str, Tuple[int, str, str]]:
+        """Fetch (tf, positions, offsets) for a term, optionally restricted to candidates"""
+        # Position lists are only decoded for phrase queries; term queries need just tf
+        columns = "doc_id, tf, positions, offsets" if with_positions else "doc_id, tf, '', ''"
+        if candidates is not None and len(candidates) <= CANDIDATE_LOOKUP_LIMIT:
+            # Few candidates: point lookups on the (term, doc_id) key beat a full posting scan
+            batch = list(candidates)
+            rows = conn.execute(
+                "SELECT %s FROM postings WHERE term = ? AND doc_id IN (%s)"
+                % (columns, ",".join("?" * len(batch))), [term] + batch)
+        else:
+            rows = conn.execute("SELECT %s FROM postings WHERE term = ?" % columns, (term,))
+        return {
+            doc_id: (tf, positions, offsets)
+            for doc_id, tf, positions, offsets in rows
+            if candidates is None or doc_id in candidates
+        }
+
+    def _evaluate_clause(self, conn: sqlite3.Connection, clause: Dict[str, Any],
+                         candidates: Optional[set]) -> Dict[str, Dict[str, Any]]:
+        """Return {doc_id: {"tf": int, "span": callable}} for documents matching a clause"""
+        hits = {}
+
+        if clause["type"] in ("term", "prefix"):
+            if clause["type"] == "term":
+                terms = clause["terms"]
+            else:
+                low, high = self._prefix_bounds(clause["terms"][0])
+                terms = [row[0] for row in conn.execute(
+                    "SELECT term FROM postings WHERE term >= ? AND term < ? "
+                    "GROUP BY term ORDER BY COUNT(*) DESC LIMIT ?", (low, high, MAX_PREFIX_EXPANSIONS))]
+
+            for term in terms:
+                for doc_id, (tf, _, _) in self._fetch_postings(conn, term, candidates, False).items():
+                    if doc_id in hits:
+                        hits[doc_id]["tf"] += tf
+                    else:
+                        hits[doc_id] = {"tf": tf, "span": self._first_span(terms, doc_id)}
+
+        else:
+            # Phrase: intersect postings, then verify consecutive positions
+            term_postings = []
+            for term in clause["terms"]:
+                postings = self._fetch_postings(conn, term, candidates)
+                if not postings:
+                    return {}
+                term_postings.append(postings)
+                candidates = set(postings) if candidates is None else candidates & set(postings)
+
+            for doc_id in candidates or ():
+                first_positions = _parse_ints(term_postings[0][doc_id][1])
+                following = [set(_parse_ints(postings[doc_id][1])) for postings in term_postings[1:]]
+                starts = [
+                    position for position in first_positions
+                    if all(position + i + 1 in positions for i, positions in enumerate(following))
+                ]
+                if starts:
+                    hits[doc_id] = {
+                        "tf": len(starts),
+                        "span": self._phrase_span(starts[0], term_postings[0][doc_id],
+                                                  term_postings[-1][doc_id], len(clause["terms"])),
+                    }
+
+        return hits
+
+    @staticmethod
+    def _first_span(terms: List[str], document_id: str) -> Callable[[sqlite3.Connection], Optional[Tuple[int, int]]]:
+        """Lazily look up the offset of the first occurrence of any of the terms"""
+        def span(conn):
+            firsts = [
+                _parse_ints(row[0])[0]
+                for row in conn.execute(
+                    "SELECT offsets FROM postings WHERE term IN (%s) AND doc_id = ?" % ",".join("?" * len(terms)),
+                    list(terms) + [document_id])
+                if row[0]
+            ]
+            return (min(firsts), min(firsts)) if firsts else None
+        return span
+
+    @staticmethod
+    def _phrase_span(start_position: int, first_posting: Tuple[int, str, str],
+                     last_posting: Tuple[int, str, str], length: int) -> Callable[[sqlite3.Connection], Tuple[int, int]]:
+        """Lazily compute the (start, last token start) offsets of a phrase occurrence"""
+        def span(conn):
+            first = dict(zip(_parse_ints(first_posting[1]), _parse_ints(first_posting[2])))
+            last = dict(zip(_parse_ints(last_posting[1]), _parse_ints(last_posting[2])))
+            return first[start_position], last[start_position + length - 1]
+        return span
+
+    def _fetch_lengths(self, conn: sqlite3.Connection, doc_ids: Iterable[str]) -> Dict[str, Tuple[int, str]]:
+        """Fetch token lengths and filenames for a set of documents"""
+        doc_ids = list(doc_ids)
+        lengths = {}
+        if len(doc_ids) > CANDIDATE_LOOKUP_LIMIT:
+            # Large candidate sets: one sequential scan is cheaper than many IN lookups
+            wanted = set(doc_ids)
+            for doc_id, length, filename in conn.execute("SELECT doc_id, length, filename FROM documents"):
+                if doc_id in wanted:
+                    lengths[doc_id] = (length, filename)
+            return lengths
+        for i in range(0, len(doc_ids), 500):
+            batch = doc_ids[i:i + 500]
+            rows = conn.execute(
+                "SELECT doc_id, length, filename FROM documents WHERE doc_id IN (%s)" % ",".join("?" * len(batch)),
+                batch)
+            for doc_id, length, filename in rows:
+                lengths[doc_id] = (length, filename)
+        return lengths
+
+    def _build_snippet(self, document_id: str, span: Tuple[int, int],
+                       content_reader: Callable[[str, int, int], str], snippet_chars: int) -> Dict[str, Any]:
+        """Read the text around a match and locate the highlight inside it"""
+        match_start, last_token_start = span
+
+        window_start = max(0, match_start - snippet_chars)
+        window = content_reader(document_id, window_start, last_token_start + snippet_chars + 64)
+
+        # The last token ends where its word-character run ends
+        token = TOKEN_PATTERN.match(window, last_token_start - window_start)
+        highlight_end = token.end() if token else last_token_start - window_start
+        snippet_end = min(len(window), highlight_end + snippet_chars)
+
+        return {
+            "snippet": window[:snippet_end],
+            "snippet_start": window_start,
+            "highlights": [(match_start - window_start, highlight_end)],
+        }
@@ -0,0 +1,154 @@
+"""
+Document processors.
+
+Importing this package is cheap: processor classes are imported on first
+attribute access (PEP 562), and the shared instances returned by
+get_summarizer() and friends are built on first call, so torch,
+transformers and spaCy load only when a page actually needs them.
+prewarm() loads them on a background thread instead, e.g. at server
+start.
+"""
+import os
+import logging
+import importlib
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Set to 1 to load the processors and models in the background at server start
+PREWARM_ENV = "LEGALEASE_PREWARM"
+
+logger = logging.getLogger(__name__)
+
+_LAZY_EXPORTS = {
+    "ClauseIdentifier": "backend.processors.clause_identifier",
+    "DocumentProcessor": "backend.processors.document_processor",
+    "EntityExtractor": "backend.processors.entity_extractor",
+    "ExtractiveSummarizer": "backend.processors.extractive_summarizer",
+    "IncrementalAnalyzer": "backend.processors.incremental_analysis",
+    "Summarizer": "backend.processors.summarizer",
+    "AnalysisWorkerPool": "backend.processors.worker_pool",
+}
+
+__all__ = list(_LAZY_EXPORTS) + [
+    "get_summarizer", "get_extractive_summarizer", "get_entity_extractor", "get_clause_identifier",
+    "get_incremental_analyzer", "index_key_clauses", "prewarm", "start_prewarm",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
+
+_instances: Dict[str, Any] = {}
+_instance_locks: Dict[str, threading.Lock] = {}
+_instances_lock = threading.Lock()
+
+
+def _shared(name: str, factory: Callable[[], Any]) -> Any:
+    """Process-wide instance, built once even when several threads ask at the same time"""
+    instance = _instances.get(name)
+    if instance is None:
+        # One lock per instance, so building the summarizer doesn't hold up the others
+        with _instances_lock:
+            lock = _instance_locks.setdefault(name, threading.Lock())
+        with lock:
+            instance = _instances.get(name)
+            if instance is None:
+                instance = _instances[name] = factory()
+    return instance
+
+
+def get_summarizer():
+    """Shared Summarizer (the BART model itself loads on first summary)"""
+    return _shared("summarizer", lambda: __getattr__("Summarizer")())
+
+
+def get_extractive_summarizer():
+    return _shared("extractive_summarizer", lambda: __getattr__("ExtractiveSummarizer")())
+
+
+def get_entity_extractor():
+    return _shared("entity_extractor", lambda: __getattr__("EntityExtractor")())
+
+
+def get_clause_identifier():
+    return _shared("clause_identifier", lambda: __getattr__("ClauseIdentifier")())
+
+
+def get_incremental_analyzer():
+    return _shared("incremental_analyzer", lambda: __getattr__("IncrementalAnalyzer")(
+        get_summarizer(), get_entity_extractor(), get_clause_identifier()))
+
+
+def index_key_clauses(db, document_id: str, key_clauses: List[Dict[str, Any]]) -> None:
+    """
+    Embed a document's key clauses and add them to the corpus clause index
+
+    Every analysis path (the Document View and the worker pool) calls this
+    before saving, so similar-clause search covers documents however they
+    were analyzed.
+    """
+    db.index_clauses(document_id, key_clauses, get_clause_identifier().embed_clauses(key_clauses))
+
+
+# Prewarm order: the spaCy pipeline (shared by the next three) first, the summarization model last
+PREWARM_STEPS = {
+    "entity_extractor": get_entity_extractor,
+    "clause_identifier": get_clause_identifier,
+    "extractive_summarizer": get_extractive_summarizer,
+    "summarizer": get_summarizer,
+    "summarization_model": lambda: get_summarizer().model,
+}
+
+
+def prewarm(steps: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """
+    Build the shared processors and load their models now
+
+    Args:
+        steps: Names from PREWARM_STEPS (default: all)
+
+    Returns:
+        Seconds taken by each step; a failed step is logged and skipped
+    """
+    import time
+
+    timings = {}
+    for name in steps or PREWARM_STEPS:
+        started = time.perf_counter()
+        try:
+            PREWARM_STEPS[name]()
+        except Exception:
+            # Runs on a background thread, so the log is the only place this shows
+            logger.exception("Prewarming %s failed", name)
+            continue
+        timings[name] = round(time.perf_counter() - started, 3)
+    return timings
+
+
+_prewarm_thread: Optional[threading.Thread] = None
+
+
+def start_prewarm(force: bool = False) -> Optional[threading.Thread]:
+    """
+    Start prewarm() on a daemon thread, once per process
+
+    Does nothing unless $LEGALEASE_PREWARM is set to 1 or force is True.
+    """
+    global _prewarm_thread
+    if not force and os.environ.get(PREWARM_ENV) != "1":
+        return None
+
+    with _instances_lock:
+        if _prewarm_thread is None:
+            _prewarm_thread = threading.Thread(target=prewarm, name="processor-prewarm", daemon=True)
+            _prewarm_thread.start()
+    return _prewarm_thread
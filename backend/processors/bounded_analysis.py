@@ -0,0 +1,281 @@
+import gc
+import os
+import re
+import json
+import time
+import heapq
+import ctypes
+import tempfile
+import weakref
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional
+
+from backend.processors import get_entity_extractor, get_clause_identifier, get_extractive_summarizer
+from backend.processors.doc_cache import parsed_doc_cache
+from backend.processors.document_processor import DocumentProcessor
+from backend.processors.instrumentation import stage, current_rss
+
+# Peak resident memory (MB) allowed while analyzing a large document; unset means no ceiling
+MEMORY_BUDGET_ENV = "LEGALEASE_MEMORY_BUDGET_MB"
+
+# Documents longer than this (in characters) are analyzed section by section. It is
+# spaCy's default nlp.max_length: a single parse of anything longer raises E088.
+LARGE_DOCUMENT_CHARS = 1_000_000
+
+# Characters read, parsed and analyzed at a time, well below LARGE_DOCUMENT_CHARS
+DEFAULT_SECTION_CHARS = 200_000
+MIN_SECTION_CHARS = 20_000
+
+# Length of each section's summary; the final summary is made from these
+SECTION_SUMMARY_WORDS = 60
+
+# Number of top clauses kept, as in ClauseIdentifier.identify_key_clauses
+MAX_CLAUSES = 10
+
+# Above this share of the budget, caches are dropped and sections get smaller
+BUDGET_HEADROOM = 0.85
+
+DEFAULT_SPILL_DIR = os.path.join("data", "spill")
+
+
+def configured_memory_budget() -> Optional[float]:
+    """Memory ceiling configured through $LEGALEASE_MEMORY_BUDGET_MB, if any"""
+    value = os.environ.get(MEMORY_BUDGET_ENV)
+    return float(value) if value else None
+
+
+def _release_memory() -> None:
+    """Collect garbage and hand freed heap pages back to the operating system"""
+    gc.collect()
+    try:
+        # CPython keeps freed memory in the process; glibc can return it
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class SpilledRecords:
+    """
+    Records appended to a JSON-lines file and read back by iterating.
+
+    Behaves enough like a list (len() and repeated iteration) to be stored
+    as an analysis section, while holding only one record in memory at a
+    time. The file is removed when this object is garbage collected.
+    """
+
+    def __init__(self, directory: str, prefix: str):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix=prefix, suffix=".jsonl", dir=directory)
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+        self._count = 0
+        weakref.finalize(self, SpilledRecords._remove, self._file, self.path)
+
+    @staticmethod
+    def _remove(file, path: str) -> None:
+        file.close()
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self._file.write(json.dumps(record, separators=(",", ":")))
+            self._file.write("\n")
+            self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self._file.flush()
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+
+class BoundedAnalyzer:
+    """
+    Analyzes very large documents section by section within a memory budget.
+
+    The document is never loaded whole: it is read from the content store
+    in windows of section_chars characters, each cut at a section heading
+    or sentence end. Every window is parsed once (without the parse cache),
+    its entities and section summary are spilled to disk, and only the top
+    clauses so far are kept in memory. After each window the resident
+    memory is checked against the budget; when it gets close, caches are
+    dropped and later windows are made smaller.
+
+    The summary is built in two passes: each window gets a short
+    extractive summary, and those are summarized again to max_length.
+    """
+
+    def __init__(self, memory_budget_mb: Optional[float] = None, section_chars: int = DEFAULT_SECTION_CHARS,
+                 spill_dir: str = DEFAULT_SPILL_DIR):
+        """
+        Args:
+            memory_budget_mb: Ceiling on the process's resident memory in MB,
+                models included (default: $LEGALEASE_MEMORY_BUDGET_MB, or none)
+            section_chars: Characters analyzed at a time, before any shrinking
+            spill_dir: Directory for intermediate results
+        """
+        self.memory_budget_mb = memory_budget_mb if memory_budget_mb is not None else configured_memory_budget()
+        self.section_chars = section_chars
+        self.spill_dir = spill_dir
+        self.entity_extractor = get_entity_extractor()
+        self.clause_identifier = get_clause_identifier()
+        self.extractive = get_extractive_summarizer()
+        self.document_processor = DocumentProcessor()
+        self._boundary = re.compile("|".join(self.clause_identifier.section_patterns))
+
+    @staticmethod
+    def should_use(content_length: Optional[int]) -> bool:
+        """Whether a document of this length should be analyzed section by section"""
+        return bool(content_length) and content_length > LARGE_DOCUMENT_CHARS
+
+    @stage("bounded_analysis")
+    def analyze(self, length: int, read_span: Callable[[int, int], str], document_id: Optional[str] = None,
+                max_length: int = 500, focus_areas: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Analyze a stored document without loading all of it
+
+        Args:
+            length: Document length in characters
+            read_span: Callable (start, end) -> text of the document
+            document_id: Stored in the analysis and used to name spill files
+            max_length: Maximum length of the summary in words
+            focus_areas: Areas to focus on in the summary
+
+        Returns:
+            Analysis dictionary in the same form as a full analysis, plus a
+            "memory" entry with the budget, peak and section statistics.
+            "entities" is a SpilledRecords backed by a file on disk.
+        """
+        started = time.perf_counter()
+        prefix = f"{document_id or 'document'}-"
+        entities = SpilledRecords(self.spill_dir, prefix + "entities-")
+        summary_chunks = SpilledRecords(self.spill_dir, prefix + "summaries-")
+        top_clauses: List[tuple] = []
+
+        budget = self.memory_budget_mb * 2**20 if self.memory_budget_mb else None
+        section_chars = self.section_chars
+        peak = current_rss()
+        shrunk = 0
+        sections = 0
+        document_type = None
+
+        start = 0
+        while start < length:
+            text = read_span(start, min(length, start + section_chars))
+            if start + len(text) < length:
+                text = text[:self._cut(text)]
+            if not text:
+                break
+
+            # The type shows in the opening of a document; later sections would only add noise
+            if document_type is None:
+                document_type = self.document_processor.identify_document_type(text)
+
+            section_peak = self._analyze_section(start, text, document_type, focus_areas, entities, summary_chunks,
+                                                 top_clauses)
+            sections += 1
+            start += len(text)
+            del text
+
+            rss = current_rss()
+            peak = max(peak, section_peak, rss)
+            if budget and rss > budget * BUDGET_HEADROOM:
+                parsed_doc_cache.clear_memory()
+                _release_memory()
+                if section_chars > MIN_SECTION_CHARS:
+                    section_chars = max(MIN_SECTION_CHARS, section_chars // 2)
+                    shrunk += 1
+
+        combined = " ".join(chunk["summary"] for chunk in summary_chunks)
+        summary = self.extractive.generate_summary(combined, max_length=max_length, focus_areas=focus_areas)
+
+        key_clauses = [clause for _, _, clause in sorted(top_clauses, reverse=True)]
+        peak = max(peak, current_rss())
+        elapsed = round(time.perf_counter() - started, 3)
+
+        return {
+            "document_id": document_id,
+            "summary": summary,
+            "summary_chunks": list(summary_chunks),
+            "key_clauses": key_clauses,
+            "entities": entities,
+            "document_type": document_type or "general_legal_document",
+            "summary_settings": {
+                "backend": "extractive",
+                "mode": None,
+                "num_beams": None,
+                "chunks_total": sections,
+                "chunks_resumed": 0,
+                "chunks_abstractive": 0,
+                "coverage": 0.0,
+                "focus_areas": focus_areas,
+                "section_summary_words": SECTION_SUMMARY_WORDS,
+                "elapsed_seconds": elapsed,
+            },
+            "memory": {
+                "budget_mb": self.memory_budget_mb,
+                "peak_rss_mb": round(peak / 2**20, 1),
+                "within_budget": budget is None or peak <= budget,
+                "sections": sections,
+                "section_chars": self.section_chars,
+                "final_section_chars": section_chars,
+                "times_shrunk": shrunk,
+            },
+        }
+
+    def _analyze_section(self, offset: int, text: str, document_type: str, focus_areas: Optional[List[str]],
+                         entities: SpilledRecords, summary_chunks: SpilledRecords, top_clauses: List[tuple]) -> int:
+        """
+        Analyze one window, spilling its results and updating the top clauses
+
+        Returns:
+            Resident memory while the window's parse was alive, in bytes
+        """
+        # One parse shared by the entity and clause passes, dropped with the section
+        with parsed_doc_cache.transient():
+            section_entities = self.entity_extractor.extract_entities(text)
+            clauses = self.clause_identifier.identify_key_clauses(text, document_type, max_clauses=None)
+            rss = current_rss()
+
+        for entity in section_entities:
+            entity["start_char"] += offset
+            entity["end_char"] += offset
+        entities.extend(section_entities)
+
+        for clause in clauses:
+            clause["start_char"] += offset
+            clause["end_char"] += offset
+            # Earlier clauses win ties, as with the stable sort of a full analysis
+            item = (clause["importance"], -clause["start_char"], clause)
+            if len(top_clauses) < MAX_CLAUSES:
+                heapq.heappush(top_clauses, item)
+            elif item[:2] > top_clauses[0][:2]:
+                heapq.heapreplace(top_clauses, item)
+
+        summary_chunks.extend([{
+            "start": offset,
+            "end": offset + len(text),
+            "summary": self.extractive.generate_summary(text, max_length=SECTION_SUMMARY_WORDS,
+                                                        focus_areas=focus_areas),
+        }])
+        return max(rss, current_rss())
+
+    def _cut(self, text: str) -> int:
+        """End of a window: the last section heading or sentence end in its second half"""
+        half = len(text) // 2
+        last_heading = None
+        for last_heading in self._boundary.finditer(text, half):
+            pass
+        if last_heading is not None and last_heading.start() > half:
+            return last_heading.start()
+
+        sentence_end = text.rfind(". ", half)
+        if sentence_end != -1:
+            return sentence_end + 2
+
+        space = text.rfind(" ", half)
+        return space + 1 if space != -1 else len(text)
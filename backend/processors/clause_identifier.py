@@ -1,8 +1,12 @@
-import spacy
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
+from spacy.tokens import Doc
+
+from backend.processors.nlp import load_pipeline
+from backend.processors.doc_cache import parsed_doc_cache
+from backend.processors.instrumentation import stage
 
 class ClauseIdentifier:
     """
@@ -10,13 +14,9 @@ class ClauseIdentifier:
     """
     
     def __init__(self):
-        # Load spaCy model
-        try:
-            self.nlp = spacy.load("en_core_web_lg")
-        except:
-            import os
-            os.system("python -m spacy download en_core_web_lg")
-            self.nlp = spacy.load("en_core_web_lg")
+        # Shared spaCy pipeline and parse cache
+        self.nlp = load_pipeline()
+        self.doc_cache = parsed_doc_cache
             
         # Define patterns for identifying clause boundaries
         self.section_patterns = [
@@ -53,20 +53,56 @@ class ClauseIdentifier:
             "limitations": ["limit", "limitation", "except", "exclude"]
         }
     
-    def identify_key_clauses(self, text: str, document_type: str) -> List[Dict[str, Any]]:
+    @stage("key_clauses")
+    def identify_key_clauses(self, text: str, document_type: str,
+                             sections: Optional[List[Tuple[int, int]]] = None,
+                             max_clauses: Optional[int] = 10,
+                             use_document_parse: bool = True) -> List[Dict[str, Any]]:
         """
         Identify key clauses in a legal document.
         
         Args:
             text (str): The legal document text
             document_type (str): Type of legal document
+            sections (List[Tuple[int, int]], optional): (start, end) offsets of the
+                sections to examine; defaults to every section of the document
+            max_clauses (int, optional): Number of top clauses to return; None for all
+            use_document_parse (bool): Take sentence boundaries for titles from the
+                parse of the whole document (shared through the parse cache).
+                When False only the first lines of matching sections are parsed
             
         Returns:
             List of identified clauses with metadata
         """
         # Split text into sections
-        sections = self._split_into_sections(text)
+        if sections is None:
+            sections = self._section_spans(text)
+        
+        # Only return top clauses
+        clauses = self.score_sections(text, document_type, sections)
+        if max_clauses is not None:
+            clauses = clauses[:max_clauses]
+        
+        # Titles don't affect the ranking, so only the clauses returned get one
+        doc = self.doc_cache.get_doc(text) if use_document_parse else None
+        for clause in clauses:
+            clause["title"] = self._extract_section_title(clause["text"], doc, clause["start_char"])
+        return clauses
+    
+    def score_sections(self, text: str, document_type: str,
+                       sections: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """
+        Score sections as clauses without titling them (no parsing, only keyword matching)
         
+        Args:
+            text (str): The legal document text
+            document_type (str): Type of legal document
+            sections (List[Tuple[int, int]]): (start, end) offsets of the sections to score
+            
+        Returns:
+            Clauses above the confidence threshold, most important first (ties
+            in the given order), with "title" set to None
+        """
         # Get relevant clause types for this document
         clause_types = self.default_clause_types.copy()
         if document_type in self.key_clause_types:
@@ -74,7 +110,9 @@ class ClauseIdentifier:
         
         # Identify clauses
         clauses = []
-        for section in sections:
+        for start_char, end_char in sections:
+            section = text[start_char:end_char]
+            
             # Calculate section importance
             importance = self._calculate_section_importance(section, document_type)
             
@@ -84,26 +122,55 @@ class ClauseIdentifier:
             # Only include sections that exceed a minimum confidence threshold
             if confidence > 0.3:
                 clause_info = {
-                    "title": self._extract_section_title(section),
+                    "title": None,
                     "text": section,
                     "type": clause_type,
                     "confidence": confidence,
                     "importance": importance,
-                    "start_char": text.find(section),
-                    "end_char": text.find(section) + len(section),
+                    "start_char": start_char,
+                    "end_char": end_char,
                 }
                 clauses.append(clause_info)
         
         # Sort clauses by importance
         clauses.sort(key=lambda x: x["importance"], reverse=True)
+        return clauses
+    
+    @stage("clause_embeddings")
+    def embed_clauses(self, clauses: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Embed clauses for similarity search.
         
-        # Only return top clauses
-        max_clauses = 10
-        return clauses[:max_clauses]
+        Each clause becomes the mean of the static word vectors of its content
+        words (stop words, punctuation and out-of-vocabulary tokens are
+        skipped). Only the tokenizer runs, so no parse is needed.
+        
+        Args:
+            clauses (List[Dict[str, Any]]): Clauses with their "text"
+            
+        Returns:
+            Matrix with one row per clause
+        """
+        vectors = np.zeros((len(clauses), self.nlp.vocab.vectors_length), dtype=np.float32)
+        for i, clause in enumerate(clauses):
+            vectors[i] = self.embed_text(clause["text"])
+        return vectors
+    
+    def embed_text(self, text: str) -> np.ndarray:
+        """Mean word vector of a text's content words (zeros if none have vectors)"""
+        tokens = [token for token in self.nlp.make_doc(text)
+                  if token.has_vector and not (token.is_stop or token.is_punct or token.is_space)]
+        if not tokens:
+            return np.zeros(self.nlp.vocab.vectors_length, dtype=np.float32)
+        return np.mean([token.vector for token in tokens], axis=0).astype(np.float32)
     
     def _split_into_sections(self, text: str) -> List[str]:
         """Split document into logical sections based on section headers"""
-        sections = []
+        return [text[start:end] for start, end in self._section_spans(text)]
+    
+    def _section_spans(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) character offsets of the document's logical sections"""
+        spans = []
         
         # Create combined regex pattern for section headers
         pattern = '|'.join(self.section_patterns)
@@ -113,26 +180,40 @@ class ClauseIdentifier:
         
         # Create sections based on header positions
         for i in range(len(matches)):
-            start_pos = matches[i].start()
-            if i < len(matches) - 1:
-                end_pos = matches[i+1].start()
-                section_text = text[start_pos:end_pos].strip()
-            else:
-                section_text = text[start_pos:].strip()
+            end_pos = matches[i+1].start() if i < len(matches) - 1 else len(text)
+            start_pos, end_pos = self._strip_span(text, matches[i].start(), end_pos)
             
             # Add if section has sufficient content
-            if len(section_text) > 20:  # Avoid empty or very short sections
-                sections.append(section_text)
+            if end_pos - start_pos > 20:  # Avoid empty or very short sections
+                spans.append((start_pos, end_pos))
         
         # If no sections were found, try paragraph splitting
-        if not sections:
-            paragraphs = text.split('\n\n')
-            sections = [p for p in paragraphs if len(p) > 100]
+        if not spans:
+            position = 0
+            for paragraph in text.split('\n\n'):
+                if len(paragraph) > 100:
+                    spans.append((position, position + len(paragraph)))
+                position += len(paragraph) + 2
         
-        return sections
+        return spans
+    
+    @staticmethod
+    def _strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+        """Narrow a span so it excludes surrounding whitespace, like str.strip"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
     
-    def _extract_section_title(self, section: str) -> str:
-        """Extract the title from a section"""
+    def _extract_section_title(self, section: str, doc: Optional[Doc] = None, start_char: int = -1) -> str:
+        """
+        Extract the title from a section
+        
+        When the parsed document and the section's offset in it are given,
+        sentence boundaries are taken from that parse instead of parsing
+        the section's first line again.
+        """
         lines = section.split('\n')
         first_line = lines[0].strip()
         
@@ -141,14 +222,28 @@ class ClauseIdentifier:
             return first_line
         
         # Try to find a title in the first sentence
-        doc = self.nlp(first_line)
-        sents = list(doc.sents)
-        if sents and len(sents[0].text) < 100:
-            return sents[0].text
+        first_sentence = self._first_sentence(section, first_line, doc, start_char)
+        if first_sentence and len(first_sentence) < 100:
+            return first_sentence
         
         # Default - return beginning of section
         return first_line[:50] + "..." if len(first_line) > 50 else first_line
     
+    def _first_sentence(self, section: str, first_line: str, doc: Optional[Doc], start_char: int) -> str:
+        """First sentence of a section's first line"""
+        if doc is not None and start_char >= 0:
+            # Offset of the first line within the document; doc.text would rebuild the whole text on every call
+            line_offset = section.find(first_line)
+            line_start = start_char + line_offset
+            span = doc.char_span(line_start, line_start + len(first_line), alignment_mode="expand") if line_offset >= 0 else None
+            if span is not None and len(span):
+                # Clip the sentence containing the line's first token to the line itself
+                sentence_end = min(span[0].sent.end_char, line_start + len(first_line))
+                return section[line_offset:sentence_end - start_char].strip()
+        
+        sents = list(self.nlp(first_line).sents)
+        return sents[0].text if sents else ""
+    
     def _calculate_section_importance(self, section: str, document_type: str) -> float:
         """Calculate the importance of a section based on content and keywords"""
         importance = 0.0
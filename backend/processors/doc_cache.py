@@ -0,0 +1,144 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from spacy.language import Language
+from spacy.tokens import Doc, DocBin
+
+from backend.database.locking import atomic_open
+from backend.processors.nlp import load_pipeline, pipeline_fingerprint
+from backend.processors.instrumentation import stage
+
+# Parsed documents kept in memory; each holds full token, parse and vector references
+DEFAULT_MEMORY_DOCS = 4
+
+PARSED_EXTENSION = ".spacy"
+
+# Slot holding the last Doc parsed inside ParsedDocCache.transient()
+_transient: ContextVar[Optional[List[Tuple[str, Doc]]]] = ContextVar("transient_docs", default=None)
+
+
+class ParsedDocCache:
+    """
+    Cache of parsed spaCy Docs, in memory and on disk as DocBin files.
+
+    Entries are keyed by a hash of the text and a fingerprint of the
+    pipeline (model name and version, spaCy version, components and
+    PIPELINE_REVISION), so a document is parsed once per pipeline and
+    every processor and later re-analysis reuses that parse. Changing the
+    model or the custom components simply misses the old entries.
+    """
+
+    def __init__(self, directory: str = os.path.join("data", "parsed"), nlp: Optional[Language] = None,
+                 memory_docs: int = DEFAULT_MEMORY_DOCS):
+        self.directory = directory
+        self._nlp = nlp
+        self.memory_docs = memory_docs
+        self._docs: "OrderedDict[str, Doc]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def nlp(self) -> Language:
+        if self._nlp is None:
+            self._nlp = load_pipeline()
+        return self._nlp
+
+    def key(self, text: str) -> str:
+        """Cache key of a text under the current pipeline"""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+        return f"{digest}-{pipeline_fingerprint(self.nlp)}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{PARSED_EXTENSION}")
+
+    @stage("parse")
+    def get_doc(self, text: str) -> Doc:
+        """
+        Return the parsed Doc for a text, parsing it only if no cached copy exists
+
+        Docs are shared between callers and must not be modified.
+        """
+        key = self.key(text)
+
+        slot = _transient.get()
+        if slot is not None:
+            if slot and slot[0][0] == key:
+                self.hits += 1
+                return slot[0][1]
+            self.misses += 1
+            slot[:] = [(key, self.nlp(text))]
+            return slot[0][1]
+
+        with self._lock:
+            doc = self._docs.get(key)
+            if doc is not None:
+                self._docs.move_to_end(key)
+                self.hits += 1
+                return doc
+
+        doc = self._read(key)
+        if doc is None:
+            self.misses += 1
+            doc = self.nlp(text)
+            self._write(key, doc)
+        else:
+            self.hits += 1
+
+        with self._lock:
+            self._docs[key] = doc
+            while len(self._docs) > self.memory_docs:
+                self._docs.popitem(last=False)
+        return doc
+
+    @contextmanager
+    def transient(self) -> Iterator[None]:
+        """
+        Parse without the cache inside the block
+
+        Texts are parsed without reading or writing DocBin files, and only
+        the most recent Doc is kept, so processors working on the same text
+        still share one parse. Used for sections of very large documents,
+        whose parses would be too big to keep and never be reused.
+        """
+        slot: List[Tuple[str, Doc]] = []
+        token = _transient.set(slot)
+        try:
+            yield
+        finally:
+            _transient.reset(token)
+            slot.clear()
+
+    def _read(self, key: str) -> Optional[Doc]:
+        try:
+            with open(self.path(key), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            doc_bin = DocBin(store_user_data=True).from_bytes(data)
+            return next(iter(doc_bin.get_docs(self.nlp.vocab)), None)
+        except Exception:
+            # A corrupt or incompatible file is treated as a miss and rewritten
+            return None
+
+    def _write(self, key: str, doc: Doc) -> None:
+        doc_bin = DocBin(store_user_data=True, docs=[doc])
+        with atomic_open(self.path(key), 'wb') as f:
+            f.write(doc_bin.to_bytes())
+
+    def clear_memory(self) -> None:
+        """Drop in-memory Docs; files on disk are kept"""
+        with self._lock:
+            self._docs.clear()
+
+
+# Shared cache used by all processors
+parsed_doc_cache = ParsedDocCache()
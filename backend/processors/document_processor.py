@@ -1,13 +1,14 @@
-import fitz  # PyMuPDF
-import docx
 import re
 from typing import Optional
 
+from backend.processors.instrumentation import stage
+
 class DocumentProcessor:
     """
     Handles document parsing and text extraction from various file formats.
     """
     
+    @stage("extract_text")
     def extract_text(self, content: bytes, filename: str) -> str:
         """Extract text from various document formats"""
         file_extension = filename.split('.')[-1].lower()
@@ -23,6 +24,8 @@ class DocumentProcessor:
     
     def _extract_from_pdf(self, content: bytes) -> str:
         """Extract text from PDF documents"""
+        import fitz  # PyMuPDF
+        
         text = ""
         with fitz.open(stream=content, filetype="pdf") as doc:
             for page in doc:
@@ -33,6 +36,7 @@ class DocumentProcessor:
         """Extract text from DOCX documents"""
         import io
         from tempfile import NamedTemporaryFile
+        import docx
         
         # Save bytes to temporary file
         with NamedTemporaryFile(delete=False, suffix='.docx') as tmp:
@@ -66,6 +70,7 @@ class DocumentProcessor:
             
         return text
     
+    @stage("document_type")
     def identify_document_type(self, text: str) -> str:
         """Identify the type of legal document based on content analysis"""
         # Define patterns for different document types
@@ -1,20 +1,19 @@
-import spacy
-from transformers import pipeline
 from typing import List, Dict, Any
 
+from backend.processors.nlp import load_pipeline, add_legal_entity_ruler, add_legal_rules
+from backend.processors.legal_rules import SPAN_KEY
+from backend.processors.doc_cache import parsed_doc_cache
+from backend.processors.instrumentation import stage
+
 class EntityExtractor:
     """
     Extracts named entities and legal concepts from legal documents.
     """
     
     def __init__(self):
-        # Load spaCy model for NER
-        try:
-            self.nlp = spacy.load("en_core_web_lg")
-        except:
-            import os
-            os.system("python -m spacy download en_core_web_lg")
-            self.nlp = spacy.load("en_core_web_lg")
+        # Shared spaCy pipeline (with legal entity patterns) and parse cache
+        self.nlp = load_pipeline()
+        self.doc_cache = parsed_doc_cache
             
         # Add legal entity ruler for specialized legal entities
         self._add_legal_entity_patterns()
@@ -24,22 +23,9 @@ class EntityExtractor:
     
     def _add_legal_entity_patterns(self):
         """Add custom patterns for legal entity recognition"""
-        ruler = self.nlp.add_pipe("entity_ruler", before="ner")
-        patterns = [
-            {"label": "LEGAL_REFERENCE", "pattern": [{"LOWER": "section"}, {"SHAPE": "dd"}]},
-            {"label": "LEGAL_REFERENCE", "pattern": [{"LOWER": "article"}, {"SHAPE": "d"}]},
-            {"label": "LEGAL_REFERENCE", "pattern": [{"LOWER": "paragraph"}, {"SHAPE": "d"}]},
-            {"label": "PARTY", "pattern": [{"LOWER": "plaintiff"}]},
-            {"label": "PARTY", "pattern": [{"LOWER": "defendant"}]},
-            {"label": "PARTY", "pattern": [{"LOWER": "appellant"}]},
-            {"label": "PARTY", "pattern": [{"LOWER": "respondent"}]},
-            {"label": "COURT", "pattern": [{"LOWER": "court"}, {"LOWER": "of"}, {"POS": "PROPN"}]},
-            {"label": "COURT", "pattern": [{"LOWER": "supreme"}, {"LOWER": "court"}]},
-            {"label": "LEGAL_TERM", "pattern": [{"LOWER": "force"}, {"LOWER": "majeure"}]},
-            {"label": "LEGAL_TERM", "pattern": [{"LOWER": "mutatis"}, {"LOWER": "mutandis"}]},
-            {"label": "LEGAL_TERM", "pattern": [{"LOWER": "prima"}, {"LOWER": "facie"}]},
-        ]
-        ruler.add_patterns(patterns)
+        # The shared pipeline already has them; this only matters for a pipeline loaded elsewhere
+        add_legal_entity_ruler(self.nlp)
+        add_legal_rules(self.nlp)
     
     def _load_legal_terminology(self) -> Dict[str, str]:
         """Load dictionary of legal terms and definitions"""
@@ -53,6 +39,7 @@ class EntityExtractor:
             # More terms would be included in a real implementation
         }
     
+    @stage("entities")
     def extract_entities(self, text: str) -> List[Dict[str, Any]]:
         """
         Extract named entities and legal concepts from text.
@@ -63,12 +50,19 @@ class EntityExtractor:
         Returns:
             List of extracted entities with their types, positions, and relevant information
         """
-        # Process with spaCy
-        doc = self.nlp(text)
+        # Process with spaCy, reusing an earlier parse of the same text
+        doc = self.doc_cache.get_doc(text)
+        
+        # Money amounts and citations found by the legal_rules component in the same pass
+        references = self._extract_legal_references(doc)
+        covered = {i for span in doc.spans.get(SPAN_KEY, []) for i in range(span.start, span.end)}
         
-        # Extract entities
+        # Extract entities; rule matches are more precise than overlapping NER spans
         entities = []
         for ent in doc.ents:
+            if any(i in covered for i in range(ent.start, ent.end)):
+                continue
+            
             entity = {
                 "text": ent.text,
                 "label": ent.label_,
@@ -82,57 +76,23 @@ class EntityExtractor:
             
             entities.append(entity)
         
-        # Find legal references not caught by spaCy
-        legal_references = self._extract_legal_references(text)
-        for ref in legal_references:
-            # Check if this reference overlaps with existing entities
-            if not any(e["start_char"] <= ref["start_char"] <= e["end_char"] for e in entities):
-                entities.append(ref)
-        
-        # Extract money and quantity entities
-        for token in doc:
-            if token.like_num and token.i < len(doc) - 1:
-                next_token = doc[token.i + 1]
-                if next_token.text.lower() in ["dollars", "usd", "$", "€", "euro", "euros"]:
-                    entity = {
-                        "text": f"{token.text} {next_token.text}",
-                        "label": "MONEY",
-                        "start_char": token.idx,
-                        "end_char": next_token.idx + len(next_token.text),
-                    }
-                    entities.append(entity)
+        entities.extend(references)
+        entities.sort(key=lambda e: e["start_char"])
         
         return entities
     
-    def _extract_legal_references(self, text: str) -> List[Dict[str, Any]]:
-        """Extract legal references from text using regex patterns"""
-        import re
-        
+    def _extract_legal_references(self, doc) -> List[Dict[str, Any]]:
+        """Money amounts and case, statute and regulation citations matched by the legal_rules component"""
         references = []
-        
-        # Pattern for case citations (e.g., "Smith v. Jones, 123 F.3d 456 (9th Cir. 1990)")
-        case_pattern = r'([A-Z][a-z]+)\s+v\.\s+([A-Z][a-z]+),\s+(\d+\s+[A-Za-z.]+\s+\d+\s+\([A-Za-z0-9.]+\s+\d{4}\))'
-        for match in re.finditer(case_pattern, text):
-            references.append({
-                "text": match.group(0),
-                "label": "CASE_CITATION",
-                "start_char": match.start(),
-                "end_char": match.end(),
-                "plaintiff": match.group(1),
-                "defendant": match.group(2),
-            })
-        
-        # Pattern for statutory citations (e.g., "42 U.S.C. § 1983")
-        statute_pattern = r'(\d+)\s+([A-Z]\.[A-Z]\.[A-Z]\.)\s+§\s+(\d+(?:\([a-z]\))?)'
-        for match in re.finditer(statute_pattern, text):
-            references.append({
-                "text": match.group(0),
-                "label": "STATUTE_CITATION",
-                "start_char": match.start(),
-                "end_char": match.end(),
-                "title": match.group(1),
-                "code": match.group(2),
-                "section": match.group(3),
-            })
+        for span in doc.spans.get(SPAN_KEY, []):
+            reference = {
+                "text": span.text,
+                "label": span.label_,
+                "start_char": span.start_char,
+                "end_char": span.end_char,
+            }
+            # Normalized fields, e.g. amount and currency, or volume, reporter, page and pin cite
+            reference.update(span._.legal_fields or {})
+            references.append(reference)
         
         return references
\ No newline at end of file
@@ -0,0 +1,194 @@
+import re
+from typing import TYPE_CHECKING, List, Optional
+
+# numpy and sklearn are imported where they are used, so importing this module stays cheap
+if TYPE_CHECKING:
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Candidate sentence boundaries: terminal punctuation followed by whitespace and a sentence start
+SENTENCE_BOUNDARY = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+(?=[\"'(\[]?[A-Z0-9§])")
+
+# Tokens ending in a period that don't end a sentence in legal text
+ABBREVIATIONS = frozenset(
+    "u.s.c u.s v vs no nos inc corp co ltd llc l.l.c p.c cir f fed supp app art sec secs para paras "
+    "ch cl ex exh mr mrs ms dr jr sr st e.g i.e et al etc cf id seq re c.f.r n.a s.a".split())
+
+# Dotted initialisms such as "s.d.n.y" (checked after the final period is stripped)
+DOTTED = re.compile(r"(?:[a-z]\.)+[a-z]")
+
+# Damping factor of the TextRank random walk
+DAMPING = 0.85
+
+# Power iteration stops once the L1 change in scores drops below this
+CONVERGENCE = 1e-6
+MAX_ITERATIONS = 100
+
+# Sentences this similar to one already selected are skipped as redundant
+REDUNDANCY_THRESHOLD = 0.7
+
+# Number of top-ranked sentences considered when filling the summary
+MIN_CANDIDATES = 50
+CANDIDATES_PER_WORD = 2
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences with a regex, keeping legal abbreviations and citations intact"""
+    sentences = []
+    pending = ""
+    for piece in SENTENCE_BOUNDARY.split(text):
+        pending = f"{pending} {piece}" if pending else piece
+        last_word = pending.rstrip().rsplit(None, 1)[-1].lower().rstrip(".") if pending.strip() else ""
+        # A lone initial ("J.") or a known abbreviation doesn't end the sentence
+        last_word = last_word.lstrip("(")
+        if len(last_word) == 1 and last_word.isalpha() or last_word in ABBREVIATIONS or DOTTED.fullmatch(last_word):
+            continue
+        if pending.strip():
+            sentences.append(" ".join(pending.split()))
+        pending = ""
+    if pending.strip():
+        sentences.append(" ".join(pending.split()))
+    return sentences
+
+
+class ExtractiveSummarizer:
+    """
+    Low-latency extractive summaries by TextRank over TF-IDF sentence vectors.
+
+    Sentences are ranked by a random walk on their cosine-similarity graph,
+    optionally biased towards sentences about the focus areas, and the top
+    ones are returned in document order. The similarity matrix is never
+    materialized: each power-iteration step multiplies by the sparse TF-IDF
+    matrix and its transpose, so cost grows with the amount of text rather
+    than with the square of the sentence count.
+    """
+
+    def __init__(self, min_sentence_words: int = 4):
+        self.min_sentence_words = min_sentence_words
+
+    def generate_summary(self, text: str, max_length: int = 500, focus_areas: Optional[List[str]] = None) -> str:
+        """
+        Generate an extractive summary of the legal document.
+
+        Args:
+            text (str): The text to summarize
+            max_length (int): Maximum length of the summary in words
+            focus_areas (List[str], optional): Areas to focus on in the summary
+
+        Returns:
+            str: The selected sentences in document order
+        """
+        import numpy as np
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        sentences = [s for s in split_sentences(text) if len(s.split()) >= self.min_sentence_words]
+        if not sentences:
+            return " ".join(text.split()[:max_length])
+
+        try:
+            vectorizer = TfidfVectorizer(stop_words="english", sublinear_tf=True)
+            vectors = vectorizer.fit_transform(sentences)
+        except ValueError:
+            # Only stop words; nothing to rank on
+            return self._select(sentences, np.zeros(len(sentences)), None, max_length)
+
+        personalization = None
+        if focus_areas:
+            personalization = self._focus_weights(sentences, vectors, vectorizer, focus_areas)
+
+        scores = self.rank(vectors, personalization)
+        return self._select(sentences, scores, vectors, max_length)
+
+    @staticmethod
+    def rank(vectors, personalization: Optional["np.ndarray"] = None) -> "np.ndarray":
+        """
+        TextRank scores for L2-normalized sentence vectors
+
+        Args:
+            vectors: Sparse (sentences x terms) matrix with unit-length rows
+            personalization: Optional non-negative teleport weights per sentence
+
+        Returns:
+            Score per sentence, summing to 1
+        """
+        import numpy as np
+
+        n = vectors.shape[0]
+        if n == 1:
+            return np.ones(1)
+
+        # Self-similarity of each sentence (1, or 0 for an empty row), removed from the graph
+        self_similarity = np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel()
+
+        def similarity_dot(v: "np.ndarray") -> "np.ndarray":
+            return vectors @ (vectors.T @ v) - self_similarity * v
+
+        # Weighted degree of each node; isolated sentences only receive teleport mass
+        degree = similarity_dot(np.ones(n))
+        inverse_degree = np.divide(1.0, degree, out=np.zeros(n), where=degree > 1e-12)
+
+        if personalization is None or personalization.sum() <= 0:
+            teleport = np.full(n, 1.0 / n)
+        else:
+            teleport = personalization / personalization.sum()
+
+        scores = np.full(n, 1.0 / n)
+        for _ in range(MAX_ITERATIONS):
+            walked = similarity_dot(scores * inverse_degree)
+            # Mass sitting on isolated sentences is redistributed by teleporting
+            dangling = scores[inverse_degree == 0].sum()
+            updated = (1 - DAMPING) * teleport + DAMPING * (walked + dangling * teleport)
+            if np.abs(updated - scores).sum() < CONVERGENCE:
+                scores = updated
+                break
+            scores = updated
+        return scores
+
+    @staticmethod
+    def _focus_weights(sentences: List[str], vectors, vectorizer: "TfidfVectorizer",
+                       focus_areas: List[str]) -> "np.ndarray":
+        """Teleport weights favouring sentences similar to, or mentioning, a focus area"""
+        import numpy as np
+
+        query = vectorizer.transform([" ".join(focus_areas)])
+        weights = np.asarray((vectors @ query.T).todense()).ravel()
+
+        lowered = [area.lower() for area in focus_areas]
+        mentions = np.array([any(area in sentence.lower() for area in lowered) for sentence in sentences], dtype=float)
+        return weights + mentions
+
+    @staticmethod
+    def _select(sentences: List[str], scores: "np.ndarray", vectors, max_length: int) -> str:
+        """Pick the best sentences within max_length words, skipping near-duplicates"""
+        import numpy as np
+
+        # Only the best-ranked sentences can make it into a summary of max_length words
+        limit = min(len(sentences), max(MIN_CANDIDATES, CANDIDATES_PER_WORD * max_length))
+        candidates = np.argsort(-scores, kind="stable")[:limit]
+
+        # Pairwise similarity among candidates, computed once
+        similarity = None
+        if vectors is not None:
+            subset = vectors[candidates]
+            similarity = (subset @ subset.T).toarray()
+
+        selected: List[int] = []
+        words = 0
+        for position, index in enumerate(candidates):
+            length = len(sentences[index].split())
+            if words + length > max_length:
+                if selected:
+                    continue
+                # Always return something, even if the best sentence is too long
+                return " ".join(sentences[index].split()[:max_length])
+
+            if similarity is not None and selected:
+                if similarity[position, selected].max() > REDUNDANCY_THRESHOLD:
+                    continue
+
+            selected.append(position)
+            words += length
+            if words >= max_length:
+                break
+
+        return " ".join(sentences[i] for i in sorted(int(candidates[p]) for p in selected))
@@ -0,0 +1,233 @@
+import bisect
+import hashlib
+import time
+from collections.abc import Mapping
+from difflib import SequenceMatcher
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+from backend.processors.clause_identifier import ClauseIdentifier
+from backend.processors.document_processor import DocumentProcessor
+from backend.processors.entity_extractor import EntityExtractor
+from backend.processors.summarizer import Summarizer
+from backend.processors.instrumentation import stage
+
+# Number of top clauses kept in an analysis, as in ClauseIdentifier.identify_key_clauses
+MAX_CLAUSES = 10
+
+
+class IncrementalAnalyzer:
+    """
+    Re-analyzes a revised document, reusing the previous version's results
+    for every section that did not change.
+
+    Both versions are cut into segments at the section boundaries found by
+    ClauseIdentifier, and the segment sequences are diffed by content hash.
+    Runs of identical segments map old offsets to new ones; entities, key
+    clauses and chunk summaries that lie entirely inside such a run are
+    carried over with shifted offsets. Entity extraction, clause
+    identification and summarization run only on the changed text.
+    """
+
+    def __init__(self, summarizer: Summarizer, entity_extractor: EntityExtractor,
+                 clause_identifier: ClauseIdentifier, document_processor: Optional[DocumentProcessor] = None):
+        self.summarizer = summarizer
+        self.entity_extractor = entity_extractor
+        self.clause_identifier = clause_identifier
+        self.document_processor = document_processor or DocumentProcessor()
+
+    @stage("incremental_analysis")
+    def analyze(self, text: str, previous_text: str, previous_analysis: Mapping) -> Dict[str, Any]:
+        """
+        Analyze a revision of a previously analyzed document
+
+        Args:
+            text: Text of the new version
+            previous_text: Text of the version that was analyzed
+            previous_analysis: Stored analysis of that version
+
+        Returns:
+            Analysis dictionary in the same form as a full analysis, plus a
+            "revision" entry describing how much was reused
+        """
+        started = time.perf_counter()
+        document_type = self.document_processor.identify_document_type(text)
+
+        old_segments = self._segments(previous_text)
+        new_segments = self._segments(text)
+        blocks = self._unchanged_blocks(previous_text, old_segments, text, new_segments)
+        changed = self._complement([(new, new + old_end - old_start) for old_start, old_end, new in blocks], len(text))
+        changed = [(start, end) for start, end in changed if text[start:end].strip()]
+
+        entities, entities_reused = self._entities(text, previous_analysis, blocks, changed)
+        key_clauses, clauses_reused = self._key_clauses(text, document_type, previous_analysis, blocks)
+        summary, summary_chunks, summary_settings = self._summary(text, previous_analysis, blocks)
+        summary_settings["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+
+        unchanged_segments = sum(1 for start, end in new_segments
+                                 if any(new <= start and end <= new + old_end - old_start
+                                        for old_start, old_end, new in blocks))
+
+        return {
+            "summary": summary,
+            "summary_chunks": summary_chunks,
+            "key_clauses": key_clauses,
+            "entities": entities,
+            "document_type": document_type,
+            "summary_settings": summary_settings,
+            "revision": {
+                "sections_total": len(new_segments),
+                "sections_changed": len(new_segments) - unchanged_segments,
+                "characters_changed": sum(end - start for start, end in changed),
+                "entities_reused": entities_reused,
+                "clauses_reused": clauses_reused,
+                "summary_chunks_reused": summary_settings["chunks_resumed"],
+            },
+        }
+
+    def _segments(self, text: str) -> List[Tuple[int, int]]:
+        """Cut text into contiguous segments starting at each section boundary"""
+        boundaries = sorted({0} | {start for start, _ in self.clause_identifier._section_spans(text)})
+        return [(start, end) for start, end in zip(boundaries, boundaries[1:] + [len(text)]) if end > start]
+
+    @staticmethod
+    def _unchanged_blocks(old_text: str, old_segments: List[Tuple[int, int]],
+                          new_text: str, new_segments: List[Tuple[int, int]]) -> List[Tuple[int, int, int]]:
+        """Runs of identical segments as (old_start, old_end, new_start), in document order"""
+        def digest(text: str, span: Tuple[int, int]) -> str:
+            return hashlib.sha1(text[span[0]:span[1]].encode("utf-8")).hexdigest()
+
+        old_hashes = [digest(old_text, span) for span in old_segments]
+        new_hashes = [digest(new_text, span) for span in new_segments]
+
+        blocks = []
+        matcher = SequenceMatcher(None, old_hashes, new_hashes, autojunk=False)
+        for tag, i1, i2, j1, _ in matcher.get_opcodes():
+            if tag == "equal":
+                blocks.append((old_segments[i1][0], old_segments[i2 - 1][1], new_segments[j1][0]))
+        return blocks
+
+    @staticmethod
+    def _complement(ranges: List[Tuple[int, int]], length: int) -> List[Tuple[int, int]]:
+        """Parts of [0, length) not covered by the given sorted, non-overlapping ranges"""
+        gaps = []
+        position = 0
+        for start, end in ranges:
+            if start > position:
+                gaps.append((position, start))
+            position = max(position, end)
+        if position < length:
+            gaps.append((position, length))
+        return gaps
+
+    @staticmethod
+    def _shifter(blocks: List[Tuple[int, int, int]]) -> Callable[[int, int], Optional[int]]:
+        """Function giving the offset delta for an old [start, end) range inside an unchanged block, or None"""
+        block_starts = [block[0] for block in blocks]
+
+        def shift(start: int, end: int) -> Optional[int]:
+            index = bisect.bisect_right(block_starts, start) - 1
+            if index >= 0:
+                old_start, old_end, new_start = blocks[index]
+                if old_start <= start and end <= old_end:
+                    return new_start - old_start
+            return None
+
+        return shift
+
+    def _entities(self, text: str, previous_analysis: Mapping, blocks: List[Tuple[int, int, int]],
+                  changed: List[Tuple[int, int]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Entities carried over from unchanged text plus entities extracted from changed text"""
+        shift = self._shifter(blocks)
+        entities = []
+        for entity in previous_analysis.get("entities", []):
+            delta = shift(entity["start_char"], entity["end_char"])
+            if delta is not None:
+                entities.append({**entity, "start_char": entity["start_char"] + delta,
+                                 "end_char": entity["end_char"] + delta})
+        reused = len(entities)
+
+        for start, end in changed:
+            for entity in self.entity_extractor.extract_entities(text[start:end]):
+                entities.append({**entity, "start_char": entity["start_char"] + start,
+                                 "end_char": entity["end_char"] + start})
+
+        entities.sort(key=lambda e: e["start_char"])
+        return entities, reused
+
+    def _key_clauses(self, text: str, document_type: str, previous_analysis: Mapping,
+                     blocks: List[Tuple[int, int, int]]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Key clauses, re-scoring every section but titling only new or changed ones
+
+        Scoring is keyword matching, so all sections are ranked again: a
+        section outside the previous top clauses can move into them when an
+        edited one drops. Titles, which need a parse, are carried over for
+        previous key clauses in unchanged text.
+        """
+        sections = self.clause_identifier._section_spans(text)
+
+        # Clause types and importance depend on the document type, so a change invalidates everything
+        if document_type != previous_analysis.get("document_type"):
+            return self.clause_identifier.identify_key_clauses(text, document_type, sections,
+                                                               use_document_parse=False), 0
+
+        shift = self._shifter(blocks)
+        previous_titles = {}
+        for clause in previous_analysis.get("key_clauses", []):
+            delta = shift(clause["start_char"], clause["end_char"])
+            if delta is not None:
+                previous_titles[(clause["start_char"] + delta, clause["end_char"] + delta)] = clause["title"]
+
+        # Same order as a full run: by importance, ties in document order
+        clauses = self.clause_identifier.score_sections(text, document_type, sections)[:MAX_CLAUSES]
+        reused = 0
+        for clause in clauses:
+            title = previous_titles.get((clause["start_char"], clause["end_char"]))
+            if title is not None:
+                reused += 1
+            else:
+                title = self.clause_identifier._extract_section_title(clause["text"])
+            clause["title"] = title
+        return clauses, reused
+
+    def _summary(self, text: str, previous_analysis: Mapping,
+                 blocks: List[Tuple[int, int, int]]) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any]]:
+        """Summary built from reused chunk summaries plus summaries of the changed text, and its settings"""
+        settings = previous_analysis.get("summary_settings") or {}
+        previous_chunks = previous_analysis.get("summary_chunks")
+        chunk_tokens = settings.get("chunk_summary_tokens")
+
+        # Focused summaries only cover part of the text, so they can't be patched
+        if not previous_chunks or not chunk_tokens or settings.get("focus_areas"):
+            previous_chunks = []
+
+        shift = self._shifter(blocks)
+        chunks = []
+        for chunk in previous_chunks:
+            delta = shift(chunk["start"], chunk["end"])
+            if delta is not None:
+                chunks.append({**chunk, "start": chunk["start"] + delta, "end": chunk["end"] + delta})
+        reused = len(chunks)
+
+        new_settings = {}
+        for start, end in self._complement([(c["start"], c["end"]) for c in chunks], len(text)):
+            if not text[start:end].strip():
+                continue
+            for part in self.summarizer.iter_summary(text[start:end], chunk_summary_tokens=chunk_tokens):
+                if "settings" in part:
+                    new_settings = part["settings"]
+                    continue
+                chunks.append({"start": part["start"] + start, "end": part["end"] + start,
+                               "summary": part["summary"]})
+
+        chunks.sort(key=lambda c: c["start"])
+        summary = self.summarizer.combine_summaries([chunk["summary"] for chunk in chunks])
+
+        # Settings of the run that produced new chunk summaries, if any, else those of the previous version
+        summary_settings = {**settings, **new_settings}
+        summary_settings.update({
+            "chunks_total": len(chunks),
+            "chunks_resumed": reused,
+            "chunk_summary_tokens": summary_settings.get("chunk_summary_tokens") or chunk_tokens,
+        })
+        return summary, chunks, summary_settings
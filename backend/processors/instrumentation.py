@@ -0,0 +1,366 @@
+import os
+import time
+import inspect
+import cProfile
+import threading
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Callable, Iterator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Upper bounds (seconds) of the stage duration histogram buckets
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Port of the Prometheus endpoint; unset leaves it off
+METRICS_PORT_ENV = "LEGALEASE_METRICS_PORT"
+
+# Interface of the Prometheus endpoint; only this machine can scrape it unless set (e.g. to 0.0.0.0)
+METRICS_HOST_ENV = "LEGALEASE_METRICS_HOST"
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+DEFAULT_PROFILE_DIR = os.path.join("data", "profiles")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return peak_rss()
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in bytes (0 where getrusage is not available)"""
+    if resource is None:
+        return 0
+    # ru_maxrss is in kilobytes on Linux and lags the current RSS slightly
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    Memory of a process in bytes, split by what it shares
+
+    Returns rss, pss (proportional share), uss (pages only this process
+    uses, i.e. what exiting it would free) and shared. For forked workers
+    uss is the cost of one more worker; the copy-on-write model weights
+    show up under shared. Empty if /proc is not available.
+    """
+    path = f"/proc/{pid or 'self'}"
+    fields: Dict[str, int] = {}
+    try:
+        # smaps_rollup (Linux 4.14+) is the sum of smaps without reading every mapping
+        name = "smaps_rollup" if os.path.exists(os.path.join(path, "smaps_rollup")) else "smaps"
+        with open(os.path.join(path, name)) as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                parts = value.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[key] = fields.get(key, 0) + int(parts[0]) * 1024
+    except (OSError, ValueError):
+        return {}
+
+    uss = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": uss,
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "swap": fields.get("Swap", 0),
+    }
+
+
+class StageRecorder:
+    """Stage measurements collected while analyzing one document"""
+
+    def __init__(self):
+        self.stages: List[Dict[str, Any]] = []
+        self.depth = 0
+        self.started = time.perf_counter()
+        self.profile_path: Optional[str] = None
+
+    def summary(self) -> Dict[str, Any]:
+        """Measurements in the form stored with an analysis"""
+        metrics = {
+            "stages": self.stages,
+            "wall_seconds": round(time.perf_counter() - self.started, 4),
+            # ru_maxrss is the peak over the life of the process, not of this analysis
+            "process_peak_rss_mb": round(peak_rss() / 2**20, 1),
+        }
+        if self.profile_path:
+            metrics["profile"] = self.profile_path
+        return metrics
+
+
+class _StageTotals:
+    """Process-wide aggregates per stage, exported to Prometheus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            totals = self.stages.setdefault(record["stage"], {
+                "count": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "input_size": 0, "items": 0,
+                "buckets": [0] * len(DURATION_BUCKETS),
+            })
+            totals["count"] += 1
+            totals["wall_seconds"] += record["wall_seconds"]
+            totals["cpu_seconds"] += record["cpu_seconds"]
+            totals["input_size"] += record.get("input_size") or 0
+            totals["items"] += record.get("items") or 0
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if record["wall_seconds"] <= bound:
+                    totals["buckets"][i] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: {**totals, "buckets": list(totals["buckets"])} for name, totals in self.stages.items()}
+
+
+stage_totals = _StageTotals()
+
+_recorder: ContextVar[Optional[StageRecorder]] = ContextVar("stage_recorder", default=None)
+
+
+@contextmanager
+def record_stages(profile: bool = False, profile_name: str = "analysis",
+                  profile_dir: str = DEFAULT_PROFILE_DIR) -> Iterator[StageRecorder]:
+    """
+    Collect the measurements of every stage run inside the block
+
+    Args:
+        profile: Also run cProfile over the block and write the stats to
+            <profile_dir>/<profile_name>-<timestamp>.prof (view with pstats
+            or snakeviz)
+        profile_name: Prefix of the profile file, e.g. the document ID
+        profile_dir: Directory for profile files
+
+    Yields:
+        The recorder; call summary() after the block for the results
+    """
+    recorder = StageRecorder()
+    token = _recorder.set(recorder)
+    profiler = cProfile.Profile() if profile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            recorder.profile_path = os.path.join(profile_dir, f"{profile_name}-{int(time.time())}.prof")
+            profiler.dump_stats(recorder.profile_path)
+
+
+def _input_size(args: tuple) -> Optional[int]:
+    """Length of the first text or bytes argument"""
+    for arg in args:
+        if isinstance(arg, (str, bytes)):
+            return len(arg)
+    return None
+
+
+def _item_count(result: Any) -> Optional[int]:
+    if isinstance(result, (str, bytes)):
+        return None
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+class _Measurement:
+    """
+    Resource usage of one stage call
+
+    Time is only counted while the measurement runs; a generator stage is
+    paused while its consumer handles each yielded item.
+    """
+
+    def __init__(self, name: str, input_size: Optional[int]):
+        self.name = name
+        self.input_size = input_size
+        self.recorder = _recorder.get()
+        if self.recorder is not None:
+            self.recorder.depth += 1
+        self.rss = current_rss()
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.running = False
+        self.resume()
+
+    def resume(self) -> None:
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        self.running = True
+
+    def pause(self) -> None:
+        if self.running:
+            self.wall_seconds += time.perf_counter() - self.wall
+            self.cpu_seconds += time.process_time() - self.cpu
+            self.running = False
+
+    def finish(self, items: Optional[int]) -> None:
+        self.pause()
+        rss = current_rss()
+        record = {
+            "stage": self.name,
+            "wall_seconds": round(self.wall_seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            "rss_mb": round(rss / 2**20, 1),
+            "rss_delta_mb": round((rss - self.rss) / 2**20, 1),
+            "process_peak_rss_mb": round(max(rss, peak_rss()) / 2**20, 1),
+            "input_size": self.input_size,
+            "items": items,
+        }
+        stage_totals.add(record)
+        if self.recorder is not None:
+            self.recorder.depth -= 1
+            record["depth"] = self.recorder.depth
+            self.recorder.stages.append(record)
+
+
+def stage(name: str) -> Callable:
+    """
+    Decorator measuring a pipeline stage
+
+    Each call records wall time, CPU time (all threads of the process),
+    resident memory, the length of the first text argument and the number
+    of items returned (or yielded, for generators). For generators only
+    the time spent producing items counts, not the consumer's work between
+    them. Measurements go to the
+    process-wide Prometheus totals and, inside record_stages(), to the
+    current analysis.
+    """
+    def decorate(func: Callable) -> Callable:
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                measurement = _Measurement(name, _input_size(args[1:]))
+                iterator = func(*args, **kwargs)
+                items = 0
+                try:
+                    while True:
+                        try:
+                            item = next(iterator)
+                        except StopIteration:
+                            return
+                        items += 1
+                        measurement.pause()
+                        yield item
+                        measurement.resume()
+                finally:
+                    # A consumer that stops early also stops the stage
+                    iterator.close()
+                    measurement.finish(items)
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            measurement = _Measurement(name, _input_size(args[1:]))
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                measurement.finish(_item_count(result))
+        return wrapper
+    return decorate
+
+
+def render_prometheus() -> str:
+    """Stage totals and process memory in the Prometheus text exposition format"""
+    snapshot = stage_totals.snapshot()
+    lines = [
+        "# HELP legalease_stage_duration_seconds Wall time of analysis pipeline stages",
+        "# TYPE legalease_stage_duration_seconds histogram",
+    ]
+    for name, totals in sorted(snapshot.items()):
+        for bound, count in zip(DURATION_BUCKETS, totals["buckets"]):
+            lines.append(f'legalease_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+        lines.append(f'legalease_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {totals["count"]}')
+        lines.append(f'legalease_stage_duration_seconds_sum{{stage="{name}"}} {totals["wall_seconds"]:.6f}')
+        lines.append(f'legalease_stage_duration_seconds_count{{stage="{name}"}} {totals["count"]}')
+
+    for metric, key, description in (
+            ("legalease_stage_cpu_seconds_total", "cpu_seconds", "CPU time of analysis pipeline stages"),
+            ("legalease_stage_input_size_total", "input_size", "Characters (or bytes) processed by each stage"),
+            ("legalease_stage_items_total", "items", "Items produced by each stage")):
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} counter")
+        for name, totals in sorted(snapshot.items()):
+            value = totals[key]
+            lines.append(f'{metric}{{stage="{name}"}} {value:.6f}' if isinstance(value, float)
+                         else f'{metric}{{stage="{name}"}} {value}')
+
+    lines.extend([
+        "# HELP legalease_resident_memory_bytes Resident memory of the process",
+        "# TYPE legalease_resident_memory_bytes gauge",
+        f"legalease_resident_memory_bytes {current_rss()}",
+        "# HELP legalease_peak_resident_memory_bytes Peak resident memory of the process",
+        "# TYPE legalease_peak_resident_memory_bytes gauge",
+        f"legalease_peak_resident_memory_bytes {peak_rss()}",
+    ])
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are frequent; keep them out of the Streamlit log
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None, host: Optional[str] = None) -> Optional[ThreadingHTTPServer]:
+    """
+    Serve /metrics on a background thread, once per process
+
+    Args:
+        port: Port to listen on; defaults to $LEGALEASE_METRICS_PORT, and
+            nothing is started if neither is set
+        host: Interface to bind; defaults to $LEGALEASE_METRICS_HOST, or
+            127.0.0.1 since the metrics include document names and timings
+
+    Returns:
+        The running server, or None if metrics are disabled
+    """
+    global _server
+    if port is None:
+        port = int(os.environ[METRICS_PORT_ENV]) if os.environ.get(METRICS_PORT_ENV) else None
+        if port is None:
+            return None
+    if host is None:
+        host = os.environ.get(METRICS_HOST_ENV) or DEFAULT_METRICS_HOST
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
@@ -0,0 +1,156 @@
+import re
+from typing import Dict, Any, Optional, Tuple
+
+from spacy.language import Language
+from spacy.tokens import Doc, Span
+
+# Key of the span group holding rule matches
+SPAN_KEY = "legal_rules"
+
+# Structured fields of each match, stored with the Doc (and in DocBin user data)
+if not Span.has_extension("legal_fields"):
+    Span.set_extension("legal_fields", default=None)
+
+CURRENCY_CODES = {
+    "$": "USD", "us$": "USD", "usd": "USD", "dollar": "USD", "dollars": "USD",
+    "€": "EUR", "eur": "EUR", "euro": "EUR", "euros": "EUR",
+    "£": "GBP", "gbp": "GBP", "pounds sterling": "GBP",
+    "¥": "JPY", "jpy": "JPY", "yen": "JPY",
+}
+
+SCALES = {
+    "thousand": 1e3, "k": 1e3,
+    "million": 1e6, "m": 1e6, "mm": 1e6, "mn": 1e6,
+    "billion": 1e9, "b": 1e9, "bn": 1e9,
+    "trillion": 1e12,
+}
+
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+# Single-letter scales must follow the number directly: "5 M&A" is not five million
+_SCALE = r"\s?(?:(?i:thousand|million|billion|trillion)\b|(?:MM|mm|[Bb]n|[Mm]n)(?![A-Za-z]))|[KkMmBb](?![A-Za-z])"
+_CURRENCY_PREFIX = r"US\$|[$€£¥]|\b(?:USD|EUR|GBP|JPY)\b"
+# "pounds" alone is as likely a weight, so only "pounds sterling" counts
+_CURRENCY_SUFFIX = r"(?i:dollars?|usd|euros?|eur|pounds\s+sterling|gbp|yen|jpy)\b|[$€£¥]"
+
+# A party name: up to six capitalized words, joined by lowercase connectors,
+# not starting with a citation signal such as "See"
+_PARTY = r"(?!(?:See|Cf|But|Accord|Compare|Also)\b)[A-Z][\w.&'-]*(?:\s+(?:[A-Z][\w.&'-]*|of|the|and|&|de|la|ex\s+rel\.)){0,5}"
+
+# Reporter abbreviations (U.S., S. Ct., F.3d, F. Supp. 2d, N.E.2d, L. Ed. 2d, F. App'x, ...)
+_REPORTER = r"(?:[A-Z][A-Za-z]{0,5}\.\s?){1,4}(?:\d(?:d|th)\b|App'x)?"
+
+_SECTION_MARK = r"(?:§§?|[Ss]ec(?:tion|\.)?)"
+_SUBSECTIONS = r"(?:\([A-Za-z0-9]{1,4}\))*"
+
+# All rules in one alternation, so the text is scanned once. Citations come
+# first: at any position the first alternative that matches wins
+LEGAL_RULES_PATTERN = re.compile(rf"""
+    (?P<case>
+        (?P<case_plaintiff>{_PARTY})\s+v(?:s)?\.\s+(?P<case_defendant>{_PARTY}),\s+
+        (?P<case_volume>\d{{1,4}})\s+(?P<case_reporter>{_REPORTER})\s*(?P<case_page>\d{{1,5}})
+        (?:,\s+(?P<case_pin>\d{{1,5}}(?:[-–]\d{{1,5}})?))?
+        (?:\s+\((?P<case_court>[^()]{{0,40}}?)\s*(?P<case_year>\d{{4}})\))?
+    )
+    |(?P<regulation>
+        (?P<regulation_title>\d{{1,3}})\s+(?P<regulation_code>C\.?\s?F\.?\s?R\.?)\s*
+        (?:{_SECTION_MARK}\s*(?P<regulation_section>\d+(?:\.\d+[\w-]*)?)|[Pp]art\s+(?P<regulation_part>\d+))
+        (?P<regulation_subsections>{_SUBSECTIONS})
+    )
+    |(?P<statute>
+        (?P<statute_title>\d{{1,3}})\s+(?P<statute_code>U\.?\s?S\.?\s?C\.?(?:\s?A\.?)?)\s*{_SECTION_MARK}\s*
+        (?P<statute_section>\d+[a-z]?(?:-\d+)?)(?P<statute_subsections>{_SUBSECTIONS})
+    )
+    |(?P<money_prefixed>
+        (?P<money_prefix>{_CURRENCY_PREFIX})\s?(?P<money_prefix_amount>{_NUMBER})(?P<money_prefix_scale>{_SCALE})?
+    )
+    |(?P<money_suffixed>
+        (?<![\w.,])(?P<money_suffix_amount>{_NUMBER})(?P<money_suffix_scale>{_SCALE})?\s?(?P<money_suffix>{_CURRENCY_SUFFIX})
+    )
+""", re.VERBOSE)
+
+
+def _collapse(text: str) -> str:
+    """Remove spaces from a code abbreviation (e.g. "U. S. C." -> "U.S.C.")"""
+    return re.sub(r"\s+", "", text)
+
+
+def _amount(number: str, scale: Optional[str]) -> float:
+    value = float(number.replace(",", ""))
+    if scale:
+        value *= SCALES.get(scale.strip().lower(), 1)
+    return value
+
+
+def normalize_match(match: "re.Match") -> Tuple[str, Dict[str, Any]]:
+    """Entity label and structured fields of a LEGAL_RULES_PATTERN match"""
+    group = match.group
+
+    if group("case"):
+        reporter = re.sub(r"\s+", " ", group("case_reporter")).strip()
+        fields = {
+            "plaintiff": group("case_plaintiff"),
+            "defendant": group("case_defendant"),
+            "volume": int(group("case_volume")),
+            "reporter": reporter,
+            "page": int(group("case_page")),
+        }
+        normalized = f"{fields['plaintiff']} v. {fields['defendant']}, {fields['volume']} {reporter} {fields['page']}"
+        if group("case_pin"):
+            fields["pin_cite"] = group("case_pin")
+            normalized += f", {fields['pin_cite']}"
+        if group("case_year"):
+            fields["year"] = int(group("case_year"))
+            court = (group("case_court") or "").strip()
+            if court:
+                fields["court"] = court
+            normalized += f" ({court} {fields['year']})" if court else f" ({fields['year']})"
+        fields["normalized"] = normalized
+        return "CASE_CITATION", fields
+
+    if group("regulation"):
+        fields = {"title": group("regulation_title"), "code": "C.F.R."}
+        if group("regulation_section"):
+            fields["section"] = group("regulation_section") + group("regulation_subsections")
+            fields["normalized"] = f"{fields['title']} C.F.R. § {fields['section']}"
+        else:
+            fields["part"] = int(group("regulation_part"))
+            fields["normalized"] = f"{fields['title']} C.F.R. Part {fields['part']}"
+        return "REGULATION_CITATION", fields
+
+    if group("statute"):
+        code = _collapse(group("statute_code")).upper()
+        code = "U.S.C.A." if code.replace(".", "") == "USCA" else "U.S.C."
+        fields = {
+            "title": group("statute_title"),
+            "code": code,
+            "section": group("statute_section") + group("statute_subsections"),
+        }
+        fields["normalized"] = f"{fields['title']} {code} § {fields['section']}"
+        return "STATUTE_CITATION", fields
+
+    if group("money_prefixed"):
+        currency = CURRENCY_CODES[group("money_prefix").lower()]
+        amount = _amount(group("money_prefix_amount"), group("money_prefix_scale"))
+    else:
+        currency = CURRENCY_CODES[re.sub(r"\s+", " ", group("money_suffix").lower())]
+        amount = _amount(group("money_suffix_amount"), group("money_suffix_scale"))
+    return "MONEY", {"amount": amount, "currency": currency, "normalized": f"{currency} {amount:,.2f}"}
+
+
+@Language.component("legal_rules")
+def legal_rules(doc: Doc) -> Doc:
+    """
+    Find money amounts and case, statute and regulation citations in one
+    scan of the text, storing them in doc.spans["legal_rules"] with their
+    normalized fields in span._.legal_fields
+    """
+    spans = []
+    for match in LEGAL_RULES_PATTERN.finditer(doc.text):
+        label, fields = normalize_match(match)
+        span = doc.char_span(match.start(), match.end(), label=label, alignment_mode="expand")
+        if span is None:
+            continue
+        span._.legal_fields = fields
+        spans.append(span)
+    doc.spans[SPAN_KEY] = spans
+    return doc
@@ -0,0 +1,80 @@
+import hashlib
+from functools import lru_cache
+
+import spacy
+from spacy.language import Language
+
+# Registers the "legal_rules" component
+from backend.processors import legal_rules  # noqa: F401
+
+# spaCy model shared by all processors
+MODEL_NAME = "en_core_web_lg"
+
+# Bump whenever custom components or patterns change, so cached parses are not reused
+PIPELINE_REVISION = 3
+
+# Legal entity patterns matched before the statistical NER
+LEGAL_ENTITY_PATTERNS = [
+    {"label": "LEGAL_REFERENCE", "pattern": [{"LOWER": "section"}, {"SHAPE": "dd"}]},
+    {"label": "LEGAL_REFERENCE", "pattern": [{"LOWER": "article"}, {"SHAPE": "d"}]},
+    {"label": "LEGAL_REFERENCE", "pattern": [{"LOWER": "paragraph"}, {"SHAPE": "d"}]},
+    {"label": "PARTY", "pattern": [{"LOWER": "plaintiff"}]},
+    {"label": "PARTY", "pattern": [{"LOWER": "defendant"}]},
+    {"label": "PARTY", "pattern": [{"LOWER": "appellant"}]},
+    {"label": "PARTY", "pattern": [{"LOWER": "respondent"}]},
+    {"label": "COURT", "pattern": [{"LOWER": "court"}, {"LOWER": "of"}, {"POS": "PROPN"}]},
+    {"label": "COURT", "pattern": [{"LOWER": "supreme"}, {"LOWER": "court"}]},
+    {"label": "LEGAL_TERM", "pattern": [{"LOWER": "force"}, {"LOWER": "majeure"}]},
+    {"label": "LEGAL_TERM", "pattern": [{"LOWER": "mutatis"}, {"LOWER": "mutandis"}]},
+    {"label": "LEGAL_TERM", "pattern": [{"LOWER": "prima"}, {"LOWER": "facie"}]},
+]
+
+
+def add_legal_entity_ruler(nlp: Language) -> None:
+    """Add the legal entity patterns to a pipeline, unless they are already there"""
+    if "entity_ruler" in nlp.pipe_names:
+        return
+    ruler = nlp.add_pipe("entity_ruler", before="ner")
+    ruler.add_patterns(LEGAL_ENTITY_PATTERNS)
+
+
+def add_legal_rules(nlp: Language) -> None:
+    """Add the money and citation rule engine after NER, unless it is already there"""
+    if "legal_rules" in nlp.pipe_names:
+        return
+    nlp.add_pipe("legal_rules", after="ner" if "ner" in nlp.pipe_names else None)
+
+
+@lru_cache(maxsize=None)
+def load_pipeline() -> Language:
+    """
+    Load the shared spaCy pipeline once per process
+
+    All processors parse with the same pipeline, so one parse of a document
+    (see doc_cache) serves entity extraction, sentence splitting and
+    clause titles alike.
+    """
+    try:
+        nlp = spacy.load(MODEL_NAME)
+    except:
+        # If model not installed, download it
+        import os
+        os.system(f"python -m spacy download {MODEL_NAME}")
+        nlp = spacy.load(MODEL_NAME)
+
+    add_legal_entity_ruler(nlp)
+    add_legal_rules(nlp)
+    return nlp
+
+
+def pipeline_fingerprint(nlp: Language) -> str:
+    """Short identifier of everything that affects a parse: model, versions and components"""
+    meta = nlp.meta
+    description = "|".join([
+        f"{meta.get('lang')}_{meta.get('name')}",
+        str(meta.get("version")),
+        spacy.__version__,
+        ",".join(nlp.pipe_names),
+        str(PIPELINE_REVISION),
+    ])
+    return hashlib.sha1(description.encode("utf-8")).hexdigest()[:12]
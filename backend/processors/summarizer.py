@@ -1,123 +1,329 @@
-from transformers import BartForConditionalGeneration, BartTokenizer, pipeline
-import torch
-import spacy
-from typing import List, Dict, Any, Optional
-
-class Summarizer:
-    """
-    Handles generation of summaries from legal documents using
-    both extractive and abstractive summarization techniques.
-    """
-    
-    def __init__(self):
-        # Initialize BART model for abstractive summarization
-        self.tokenizer = BartTokenizer.from_pretrained("facebook/bart-large-cnn")
-        self.model = BartForConditionalGeneration.from_pretrained("facebook/bart-large-cnn")
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model.to(self.device)
-        
-        # Initialize spaCy for text processing
-        try:
-            self.nlp = spacy.load("en_core_web_lg")
-        except:
-            # If model not installed, download it
-            import os
-            os.system("python -m spacy download en_core_web_lg")
-            self.nlp = spacy.load("en_core_web_lg")
-    
-    def generate_summary(self, text: str, max_length: int = 500, focus_areas: Optional[List[str]] = None) -> str:
-        """
-        Generate a summary of the legal document.
-        
-        Args:
-            text (str): The text to summarize
-            max_length (int): Maximum length of the summary in words
-            focus_areas (List[str], optional): Areas to focus on in the summary
-            
-        Returns:
-            str: The generated summary
-        """
-        # Preprocess: break long text into manageable chunks
-        chunks = self._chunk_text(text)
-        
-        # Generate summary for each chunk
-        chunk_summaries = []
-        for chunk in chunks:
-            chunk_summaries.append(self._summarize_chunk(chunk))
-        
-        # Combine chunk summaries
-        combined_summary = " ".join(chunk_summaries)
-        
-        # If focus areas are specified, extract relevant information
-        if focus_areas:
-            focused_summary = self._focus_summary(combined_summary, focus_areas)
-            return focused_summary
-        
-        return combined_summary
-    
-    def _chunk_text(self, text: str, max_chunk_length: int = 1024) -> List[str]:
-        """Break text into manageable chunks for the model"""
-        # Use spaCy to split into sentences
-        doc = self.nlp(text)
-        sentences = [sent.text.strip() for sent in doc.sents]
-        
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        
-        for sentence in sentences:
-            # Tokenize to estimate token count
-            tokens = self.tokenizer(sentence, return_tensors="pt", truncation=False)
-            sentence_length = len(tokens.input_ids[0])
-            
-            if current_length + sentence_length > max_chunk_length:
-                # Start new chunk if adding this sentence would exceed max length
-                if current_chunk:
-                    chunks.append(" ".join(current_chunk))
-                current_chunk = [sentence]
-                current_length = sentence_length
-            else:
-                current_chunk.append(sentence)
-                current_length += sentence_length
-        
-        # Add the last chunk if not empty
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
-        
-        return chunks
-    
-    def _summarize_chunk(self, text: str) -> str:
-        """Generate summary for a single chunk of text"""
-        inputs = self.tokenizer(text, max_length=1024, return_tensors="pt", truncation=True).to(self.device)
-        
-        # Generate summary
-        summary_ids = self.model.generate(
-            inputs.input_ids,
-            max_length=150,
-            min_length=40,
-            length_penalty=2.0,
-            num_beams=4,
-            early_stopping=True
-        )
-        
-        summary = self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-        return summary
-    
-    def _focus_summary(self, summary: str, focus_areas: List[str]) -> str:
-        """Filter or enhance summary to focus on specific areas"""
-        # Create spaCy document
-        doc = self.nlp(summary)
-        
-        # Extract sentences containing focus areas
-        focused_sentences = []
-        for sent in doc.sents:
-            for area in focus_areas:
-                if area.lower() in sent.text.lower():
-                    focused_sentences.append(sent.text)
-                    break
-        
-        if focused_sentences:
-            return " ".join(focused_sentences)
-        else:
-            # If no sentences match focus areas, return the original summary
-            return summary
\ No newline at end of file
+import re
+import time
+import hashlib
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Set, Tuple
+
+from backend.processors.summarizer_backends import SummarizerBackend, TOKENS_PER_WORD, get_backend
+from backend.processors.nlp import load_pipeline
+from backend.processors.doc_cache import parsed_doc_cache
+from backend.processors.instrumentation import stage
+
+# Focus words are matched on their first characters so inflections also match
+FOCUS_STEM_CHARS = 6
+
+# Sentences kept on each side of a sentence that mentions a focus area
+FOCUS_CONTEXT_SENTENCES = 1
+
+
+class Summarizer:
+    """
+    Handles generation of summaries from legal documents using
+    both extractive and abstractive summarization techniques.
+    """
+    
+    # Inference modes selectable at construction
+    MODES = ("fp32", "cpu_int8")
+    
+    # Per-chunk summary length bounds in model tokens
+    MAX_CHUNK_SUMMARY_TOKENS = 150
+    MIN_CHUNK_SUMMARY_TOKENS = 60
+    
+    def __init__(self, mode: str = "fp32", num_threads: Optional[int] = None,
+                 backend: str = "bart-large-cnn",
+                 fallback_backends: Sequence[str] = ("distilbart-cnn-6-6", "extractive")):
+        """
+        Args:
+            mode: "fp32" runs the full-precision model (on GPU when available);
+                "cpu_int8" runs on CPU with dynamically int8-quantized linear layers
+            num_threads: Number of torch intra-op threads (defaults to torch's choice)
+            backend: Name of the summarization backend (see summarizer_backends.BACKENDS)
+            fallback_backends: Cheaper backends, fastest last, tried in order when a
+                time budget is too tight for the primary backend
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported summarizer mode: {mode}")
+        self.mode = mode
+        
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+        
+        # Backends load their models lazily, so fallbacks cost nothing until used
+        self.backend = get_backend(backend, mode)
+        self.fallbacks = [get_backend(name, mode) for name in fallback_backends if name != backend]
+        self.extractive = next((b for b in [self.backend] + self.fallbacks if not b.abstractive),
+                               get_backend("extractive"))
+        
+        # Shared spaCy pipeline and parse cache for text processing
+        self.nlp = load_pipeline()
+        self.doc_cache = parsed_doc_cache
+    
+    @property
+    def tokenizer(self):
+        """Tokenizer of the primary backend (BART backends only)"""
+        return self.backend.tokenizer
+    
+    @property
+    def model(self):
+        """Model of the primary backend (BART backends only)"""
+        return self.backend.model
+    
+    def generate_summary(self, text: str, max_length: int = 500, focus_areas: Optional[List[str]] = None,
+                         time_budget: Optional[float] = None) -> str:
+        """
+        Generate a summary of the legal document.
+        
+        Args:
+            text (str): The text to summarize
+            max_length (int): Maximum length of the summary in words
+            focus_areas (List[str], optional): Areas to focus on in the summary
+            time_budget (float, optional): Seconds the call may take. The backend,
+                beam width and the share of chunks summarized abstractively are
+                chosen to fit (iter_summary reports the choice)
+            
+        Returns:
+            str: The generated summary
+        """
+        chunk_summaries = [part["summary"] for part in
+                           self.iter_summary(text, max_length, focus_areas, time_budget) if "summary" in part]
+        return self.combine_summaries(chunk_summaries, focus_areas)
+    
+    @stage("summarize")
+    def iter_summary(self, text: str, max_length: int = 500, focus_areas: Optional[List[str]] = None,
+                     time_budget: Optional[float] = None,
+                     completed: Optional[Dict[str, str]] = None,
+                     chunk_summary_tokens: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Summarize a document chunk by chunk, yielding each chunk summary as soon as it is ready.
+        
+        Args:
+            text, max_length, focus_areas, time_budget: As for generate_summary
+            completed (Dict[str, str], optional): Chunk summaries from an earlier,
+                interrupted run keyed by chunk fingerprint; those chunks are not
+                summarized again
+            chunk_summary_tokens (int, optional): Fixed token limit per chunk
+                summary, so chunk summaries stay reusable across runs. By
+                default chunks get MAX_CHUNK_SUMMARY_TOKENS, or a share of
+                max_length under a time budget
+            
+        Yields:
+            Dict with the chunk "index", "total" chunk count, chunk "key"
+            (fingerprint), its "summary", "start"/"end" offsets of the chunk
+            in text, "progress" (fraction of chunks done) and whether it was
+            "resumed" from completed. After the last chunk, one final dict
+            holding only the run's "settings" (backend, beam width, coverage,
+            chunk summary tokens, timing), to be stored with the analysis
+        """
+        started = time.perf_counter()
+        completed = completed or {}
+        
+        # Preprocess: break long text into manageable chunks
+        spans = self._sentence_spans(text)
+        sentences = [text[start:end] for start, end in spans]
+        total_sentences = len(sentences)
+        
+        # Only summarize the parts of the document that are about the focus areas
+        if focus_areas:
+            relevant = self._select_focus_sentences(sentences, focus_areas)
+            if relevant:
+                spans = [spans[i] for i in relevant]
+                sentences = [sentences[i] for i in relevant]
+        
+        groups = self._group_sentences(sentences)
+        chunks = [" ".join(sentences[first:last]) for first, last in groups]
+        chunk_spans = [(spans[first][0], spans[last - 1][1]) for first, last in groups]
+        
+        # Under a time budget the summary length is spread over the chunks, which also
+        # shortens generation; otherwise every chunk gets the usual fixed length
+        if chunk_summary_tokens:
+            max_tokens = chunk_summary_tokens
+        elif time_budget is not None:
+            max_tokens = self._chunk_summary_tokens(max_length, len(chunks))
+        else:
+            max_tokens = self.MAX_CHUNK_SUMMARY_TOKENS
+        
+        keys = [self.chunk_key(chunk, max_tokens) for chunk in chunks]
+        pending = [i for i, key in enumerate(keys) if key not in completed]
+        
+        backend, num_beams, abstractive = self._plan(len(pending), time_budget, time.perf_counter() - started)
+        abstractive_chunks = {pending[i] for i in abstractive}
+        
+        # Generate summary for each chunk
+        for i, chunk in enumerate(chunks):
+            resumed = keys[i] in completed
+            if resumed:
+                summary = completed[keys[i]]
+            else:
+                chunk_backend = backend if i in abstractive_chunks else self.extractive
+                summary = self._summarize_chunk(chunk, chunk_backend, num_beams, max_tokens)
+            
+            yield {
+                "index": i,
+                "total": len(chunks),
+                "key": keys[i],
+                "summary": summary,
+                "start": chunk_spans[i][0],
+                "end": chunk_spans[i][1],
+                "progress": (i + 1) / len(chunks),
+                "resumed": resumed,
+            }
+        
+        yield {"settings": {
+            "backend": backend.name,
+            "mode": self.mode,
+            "num_beams": num_beams if backend.abstractive else None,
+            "chunks_total": len(chunks),
+            "chunks_resumed": len(chunks) - len(pending),
+            "chunks_abstractive": len(abstractive_chunks) if backend.abstractive else 0,
+            "coverage": round(len(abstractive_chunks) / len(pending), 3) if pending and backend.abstractive else 0.0,
+            "sentences_total": total_sentences,
+            "focus_areas": focus_areas,
+            "sentences_summarized": len(sentences),
+            "chunk_summary_tokens": max_tokens,
+            "time_budget": time_budget,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }}
+    
+    def combine_summaries(self, chunk_summaries: List[str], focus_areas: Optional[List[str]] = None) -> str:
+        """
+        Join chunk summaries into the final summary
+        
+        The chunks of a focused run already cover only the sentences about
+        the focus areas (see iter_summary), so focus_areas needs no further
+        filtering here; it is kept so callers can pass the run's options.
+        """
+        return " ".join(chunk_summaries)
+    
+    @staticmethod
+    def chunk_key(chunk: str, max_tokens: int) -> str:
+        """Fingerprint of a chunk and its summary length, used to resume interrupted runs"""
+        return hashlib.sha1(f"{max_tokens}:{chunk}".encode("utf-8")).hexdigest()
+    
+    def _plan(self, num_chunks: int, time_budget: Optional[float],
+              elapsed: float) -> Tuple[SummarizerBackend, int, Set[int]]:
+        """
+        Choose the backend, beam width and chunks to summarize abstractively.
+        
+        Without a budget the primary backend runs at its best beam width. With
+        one, the first option whose estimated cost fits is used, trying in
+        order: each backend (primary first) at decreasing beam widths, then
+        abstractive summaries of evenly spaced chunks with the rest extracted,
+        then a purely extractive summary.
+        """
+        all_chunks = set(range(num_chunks))
+        if time_budget is None:
+            return self.backend, self.backend.beam_options[0], all_chunks
+        
+        remaining = time_budget - elapsed
+        abstractive = [b for b in [self.backend] + self.fallbacks if b.abstractive]
+        
+        for backend in abstractive:
+            load = 0.0 if backend.is_loaded else backend.load_seconds
+            for num_beams in backend.beam_options:
+                if load + num_chunks * backend.estimate_chunk_seconds(num_beams) <= remaining:
+                    return backend, num_beams, all_chunks
+        
+        # Partial coverage: as many abstractive chunks as fit next to extracting the others
+        extract_seconds = self.extractive.estimate_chunk_seconds(1)
+        best = None
+        for backend in abstractive:
+            load = 0.0 if backend.is_loaded else backend.load_seconds
+            num_beams = backend.beam_options[-1]
+            per_chunk = backend.estimate_chunk_seconds(num_beams) - extract_seconds
+            count = int((remaining - load - num_chunks * extract_seconds) // per_chunk) if per_chunk > 0 else 0
+            if count >= 1 and (best is None or count > best[2]):
+                best = (backend, num_beams, min(count, num_chunks))
+        
+        if best is not None:
+            backend, num_beams, count = best
+            step = num_chunks / count
+            return backend, num_beams, {int(i * step) for i in range(count)}
+        
+        return self.extractive, 1, all_chunks
+    
+    def _chunk_summary_tokens(self, max_length: int, num_chunks: int) -> int:
+        """Token limit for each chunk summary so the combined summary stays near max_length words"""
+        if not num_chunks:
+            return self.MAX_CHUNK_SUMMARY_TOKENS
+        share = int(max_length * TOKENS_PER_WORD / num_chunks)
+        return max(self.MIN_CHUNK_SUMMARY_TOKENS, min(self.MAX_CHUNK_SUMMARY_TOKENS, share))
+    
+    def _chunk_text(self, text: str, max_chunk_length: int = 1024) -> List[str]:
+        """Break text into manageable chunks for the model"""
+        return self._pack_chunks(self._split_sentences(text), max_chunk_length)
+    
+    def _split_sentences(self, text: str) -> List[str]:
+        """Split text into sentences with spaCy"""
+        return [text[start:end] for start, end in self._sentence_spans(text)]
+    
+    def _sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) offsets of each sentence, excluding surrounding whitespace"""
+        doc = self.doc_cache.get_doc(text)
+        spans = []
+        for sent in doc.sents:
+            sentence = sent.text
+            start = sent.start_char + len(sentence) - len(sentence.lstrip())
+            end = sent.end_char - (len(sentence) - len(sentence.rstrip()))
+            if end > start:
+                spans.append((start, end))
+        return spans
+    
+    def _select_focus_sentences(self, sentences: List[str], focus_areas: List[str],
+                                context: int = FOCUS_CONTEXT_SENTENCES) -> List[int]:
+        """
+        Keep the sentences that mention a focus area, plus their neighbours for context.
+        
+        A focus area matches a sentence when every word of it appears, allowing
+        for different endings ("termination" matches "terminate", "terminated").
+        
+        Returns:
+            List[int]: Indices of the selected sentences in order; empty if none match
+        """
+        patterns = []
+        for area in focus_areas:
+            stems = [word[:FOCUS_STEM_CHARS] for word in re.findall(r"\w+", area.lower())]
+            if stems:
+                patterns.append([re.compile(rf"\b{re.escape(stem)}", re.IGNORECASE) for stem in stems])
+        
+        keep = set()
+        for i, sentence in enumerate(sentences):
+            if any(all(p.search(sentence) for p in area) for area in patterns):
+                keep.update(range(max(0, i - context), min(len(sentences), i + context + 1)))
+        
+        return sorted(keep)
+    
+    def _pack_chunks(self, sentences: List[str], max_chunk_length: int = 1024) -> List[str]:
+        """Group consecutive sentences into chunks of at most max_chunk_length model tokens"""
+        return [" ".join(sentences[first:last]) for first, last in self._group_sentences(sentences, max_chunk_length)]
+    
+    def _group_sentences(self, sentences: List[str], max_chunk_length: int = 1024) -> List[Tuple[int, int]]:
+        """Chunk boundaries as (first, last) sentence index ranges, last exclusive"""
+        groups = []
+        chunk_start = 0
+        current_length = 0
+        
+        for i, sentence in enumerate(sentences):
+            # Tokenize to estimate token count
+            sentence_length = self.backend.count_tokens(sentence)
+            
+            if current_length + sentence_length > max_chunk_length:
+                # Start new chunk if adding this sentence would exceed max length
+                if i > chunk_start:
+                    groups.append((chunk_start, i))
+                chunk_start = i
+                current_length = sentence_length
+            else:
+                current_length += sentence_length
+        
+        # Add the last chunk if not empty
+        if len(sentences) > chunk_start:
+            groups.append((chunk_start, len(sentences)))
+        
+        return groups
+    
+    def _summarize_chunk(self, text: str, backend: Optional[SummarizerBackend] = None,
+                         num_beams: Optional[int] = None, max_tokens: int = MAX_CHUNK_SUMMARY_TOKENS) -> str:
+        """Generate summary for a single chunk of text"""
+        backend = backend or self.backend
+        num_beams = num_beams or backend.beam_options[0]
+        return backend.timed_summarize(text, num_beams, max_tokens)
@@ -0,0 +1,212 @@
+import abc
+import time
+from functools import lru_cache
+from typing import Dict, Callable
+
+# torch and transformers are imported when a model is first loaded, so
+# importing this module (e.g. for the extractive backend) stays cheap
+from backend.processors.extractive_summarizer import ExtractiveSummarizer
+
+# Rough tokens-per-word ratio used when a backend has no tokenizer
+TOKENS_PER_WORD = 1.3
+
+# Minimum length of a chunk summary in tokens, at most half its maximum
+MIN_SUMMARY_TOKENS = 40
+
+# Weight of the newest observation in the per-chunk latency estimate
+LATENCY_SMOOTHING = 0.3
+
+
+# (model_name, mode) pairs already loaded in this process
+_loaded_models = set()
+
+
+@lru_cache(maxsize=None)
+def _load_tokenizer(model_name: str):
+    """Load (once per process) a BART tokenizer; much cheaper than the model"""
+    from transformers import BartTokenizer
+
+    return BartTokenizer.from_pretrained(model_name)
+
+
+@lru_cache(maxsize=None)
+def _load_bart(model_name: str, mode: str):
+    """Load (once per process) a BART tokenizer/model pair for the given inference mode"""
+    import torch
+    from transformers import BartForConditionalGeneration
+
+    tokenizer = _load_tokenizer(model_name)
+    model = BartForConditionalGeneration.from_pretrained(model_name)
+
+    if mode == "cpu_int8":
+        # Quantize weights of linear layers to int8; activations are quantized on the fly
+        device = "cpu"
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    else:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model.to(device)
+    model.eval()
+
+    _loaded_models.add((model_name, mode))
+    return tokenizer, model, device
+
+
+class SummarizerBackend(abc.ABC):
+    """
+    A summarization engine for single chunks of text.
+
+    Backends also keep a running estimate of how long one chunk takes at
+    each beam width, which the Summarizer uses to fit a time budget.
+    """
+
+    name = "base"
+    abstractive = True
+
+    # Beam widths this backend supports, best quality first
+    beam_options = (1,)
+
+    # Initial per-chunk latency guess (seconds at one beam) before any observations
+    default_chunk_seconds = 1.0
+
+    # Seconds to load the model, charged to the budget if it isn't loaded yet
+    load_seconds = 0.0
+
+    def __init__(self):
+        self._chunk_seconds: Dict[int, float] = {}
+
+    @property
+    def is_loaded(self) -> bool:
+        return True
+
+    def count_tokens(self, text: str) -> int:
+        """Number of model input tokens in a piece of text"""
+        return int(len(text.split()) * TOKENS_PER_WORD) + 1
+
+    @abc.abstractmethod
+    def summarize(self, text: str, num_beams: int = 1, max_tokens: int = 150) -> str:
+        """Summarize a single chunk into at most roughly max_tokens tokens"""
+
+    def estimate_chunk_seconds(self, num_beams: int) -> float:
+        """Expected seconds to summarize one chunk"""
+        if num_beams in self._chunk_seconds:
+            return self._chunk_seconds[num_beams]
+        if self._chunk_seconds:
+            # Scale the closest observation; beam search cost grows roughly linearly with width
+            observed = min(self._chunk_seconds, key=lambda beams: abs(beams - num_beams))
+            return self._chunk_seconds[observed] * self._beam_cost(num_beams) / self._beam_cost(observed)
+        return self.default_chunk_seconds * self._beam_cost(num_beams)
+
+    def observe(self, num_beams: int, seconds: float) -> None:
+        """Update the latency estimate with a measured chunk time"""
+        previous = self._chunk_seconds.get(num_beams)
+        if previous is None:
+            self._chunk_seconds[num_beams] = seconds
+        else:
+            self._chunk_seconds[num_beams] = (1 - LATENCY_SMOOTHING) * previous + LATENCY_SMOOTHING * seconds
+
+    @staticmethod
+    def _beam_cost(num_beams: int) -> float:
+        return 0.6 + 0.4 * num_beams
+
+    def timed_summarize(self, text: str, num_beams: int = 1, max_tokens: int = 150) -> str:
+        """Summarize a chunk and record how long it took"""
+        started = time.perf_counter()
+        summary = self.summarize(text, num_beams, max_tokens)
+        self.observe(num_beams, time.perf_counter() - started)
+        return summary
+
+
+class BartBackend(SummarizerBackend):
+    """Abstractive summarization with a BART-family model"""
+
+    beam_options = (4, 2, 1)
+
+    def __init__(self, model_name: str = "facebook/bart-large-cnn", mode: str = "fp32",
+                 default_chunk_seconds: float = 4.0, load_seconds: float = 20.0):
+        super().__init__()
+        self.name = model_name.split("/")[-1]
+        self.model_name = model_name
+        self.mode = mode
+        self.default_chunk_seconds = default_chunk_seconds
+        self.load_seconds = load_seconds
+        self._loaded = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return (self.model_name, self.mode) in _loaded_models
+
+    def _load(self):
+        if self._loaded is None:
+            self._loaded = _load_bart(self.model_name, self.mode)
+        return self._loaded
+
+    @property
+    def tokenizer(self):
+        # Counting tokens for chunking shouldn't force the model to load
+        return _load_tokenizer(self.model_name)
+
+    @property
+    def model(self):
+        return self._load()[1]
+
+    @property
+    def device(self) -> str:
+        return self._load()[2]
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenizer(text, truncation=False).input_ids)
+
+    def summarize(self, text: str, num_beams: int = 4, max_tokens: int = 150) -> str:
+        import torch
+
+        tokenizer, model, device = self._load()
+        inputs = tokenizer(text, max_length=1024, return_tensors="pt", truncation=True).to(device)
+
+        with torch.inference_mode():
+            summary_ids = model.generate(
+                inputs.input_ids,
+                max_length=max_tokens,
+                min_length=min(MIN_SUMMARY_TOKENS, max_tokens // 2),
+                length_penalty=2.0,
+                num_beams=num_beams,
+                early_stopping=True
+            )
+
+        return tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+
+
+class ExtractiveBackend(SummarizerBackend):
+    """
+    Extractive summarization with TextRank sentence ranking.
+
+    Runs in milliseconds per chunk, so it is the last resort when a time
+    budget can't fit any abstractive model.
+    """
+
+    name = "extractive"
+    abstractive = False
+    default_chunk_seconds = 0.01
+
+    def __init__(self):
+        super().__init__()
+        self.summarizer = ExtractiveSummarizer()
+
+    def summarize(self, text: str, num_beams: int = 1, max_tokens: int = 150) -> str:
+        return self.summarizer.generate_summary(text, max_length=int(max_tokens / TOKENS_PER_WORD))
+
+
+# Backends selectable by name
+BACKENDS: Dict[str, Callable[..., SummarizerBackend]] = {
+    "bart-large-cnn": lambda mode="fp32": BartBackend("facebook/bart-large-cnn", mode=mode,
+                                                      default_chunk_seconds=4.0, load_seconds=20.0),
+    "distilbart-cnn-6-6": lambda mode="fp32": BartBackend("sshleifer/distilbart-cnn-6-6", mode=mode,
+                                                          default_chunk_seconds=1.5, load_seconds=10.0),
+    "extractive": lambda mode="fp32": ExtractiveBackend(),
+}
+
+
+def get_backend(name: str, mode: str = "fp32") -> SummarizerBackend:
+    """Create a summarizer backend by name"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown summarizer backend: {name}")
+    return BACKENDS[name](mode=mode)
@@ -0,0 +1,270 @@
+import gc
+import os
+import sys
+import argparse
+import multiprocessing
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple
+
+from backend.processors import (PREWARM_STEPS, get_summarizer, get_entity_extractor, get_clause_identifier,
+                                index_key_clauses, prewarm)
+from backend.processors.instrumentation import record_stages, process_memory
+
+# Read by the OpenMP/BLAS runtimes when a worker starts its first thread pool
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def analyze_text(text: str, document_id: Optional[str] = None, focus_areas: Optional[List[str]] = None,
+                 time_budget: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Full analysis of one document with the shared processors
+
+    Produces the same dictionary as the Document View (summary with its
+    chunks, key clauses, entities, document type and summary settings),
+    without the progress display. Documents over LARGE_DOCUMENT_CHARS are
+    analyzed section by section by BoundedAnalyzer, as in the Document View.
+    """
+    from backend.processors.bounded_analysis import BoundedAnalyzer
+    from backend.processors.document_processor import DocumentProcessor
+
+    if BoundedAnalyzer.should_use(len(text)):
+        return BoundedAnalyzer().analyze(len(text), lambda start, end: text[start:end], document_id=document_id,
+                                         focus_areas=focus_areas)
+
+    document_type = DocumentProcessor().identify_document_type(text)
+
+    summarizer = get_summarizer()
+    summary_chunks = []
+    summary_settings = {}
+    for part in summarizer.iter_summary(text, focus_areas=focus_areas, time_budget=time_budget):
+        if "settings" in part:
+            summary_settings = part["settings"]
+        else:
+            summary_chunks.append({"start": part["start"], "end": part["end"], "summary": part["summary"]})
+    summary = summarizer.combine_summaries([chunk["summary"] for chunk in summary_chunks], focus_areas)
+
+    return {
+        "document_id": document_id,
+        "summary": summary,
+        "summary_chunks": summary_chunks,
+        "key_clauses": get_clause_identifier().identify_key_clauses(text, document_type),
+        "entities": get_entity_extractor().extract_entities(text),
+        "document_type": document_type,
+        "summary_settings": summary_settings,
+    }
+
+
+def _megabytes(memory: Dict[str, int]) -> Dict[str, float]:
+    return {f"{key}_mb": round(value / 2**20, 1) for key, value in memory.items()}
+
+
+def _init_worker(threads: int) -> None:
+    """Runs once in each forked worker"""
+    # Keep the inherited objects out of this worker's collections. Freezing only relinks
+    # the collector's lists, so it doesn't touch (and un-share) the objects themselves.
+    gc.freeze()
+
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+
+    # torch is already loaded when the parent prewarmed the summarization model
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Can only be set before the first parallel operation in this process
+            pass
+
+
+def _run_task(task: Tuple[Optional[str], str, Dict[str, Any]]) -> Dict[str, Any]:
+    document_id, text, options = task
+    with record_stages() as recorder:
+        analysis = analyze_text(text, document_id=document_id, **options)
+    # Spilled entities are a file of this worker; the parent gets them as a list
+    analysis["entities"] = list(analysis["entities"])
+    analysis["metrics"] = recorder.summary()
+    analysis["metrics"]["worker"] = {"pid": os.getpid(), **_megabytes(process_memory())}
+    return analysis
+
+
+class AnalysisWorkerPool:
+    """
+    Pre-fork pool of analysis workers sharing one copy of the models.
+
+    start() loads the spaCy pipeline and the summarization model in this
+    process, moves every live object into the garbage collector's
+    permanent generation (gc.freeze) and then forks the workers. The
+    workers inherit the model weights copy-on-write; since they only read
+    them and the collector no longer touches the frozen objects, those
+    pages stay shared and a worker's unique memory is little more than
+    its own parses and activations (see memory_report()). Each worker
+    keeps them frozen, including replacements forked later; this process
+    unfreezes them as soon as the workers have started.
+
+    Each worker runs torch with threads_per_worker intra-op threads, so
+    workers × threads_per_worker does not oversubscribe the CPUs.
+
+    Start the pool before this process runs any inference (OpenMP thread
+    pools do not survive fork) and from a process without busy background
+    threads, e.g. a batch job rather than a Streamlit session.
+    """
+
+    def __init__(self, workers: Optional[int] = None, threads_per_worker: Optional[int] = None,
+                 prewarm_steps: Optional[Sequence[str]] = None, max_tasks_per_worker: Optional[int] = None):
+        """
+        Args:
+            workers: Number of worker processes (default: one per CPU
+                divided by threads_per_worker)
+            threads_per_worker: torch threads per worker (default: CPUs
+                divided by workers, at least 1)
+            prewarm_steps: Names from PREWARM_STEPS to load before forking
+                (default: all)
+            max_tasks_per_worker: Replace a worker after this many documents
+                to return memory it accumulated; the replacement is forked
+                from this process and shares the models again
+        """
+        cpus = os.cpu_count() or 1
+        if workers is None:
+            workers = max(1, cpus // (threads_per_worker or 1))
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, cpus // workers)
+        self.prewarm_steps = list(prewarm_steps or PREWARM_STEPS)
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.prewarm_seconds: Dict[str, float] = {}
+        self._pool = None
+
+    def start(self) -> "AnalysisWorkerPool":
+        """Load the models and fork the workers (once)"""
+        if self._pool is not None:
+            return self
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("AnalysisWorkerPool needs the fork start method, which this platform lacks")
+
+        self.prewarm_seconds = prewarm(self.prewarm_steps)
+
+        # Objects in the permanent generation are never traversed by the collector,
+        # so collections in the workers don't write to (and un-share) their pages
+        gc.collect()
+        gc.freeze()
+
+        context = multiprocessing.get_context("fork")
+        try:
+            self._pool = context.Pool(self.workers, initializer=_init_worker, initargs=(self.threads_per_worker,),
+                                      maxtasksperchild=self.max_tasks_per_worker)
+        finally:
+            # The workers have forked; this process collects its objects as usual again
+            gc.unfreeze()
+        return self
+
+    def close(self) -> None:
+        """Finish queued documents and stop the workers"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> "AnalysisWorkerPool":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def analyze(self, text: str, document_id: Optional[str] = None, **options: Any) -> Dict[str, Any]:
+        """
+        Analyze one document in a worker
+
+        Args:
+            text: Document text
+            document_id: Stored in the analysis
+            **options: focus_areas and time_budget, as for analyze_text
+
+        Returns:
+            The analysis, with stage metrics and the worker's pid and memory
+            under "metrics"
+        """
+        return self.start()._pool.apply(_run_task, ((document_id, text, options),))
+
+    def analyze_many(self, documents: Iterable[Tuple[Optional[str], str]], ordered: bool = True,
+                     **options: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze (document_id, text) pairs across the workers
+
+        Args:
+            documents: Pairs of document ID and text
+            ordered: Yield in input order; otherwise as each one finishes
+            **options: As for analyze
+
+        Yields:
+            One analysis per document
+        """
+        tasks = ((document_id, text, options) for document_id, text in documents)
+        pool = self.start()._pool
+        mapper = pool.imap if ordered else pool.imap_unordered
+        yield from mapper(_run_task, tasks)
+
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        Current memory of this process and each worker, in MB
+
+        uss is what a worker costs on its own: the memory freed by stopping
+        it, and roughly what one more worker would add. The shared models
+        are counted under the parent (and as pss, split across everyone).
+        """
+        workers = [{"pid": process.pid, **_megabytes(process_memory(process.pid))}
+                   for process in multiprocessing.active_children()]
+        parent = {"pid": os.getpid(), **_megabytes(process_memory())}
+        processes = [parent] + workers
+        return {
+            "parent": parent,
+            "workers": workers,
+            "total_rss_mb": round(sum(p.get("rss_mb", 0) for p in processes), 1),
+            "total_pss_mb": round(sum(p.get("pss_mb", 0) for p in processes), 1),
+            "max_worker_uss_mb": max((w.get("uss_mb", 0) for w in workers), default=0.0),
+        }
+
+    def workers_that_fit(self, memory_mb: float) -> int:
+        """Number of workers of the current size that fit beside this process in memory_mb"""
+        report = self.memory_report()
+        per_worker = report["max_worker_uss_mb"]
+        if not per_worker:
+            return 0
+        return max(0, int((memory_mb - report["parent"].get("rss_mb", 0)) // per_worker))
+
+
+def main(argv: List[str] = None) -> None:
+    """Analyze stored documents that have no analysis yet, in parallel"""
+    parser = argparse.ArgumentParser(description="Analyze stored documents with a pre-fork worker pool")
+    parser.add_argument("document_ids", nargs="*", help="Documents to analyze (default: all without an analysis)")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--threads", type=int, help="torch threads per worker")
+    parser.add_argument("--time-budget", type=float, help="Seconds per document summary")
+    args = parser.parse_args(argv)
+
+    from backend.database.db_handler import db_handler
+
+    document_ids = args.document_ids or [doc["id"] for doc in db_handler.list_documents()
+                                         if db_handler.get_analysis(doc["id"]) is None]
+    if not document_ids:
+        print("Nothing to analyze")
+        return
+
+    with AnalysisWorkerPool(args.workers, args.threads) as pool:
+        print(f"{pool.workers} workers × {pool.threads_per_worker} threads; models loaded in "
+              f"{sum(pool.prewarm_seconds.values()):.1f}s")
+        documents = ((doc_id, db_handler.read_span(doc_id)) for doc_id in document_ids)
+        for analysis in pool.analyze_many(documents, ordered=False, time_budget=args.time_budget):
+            # Embedding ten clauses is cheap next to the analysis, so it runs here rather than in the worker
+            index_key_clauses(db_handler, analysis["document_id"], analysis["key_clauses"])
+            db_handler.save_analysis(analysis["document_id"], analysis)
+            worker = analysis["metrics"]["worker"]
+            print(f"  {analysis['document_id']}: {analysis['metrics']['wall_seconds']:.1f}s "
+                  f"(worker {worker['pid']}, uss {worker.get('uss_mb', 0)} MB)")
+
+        report = pool.memory_report()
+        print(f"Parent rss {report['parent'].get('rss_mb', 0)} MB; per-worker uss up to "
+              f"{report['max_worker_uss_mb']} MB; total pss {report['total_pss_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Size and load-time comparison of analysis storage formats.
+
+Compares the original single indent=2 JSON file against the columnar,
+per-section format written by AnalysisStore.
+
+Usage:
+    python -m benchmarks.analysis_storage_benchmark --entities 500 5000 50000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from backend.database.db_handler import DatabaseHandler
+
+LABELS = ["PERSON", "ORG", "DATE", "MONEY", "GPE", "LEGAL_REFERENCE", "PARTY", "CASE_CITATION"]
+NAMES = ["Acme Corp", "John Smith", "January 1, 2024", "$5,000", "New York", "Section 12",
+         "Plaintiff", "Smith v. Jones, 123 F.3d 456 (9th Cir. 1990)"]
+
+
+def generate(rng: random.Random, entity_count: int, content_chars: int):
+    """Generate document content and a matching analysis"""
+    content = " ".join(rng.choice(NAMES) for _ in range(content_chars // 10))[:content_chars]
+    entities = []
+    for _ in range(entity_count):
+        start = rng.randrange(0, content_chars - 50)
+        index = rng.randrange(len(LABELS))
+        entity = {"text": NAMES[index], "label": LABELS[index], "start_char": start,
+                  "end_char": start + len(NAMES[index])}
+        if LABELS[index] == "CASE_CITATION":
+            entity.update({"plaintiff": "Smith", "defendant": "Jones"})
+        entities.append(entity)
+
+    clauses = []
+    for i in range(10):
+        start = rng.randrange(0, content_chars - 5000)
+        clauses.append({"title": f"Section {i}", "text": content[start:start + 5000], "type": "payment",
+                        "confidence": 0.5, "importance": 0.8, "start_char": start, "end_char": start + 5000})
+
+    analysis = {"document_id": "doc", "summary": "Summary text. " * 40, "key_clauses": clauses,
+                "entities": entities, "document_type": "contract"}
+    return content, analysis
+
+
+def timed(fn, repeats: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def run(entity_count: int, content_chars: int) -> None:
+    content, analysis = generate(random.Random(entity_count), entity_count, content_chars)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseHandler(tmp)
+        db.save_document({"id": "doc", "filename": "doc.txt", "content": content, "upload_date": ""})
+
+        # Original format: one indented JSON file
+        legacy_path = os.path.join(tmp, "legacy.json")
+        with open(legacy_path, "w") as f:
+            json.dump(analysis, f, indent=2)
+
+        def load_legacy():
+            with open(legacy_path) as f:
+                return json.load(f)
+
+        db.save_analysis("doc", dict(analysis))
+        new_size = directory_size(os.path.join(db.analyses_dir, "doc"))
+
+        print(f"\n{entity_count} entities, 10 clauses of 5000 chars")
+        print(f"  size:          legacy {os.path.getsize(legacy_path) / 1024:8.1f} KB   "
+              f"columnar {new_size / 1024:8.1f} KB")
+        print(f"  summary only:  legacy {timed(lambda: load_legacy()['summary']):8.2f} ms   "
+              f"columnar {timed(lambda: db.get_analysis('doc')['summary']):8.2f} ms")
+        print(f"  entities:      legacy {timed(lambda: load_legacy()['entities']):8.2f} ms   "
+              f"columnar {timed(lambda: db.get_analysis('doc')['entities']):8.2f} ms")
+        print(f"  full analysis: legacy {timed(load_legacy):8.2f} ms   "
+              f"columnar {timed(lambda: db.get_analysis('doc').to_dict()):8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entities", type=int, nargs="+", default=[500, 5000, 50000])
+    parser.add_argument("--content-chars", type=int, default=500000)
+    args = parser.parse_args()
+
+    for entity_count in args.entities:
+        run(entity_count, args.content_chars)
+
+
+if __name__ == "__main__":
+    main()
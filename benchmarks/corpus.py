@@ -0,0 +1,223 @@
+"""
+Deterministic synthetic legal corpus for benchmarks.
+
+Generates contracts and court filings with numbered sections, case,
+statute and regulation citations and money amounts. The same seed and
+parameters always produce the same text, so benchmark runs are
+comparable across machines and commits.
+
+Usage:
+    python -m benchmarks.corpus --documents 5 --sections 20 --out /tmp/corpus
+"""
+import argparse
+import os
+import random
+from typing import Dict, List, Any, Iterator
+
+PARTIES = ["Acme Corporation", "Globex Inc.", "Initech LLC", "Umbrella Holdings", "Stark Industries",
+           "Wayne Enterprises", "Hooli Ltd.", "Vandelay Industries", "Soylent Corp.", "Tyrell Systems"]
+PEOPLE = ["John Smith", "Maria Garcia", "Wei Chen", "Aisha Khan", "Robert Brown", "Emma Wilson"]
+CITIES = ["New York", "Delaware", "California", "Texas", "Illinois", "Massachusetts"]
+COURTS = ["United States District Court for the Southern District of New York",
+          "United States District Court for the District of Delaware",
+          "Superior Court of California"]
+
+CASE_NAMES = ["Smith v. Jones", "Brown v. Board of Education", "Roe v. Wade", "Marbury v. Madison",
+              "Hadley v. Baxendale", "Palsgraf v. Long Island Railroad", "Doe v. Acme Corp."]
+REPORTERS = ["U.S.", "F.3d", "F.2d", "F. Supp. 2d", "F. Supp. 3d", "S. Ct.", "N.E.2d", "A.3d", "P.3d"]
+CIRCUITS = ["9th Cir.", "2d Cir.", "D.C. Cir.", "S.D.N.Y.", "D. Del.", ""]
+
+# Clause types and sentences recognized by ClauseIdentifier's keyword lists
+CONTRACT_CLAUSES = {
+    "Payment": "The Buyer shall pay the Seller a fee of {money} as consideration for the services, "
+               "and compensation shall be due within {days} days of each invoice.",
+    "Indemnification": "Each party shall indemnify and hold harmless the other party from any claims, "
+                       "damages or losses arising from a breach of this Agreement.",
+    "Termination": "Either party may terminate this Agreement upon {days} days written notice, and "
+                   "termination shall not affect accrued rights upon expiration.",
+    "Confidentiality": "The Recipient shall not disclose any confidential or proprietary information "
+                       "and shall keep all trade secrets of the Discloser secret.",
+    "Force Majeure": "Neither party is liable for delays caused by force majeure, an act of God or "
+                     "other events beyond control of the affected party.",
+    "Governing Law": "This Agreement shall be governed by the law of {city}, and the parties consent "
+                     "to the jurisdiction and venue of its courts.",
+    "Definitions": "Capitalized terms shall have the meaning defined in this Section, and each "
+                   "definition applies to both singular and plural forms.",
+    "Warranties": "The Seller represents and warrants that the goods conform to specifications and "
+                  "guarantees title free of liens, and assures compliance with law.",
+    "Limitation of Liability": "Except for indemnification obligations, liability is limited to "
+                               "{money}, and the parties exclude consequential damages.",
+}
+
+FILING_SECTIONS = {
+    "Introduction": "Plaintiff {plaintiff} brings this action against Defendant {defendant} and "
+                    "seeks relief for breach of contract and related claims.",
+    "Jurisdiction and Venue": "This Court has jurisdiction under 28 U.S.C. § 1331, and venue is "
+                              "proper in this forum under 28 U.S.C. § 1391(b).",
+    "Statement of Facts": "The factual background is as follows. On {date}, the parties executed an "
+                          "agreement under which Defendant agreed to pay {money}.",
+    "Legal Argument": "Plaintiff contends that Defendant breached its obligations, and the argument "
+                      "is supported by controlling authority.",
+    "Relief Sought": "Plaintiff respectfully requests that the Court grant relief and demands "
+                     "damages of not less than {money}.",
+    "Conclusion": "Wherefore, for the foregoing reasons, Plaintiff prays that judgment be entered "
+                  "in its favor, and therefore the motion should be granted.",
+}
+
+FILLER_SENTENCES = [
+    "The parties acknowledge that they have read and understood the provisions of this section.",
+    "Nothing in this section shall be construed to create a partnership or joint venture.",
+    "Any notice under this section shall be in writing and delivered to the addresses above.",
+    "The obligations in this section survive for a period of {days} days after the effective date.",
+    "Failure to enforce any provision shall not constitute a waiver of that provision.",
+    "The headings in this section are for convenience only and do not affect interpretation.",
+]
+
+
+def _money(rng: random.Random) -> str:
+    amount = rng.choice([rng.randrange(1, 1000) * 1000, rng.randrange(1, 100) * 100000])
+    style = rng.randrange(4)
+    if style == 0:
+        return f"${amount:,}"
+    if style == 1:
+        return f"${amount / 1e6:g} million"
+    if style == 2:
+        return f"USD {amount:,}"
+    return f"{amount:,} dollars"
+
+
+def _citation(rng: random.Random) -> str:
+    kind = rng.randrange(3)
+    if kind == 0:
+        court = rng.choice(CIRCUITS)
+        year = rng.randrange(1950, 2024)
+        pin = f", {rng.randrange(100, 999)}" if rng.random() < 0.5 else ""
+        return (f"{rng.choice(CASE_NAMES)}, {rng.randrange(1, 999)} {rng.choice(REPORTERS)} "
+                f"{rng.randrange(1, 1500)}{pin} ({court + ' ' if court else ''}{year})")
+    if kind == 1:
+        return f"{rng.randrange(1, 50)} U.S.C. § {rng.randrange(1, 2000)}{rng.choice(['', '(a)', '(b)(1)'])}"
+    return f"{rng.randrange(1, 50)} C.F.R. § {rng.randrange(1, 999)}.{rng.randrange(1, 99)}"
+
+
+def _fill(template: str, rng: random.Random, parties: List[str]) -> str:
+    return template.format(money=_money(rng), days=rng.choice([10, 30, 60, 90]), city=rng.choice(CITIES),
+                           plaintiff=parties[0], defendant=parties[1],
+                           date=f"January {rng.randrange(1, 29)}, {rng.randrange(2000, 2024)}")
+
+
+def _section_body(rng: random.Random, lead: str, parties: List[str], sentences: int,
+                  citation_rate: float, money_rate: float) -> str:
+    parts = [_fill(lead, rng, parties)]
+    for _ in range(sentences):
+        sentence = _fill(rng.choice(FILLER_SENTENCES), rng, parties)
+        if rng.random() < citation_rate:
+            sentence = sentence[:-1] + f", consistent with {_citation(rng)}."
+        if rng.random() < money_rate:
+            sentence += f" The amount payable under this provision is {_money(rng)}."
+        parts.append(sentence)
+    return " ".join(parts)
+
+
+def generate_contract(seed: int, sections: int = 20, sentences_per_section: int = 6,
+                      citation_rate: float = 0.1, money_rate: float = 0.1) -> str:
+    """Synthetic contract with numbered sections cycling through the common clause types"""
+    rng = random.Random(seed)
+    parties = rng.sample(PARTIES, 2)
+    titles = list(CONTRACT_CLAUSES)
+    rng.shuffle(titles)
+
+    lines = [
+        f"MASTER SERVICES AGREEMENT No. {seed}",
+        "",
+        f"This Agreement is entered into between {parties[0]} (the \"Seller\") and {parties[1]} "
+        f"(the \"Buyer\"). The parties hereby agree to the following terms and conditions.",
+        "",
+    ]
+    for number in range(1, sections + 1):
+        title = titles[(number - 1) % len(titles)]
+        lines.append(f"Section {number}. {title}")
+        lines.append(_section_body(rng, CONTRACT_CLAUSES[title], parties, sentences_per_section,
+                                   citation_rate, money_rate))
+        lines.append("")
+    lines.append(f"IN WITNESS WHEREOF, the parties have executed this Agreement. "
+                 f"Signed by {rng.choice(PEOPLE)} and {rng.choice(PEOPLE)}.")
+    return "\n".join(lines)
+
+
+def generate_filing(seed: int, sections: int = 20, sentences_per_section: int = 6,
+                    citation_rate: float = 0.3, money_rate: float = 0.05) -> str:
+    """Synthetic court filing with Roman-numeral sections and dense citations"""
+    rng = random.Random(seed)
+    parties = rng.sample(PARTIES, 2)
+    titles = list(FILING_SECTIONS)
+
+    lines = [
+        f"IN THE {rng.choice(COURTS).upper()}",
+        f"Case No. {rng.randrange(1, 25)}-cv-{rng.randrange(1000, 9999)}",
+        f"{parties[0]}, Plaintiff, v. {parties[1]}, Defendant.",
+        "",
+    ]
+    for number in range(1, sections + 1):
+        title = titles[(number - 1) % len(titles)]
+        lines.append(f"{_roman(number)}. {title.upper()}")
+        lines.append(_section_body(rng, FILING_SECTIONS[title], parties, sentences_per_section,
+                                   citation_rate, money_rate))
+        lines.append("")
+    lines.append(f"Respectfully submitted, {rng.choice(PEOPLE)}, Counsel for Plaintiff.")
+    return "\n".join(lines)
+
+
+def _roman(number: int) -> str:
+    numerals = [(1000, "M"), (900, "CM"), (500, "D"), (400, "CD"), (100, "C"), (90, "XC"),
+                (50, "L"), (40, "XL"), (10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I")]
+    result = ""
+    for value, numeral in numerals:
+        while number >= value:
+            result += numeral
+            number -= value
+    return result
+
+
+def generate_corpus(documents: int, seed: int = 0, sections: int = 20, filing_ratio: float = 0.3,
+                    **options: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Yield synthetic documents in the form accepted by DatabaseHandler.save_document
+
+    Args:
+        documents: Number of documents
+        seed: Base seed; document i uses seed + i
+        sections: Sections per document
+        filing_ratio: Share of court filings (the rest are contracts)
+        **options: Passed to generate_contract / generate_filing
+            (sentences_per_section, citation_rate, money_rate)
+    """
+    rng = random.Random(seed)
+    for i in range(documents):
+        is_filing = rng.random() < filing_ratio
+        generate = generate_filing if is_filing else generate_contract
+        yield {
+            "id": f"synthetic-{seed}-{i}",
+            "filename": f"{'filing' if is_filing else 'contract'}-{seed}-{i}.txt",
+            "content": generate(seed + i, sections=sections, **options),
+            "upload_date": f"2024-01-01T00:00:{i % 60:02d}",
+            "document_type": "court_filing" if is_filing else "contract",
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=5)
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="Directory for the generated .txt files")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for document in generate_corpus(args.documents, seed=args.seed, sections=args.sections):
+        with open(os.path.join(args.out, document["filename"]), "w", encoding="utf-8") as f:
+            f.write(document["content"])
+    print(f"Wrote {args.documents} documents to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Peak memory of memory-bounded analysis on a very large generated filing.
+
+Streams a synthetic document of the requested size into a content store
+(never holding it whole), loads the spaCy processors, then analyzes it
+with BoundedAnalyzer, saves the analysis as the app does, and checks that
+the process's peak resident memory (models included) stayed within the
+budget. Exits with status 1 if it did not, so it can gate a CI job.
+
+Usage:
+    python -m benchmarks.memory_budget_benchmark --size-mb 100 --budget-mb 2500
+    python -m benchmarks.memory_budget_benchmark --size-mb 10 --headroom-mb 400
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Iterator
+
+from benchmarks.corpus import generate_contract, generate_filing
+from backend.processors.instrumentation import current_rss, peak_rss
+
+
+def generate_document(size_chars: int, seed: int = 0) -> Iterator[str]:
+    """Preprocessed text of a long record: generated filings and exhibits, one at a time"""
+    from backend.processors.document_processor import DocumentProcessor
+
+    processor = DocumentProcessor()
+    written = 0
+    part = 0
+    while written < size_chars:
+        generate = generate_filing if part % 3 == 0 else generate_contract
+        text = processor.preprocess_text(generate(seed + part, sections=40)) + " "
+        text = text[:size_chars - written]
+        written += len(text)
+        part += 1
+        yield text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=100.0, help="Document size in millions of characters")
+    parser.add_argument("--budget-mb", type=float, help="Peak RSS ceiling (default: RSS after loading the "
+                                                         "models plus --headroom-mb)")
+    parser.add_argument("--headroom-mb", type=float, default=512.0)
+    parser.add_argument("--section-chars", type=int)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    import spacy
+    from backend.processors.nlp import MODEL_NAME
+
+    if not spacy.util.is_package(MODEL_NAME):
+        print(f"Skipped: spaCy model {MODEL_NAME} is not installed")
+        return
+
+    from backend.database.db_handler import DatabaseHandler
+    from backend.processors.bounded_analysis import BoundedAnalyzer, DEFAULT_SECTION_CHARS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseHandler(os.path.join(tmp, "data"))
+        store = db.content_store
+        size_chars = int(args.size_mb * 1e6)
+        started = time.perf_counter()
+        length = store.write_stream("large", generate_document(size_chars))
+        print(f"Generated {length / 1e6:.0f}M characters in {time.perf_counter() - started:.1f}s")
+
+        # Building the analyzer loads the spaCy processors, which count towards the budget
+        analyzer = BoundedAnalyzer(section_chars=args.section_chars or DEFAULT_SECTION_CHARS, spill_dir=tmp)
+        baseline_mb = current_rss() / 2**20
+        budget_mb = args.budget_mb or baseline_mb + args.headroom_mb
+        analyzer.memory_budget_mb = budget_mb
+        print(f"Models loaded: {baseline_mb:.0f} MB resident; budget {budget_mb:.0f} MB")
+
+        started = time.perf_counter()
+        analysis = analyzer.analyze(length, lambda start, end: store.read_span("large", start, end),
+                                    document_id="large")
+        elapsed = time.perf_counter() - started
+
+        # Saving writes the spilled entities to the analysis store and the entity index
+        started = time.perf_counter()
+        db.save_analysis("large", analysis)
+        save_elapsed = time.perf_counter() - started
+
+        # ru_maxrss covers every moment of the run, not just the samples taken between sections
+        peak_mb = peak_rss() / 2**20
+        results = {
+            "characters": length,
+            "seconds": round(elapsed, 1),
+            "chars_per_second": round(length / elapsed),
+            "save_seconds": round(save_elapsed, 1),
+            "baseline_rss_mb": round(baseline_mb, 1),
+            "budget_mb": round(budget_mb, 1),
+            "peak_rss_mb": round(peak_mb, 1),
+            "entities": len(analysis["entities"]),
+            "key_clauses": len(analysis["key_clauses"]),
+            "memory": analysis["memory"],
+        }
+        del analysis
+
+    print(f"Analyzed in {results['seconds']}s ({results['chars_per_second']:,} chars/s), "
+          f"{results['memory']['sections']} sections, {results['entities']:,} entities; "
+          f"saved in {results['save_seconds']}s")
+    print(f"Peak RSS {peak_mb:.0f} MB of {budget_mb:.0f} MB budget")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if peak_mb > budget_mb:
+        print("FAILED: peak memory exceeded the budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""
+Throughput benchmarks for the processors and DatabaseHandler, with a
+stored baseline.
+
+Every benchmark runs on the deterministic synthetic corpus from
+benchmarks.corpus at each requested scale and reports throughput (work
+units per second, best of --repeats). Results are compared against
+benchmarks/baseline.json; the run exits with status 1 if any throughput
+falls more than --threshold below its baseline. Benchmarks whose
+dependencies or models are not installed are reported as skipped.
+
+Usage:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --scales small medium --only list_documents read_span
+    python -m benchmarks.run_benchmarks --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+from benchmarks.corpus import generate_corpus, PARTIES
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Allowed drop in throughput before a run fails
+DEFAULT_THRESHOLD = 0.25
+
+SCALES = {
+    "small": {"documents": 20, "sections": 10},
+    "medium": {"documents": 100, "sections": 40},
+    "large": {"documents": 400, "sections": 160},
+}
+
+SEARCH_QUERIES = ["payment", "indemnify", '"force majeure"', "terminat*", "jurisdiction venue"]
+
+# A benchmark prepares its inputs and returns the callable to time and the work it performs
+Benchmark = Callable[[List[Dict[str, Any]], str], Tuple[Callable[[], Any], int]]
+
+BENCHMARKS: Dict[str, Tuple[str, Benchmark]] = {}
+
+
+class Skip(Exception):
+    """Raised by a benchmark whose dependencies are unavailable"""
+
+
+def benchmark(name: str, unit: str) -> Callable[[Benchmark], Benchmark]:
+    """Register a benchmark measured in the given work unit"""
+    def register(func: Benchmark) -> Benchmark:
+        BENCHMARKS[name] = (unit, func)
+        return func
+    return register
+
+
+def _require(factory: Callable[[], Any]) -> Any:
+    """Build a processor, skipping the benchmark if a dependency or model is missing"""
+    try:
+        return factory()
+    except (ImportError, OSError) as e:
+        raise Skip(str(e).splitlines()[0] if str(e) else type(e).__name__)
+
+
+def _require_model() -> None:
+    """Skip, rather than attempt a download, when the spaCy model is not installed"""
+    import spacy
+    from backend.processors.nlp import MODEL_NAME
+
+    if not spacy.util.is_package(MODEL_NAME):
+        raise Skip(f"spaCy model {MODEL_NAME} is not installed")
+
+
+def _total_chars(corpus: List[Dict[str, Any]]) -> int:
+    return sum(len(document["content"]) for document in corpus)
+
+
+def _database(corpus: List[Dict[str, Any]], tmp: str):
+    from backend.database.db_handler import DatabaseHandler
+
+    db = DatabaseHandler(os.path.join(tmp, "data"))
+    for document in corpus:
+        db.save_document(dict(document))
+    return db
+
+
+def _analysis(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Analysis with party-name entities and one clause per section, as stored after analyze"""
+    content = document["content"]
+    entities = [{"text": match.group(), "label": "ORG", "start_char": match.start(), "end_char": match.end()}
+                for match in re.finditer("|".join(re.escape(party) for party in PARTIES), content)]
+    clauses = [{"title": match.group().strip(), "type": "general", "confidence": 0.5, "importance": 0.5,
+                "start_char": match.start(), "end_char": min(len(content), match.start() + 500)}
+               for match in re.finditer(r"(?m)^(?:Section \d+|[IVXLCDM]+)\. .*$", content)]
+    return {"document_id": document["id"], "summary": content[:1000], "key_clauses": clauses,
+            "entities": entities, "document_type": document["document_type"]}
+
+
+# Processor stages
+
+@benchmark("document_type", "chars")
+def bench_document_type(corpus, tmp):
+    def build():
+        from backend.processors.document_processor import DocumentProcessor
+        return DocumentProcessor()
+
+    processor = _require(build)
+    return lambda: [processor.identify_document_type(document["content"]) for document in corpus], _total_chars(corpus)
+
+
+@benchmark("legal_rules", "chars")
+def bench_legal_rules(corpus, tmp):
+    def build():
+        from backend.processors.legal_rules import LEGAL_RULES_PATTERN
+        return LEGAL_RULES_PATTERN
+
+    pattern = _require(build)
+    return lambda: [sum(1 for _ in pattern.finditer(document["content"])) for document in corpus], _total_chars(corpus)
+
+
+@benchmark("extractive_summary", "chars")
+def bench_extractive_summary(corpus, tmp):
+    def build():
+        from backend.processors.extractive_summarizer import ExtractiveSummarizer
+        return ExtractiveSummarizer()
+
+    summarizer = _require(build)
+    return lambda: [summarizer.generate_summary(document["content"]) for document in corpus], _total_chars(corpus)
+
+
+@benchmark("chunk_text", "chars")
+def bench_chunk_text(corpus, tmp):
+    def build():
+        _require_model()
+        from backend.processors.summarizer import Summarizer
+        summarizer = Summarizer()
+        summarizer.tokenizer  # load the tokenizer outside the timed region
+        return summarizer
+
+    summarizer = _require(build)
+    return lambda: [summarizer._chunk_text(document["content"]) for document in corpus], _total_chars(corpus)
+
+
+@benchmark("identify_clause_type", "sections")
+def bench_identify_clause_type(corpus, tmp):
+    def build():
+        _require_model()
+        from backend.processors.clause_identifier import ClauseIdentifier
+        return ClauseIdentifier()
+
+    identifier = _require(build)
+    clause_types = {**identifier.default_clause_types, **identifier.key_clause_types["contract"]}
+    sections = [document["content"][start:end] for document in corpus
+                for start, end in identifier._section_spans(document["content"])]
+    return lambda: [identifier._identify_clause_type(section, clause_types) for section in sections], len(sections)
+
+
+@benchmark("identify_key_clauses", "chars")
+def bench_identify_key_clauses(corpus, tmp):
+    def build():
+        _require_model()
+        from backend.processors.clause_identifier import ClauseIdentifier
+        return ClauseIdentifier()
+
+    identifier = _require(build)
+    return lambda: [identifier.identify_key_clauses(document["content"], document["document_type"],
+                                                    use_document_parse=False)
+                    for document in corpus], _total_chars(corpus)
+
+
+@benchmark("extract_entities", "chars")
+def bench_extract_entities(corpus, tmp):
+    def build():
+        _require_model()
+        from backend.processors.entity_extractor import EntityExtractor
+        return EntityExtractor()
+
+    extractor = _require(build)
+    from backend.processors.doc_cache import ParsedDocCache
+
+    runs = iter(range(10 ** 6))
+
+    def run():
+        # A fresh parse cache per run, so every run parses
+        extractor.doc_cache = ParsedDocCache(os.path.join(tmp, f"parsed-{next(runs)}"), nlp=extractor.nlp)
+        return [extractor.extract_entities(document["content"]) for document in corpus]
+
+    return run, _total_chars(corpus)
+
+
+# DatabaseHandler operations
+
+@benchmark("save_document", "documents")
+def bench_save_document(corpus, tmp):
+    from backend.database.db_handler import DatabaseHandler
+
+    db = DatabaseHandler(os.path.join(tmp, "data"))
+    return lambda: [db.save_document(dict(document)) for document in corpus], len(corpus)
+
+
+@benchmark("list_documents", "documents")
+def bench_list_documents(corpus, tmp):
+    db = _database(corpus, tmp)
+    return db.list_documents, len(corpus)
+
+
+@benchmark("read_span", "reads")
+def bench_read_span(corpus, tmp):
+    db = _database(corpus, tmp)
+    rng = random.Random(0)
+    spans = []
+    for _ in range(500):
+        document = rng.choice(corpus)
+        start = rng.randrange(max(1, len(document["content"]) - 2000))
+        spans.append((document["id"], start, start + 2000))
+    # Excerpts are what the Document view pages through; drop cached full copies first
+    return lambda: (db.cache.clear(), [db.read_span(*span) for span in spans]), len(spans)
+
+
+@benchmark("search_documents", "queries")
+def bench_search_documents(corpus, tmp):
+    db = _database(corpus, tmp)
+    return lambda: [db.search_documents(query) for query in SEARCH_QUERIES], len(SEARCH_QUERIES)
+
+
+@benchmark("find_duplicates", "documents")
+def bench_find_duplicates(corpus, tmp):
+    db = _database(corpus, tmp)
+    return lambda: [db.find_duplicates(document["content"], exclude=document["id"]) for document in corpus], len(corpus)
+
+
+@benchmark("save_analysis", "analyses")
+def bench_save_analysis(corpus, tmp):
+    db = _database(corpus, tmp)
+    analyses = [_analysis(document) for document in corpus]
+    return lambda: [db.save_analysis(analysis["document_id"], dict(analysis)) for analysis in analyses], len(analyses)
+
+
+@benchmark("get_analysis", "analyses")
+def bench_get_analysis(corpus, tmp):
+    db = _database(corpus, tmp)
+    for document in corpus:
+        db.save_analysis(document["id"], _analysis(document))
+
+    def run():
+        db.cache.clear()
+        return [db.get_analysis(document["id"]).to_dict() for document in corpus]
+
+    return run, len(corpus)
+
+
+def run_benchmark(name: str, scale: str, repeats: int) -> Dict[str, Any]:
+    """Run one benchmark at one scale"""
+    unit, func = BENCHMARKS[name]
+    corpus = list(generate_corpus(SCALES[scale]["documents"], seed=0, sections=SCALES[scale]["sections"]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            fn, work = func(corpus, tmp)
+        except Skip as e:
+            return {"skipped": str(e)}
+
+        best = float("inf")
+        for _ in range(repeats):
+            started = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - started)
+
+    return {"seconds": round(best, 6), "work": work, "unit": unit, "throughput": work / best if best > 0 else float("inf")}
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Descriptions of results whose throughput fell more than threshold below the baseline"""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get("results", {}).get(key)
+        if "throughput" not in result or not reference or "throughput" not in reference:
+            continue
+        ratio = result["throughput"] / reference["throughput"]
+        result["baseline_ratio"] = round(ratio, 3)
+        if ratio < 1 - threshold:
+            regressions.append(f"{key}: {result['throughput']:,.1f} {result['unit']}/s is "
+                               f"{(1 - ratio) * 100:.0f}% below baseline {reference['throughput']:,.1f}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run (default: all)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed fractional throughput drop (default: %(default)s)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write these results to the baseline file instead of comparing")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.only or list(BENCHMARKS):
+        for scale in args.scales:
+            key = f"{name}@{scale}"
+            result = run_benchmark(name, scale, args.repeats)
+            results[key] = result
+            if "skipped" in result:
+                print(f"{key:<32} skipped ({result['skipped']})")
+            else:
+                print(f"{key:<32} {result['throughput']:>14,.1f} {result['unit']}/s  ({result['seconds'] * 1000:.1f} ms)")
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+    if args.save_baseline:
+        # Merge, so a partial run only replaces the benchmarks it ran
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        measured = {key: result for key, result in results.items() if "throughput" in result}
+        report["results"] = {**baseline.get("results", {}), **measured}
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nBaseline with {len(measured)} results written to {args.baseline}")
+        return 0
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if regressions:
+        print("\nThroughput regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
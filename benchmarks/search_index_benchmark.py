@@ -0,0 +1,90 @@
+"""
+Query latency benchmark for the corpus-wide search index.
+
+Builds an index over synthetic contracts and times term, phrase and
+prefix queries.
+
+Usage:
+    python -m benchmarks.search_index_benchmark --sizes 10000 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from backend.database.search_index import SearchIndex
+
+VOCABULARY = (
+    "agreement party parties shall must payment fee term termination notice breach "
+    "confidential information indemnify indemnification damages liquidated liability "
+    "warranty represent governing law jurisdiction venue arbitration assignment seller "
+    "buyer licensor licensee services deliverables effective date renewal force majeure "
+    "obligation consent written amendment waiver severability entire remedies"
+).split()
+
+QUERIES = [
+    "payment",
+    "indemnification",
+    "liquidated damages",
+    '"liquidated damages"',
+    '"governing law"',
+    "indemn*",
+    "term*",
+    "arbitration venue",
+    "word4000",
+]
+
+
+# Long tail of rarer words so postings lists have a realistic size distribution
+FILLER = [f"word{i}" for i in range(5000)]
+WORDS = VOCABULARY + FILLER
+WEIGHTS = [1.0 / (rank + 1) for rank in range(len(WORDS))]
+
+
+def generate_document(rng: random.Random, words: int = 400) -> str:
+    """Generate a synthetic contract-like document with Zipf-distributed words"""
+    return " ".join(rng.choices(WORDS, weights=WEIGHTS, k=words))
+
+
+def run(size: int, repeats: int) -> None:
+    rng = random.Random(size)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SearchIndex(os.path.join(tmp, "search.sqlite3"))
+
+        started = time.perf_counter()
+        index.add_documents(
+            {"id": f"doc-{i}", "filename": f"doc-{i}.txt", "content": generate_document(rng)}
+            for i in range(size)
+        )
+        build_seconds = time.perf_counter() - started
+        print(f"\n{size} documents indexed in {build_seconds:.1f}s")
+
+        # Incremental update of a single document
+        started = time.perf_counter()
+        index.add_document("doc-0", generate_document(rng))
+        print(f"  re-index one document: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        for query in QUERIES:
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                results = index.search(query, limit=10)
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"  {query:<24} median {statistics.median(timings):8.1f} ms  "
+                  f"max {max(timings):8.1f} ms  ({len(results)} results)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
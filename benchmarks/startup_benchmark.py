@@ -0,0 +1,118 @@
+"""
+Cold-start benchmark: import times and time to first render of each page.
+
+Every measurement runs in a fresh interpreter. For the backend modules it
+times the import; for each Streamlit page it runs the script in bare
+mode (no server, widgets return their defaults) against an empty data
+directory, which is how long a first visit takes before anything is
+shown. Heavy libraries the page pulled in are listed, so a page that
+imports torch or spaCy just to render the library shows up immediately.
+
+Usage:
+    python -m benchmarks.startup_benchmark
+    python -m benchmarks.startup_benchmark --repeats 5 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = ["app.py", "pages/1_Upload.py", "pages/2_Document_View.py", "pages/3_About.py"]
+
+MODULES = [
+    "backend.processors",
+    "backend.database.db_handler",
+    "backend.processors.document_processor",
+    "backend.processors.extractive_summarizer",
+    "backend.processors.summarizer",
+    "backend.processors.entity_extractor",
+    "backend.processors.clause_identifier",
+]
+
+HEAVY_MODULES = ["torch", "transformers", "spacy", "sklearn", "fitz", "docx"]
+
+# Runs in the child interpreter; prints one JSON line
+_PROBE = """
+import json, sys, time
+{setup}
+started = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_IMPORT_BODY = "import {module}"
+
+_PAGE_SETUP = """
+import logging, runpy
+import streamlit
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+"""
+
+_PAGE_BODY = "runpy.run_path({path!r}, run_name='__main__')"
+
+
+def _probe(setup: str, body: str, cwd: str) -> Dict[str, Any]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    env.pop("LEGALEASE_PREWARM", None)
+    completed = subprocess.run([sys.executable, "-c", _PROBE.format(setup=setup, body=body, heavy=HEAVY_MODULES)],
+                               cwd=cwd, env=env, capture_output=True, text=True)
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    error = (completed.stderr.strip().splitlines() or ["no output"])[-1]
+    return {"error": error}
+
+
+def measure(body: str, repeats: int, setup: str = "") -> Dict[str, Any]:
+    """Median seconds over fresh interpreters, each with an empty data directory"""
+    runs = []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory() as cwd:
+            result = _probe(setup, body, cwd)
+        if "error" in result:
+            return result
+        runs.append(result)
+    return {"seconds": round(statistics.median(run["seconds"] for run in runs), 4), "heavy": runs[-1]["heavy"]}
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {"imports": {}, "pages": {}}
+
+    print("Import time (fresh interpreter)")
+    for module in MODULES:
+        result = results["imports"][module] = measure(_IMPORT_BODY.format(module=module), args.repeats)
+        _report(module, result)
+
+    print("\nTime to first render (bare mode, empty library; excludes importing streamlit)")
+    for page in PAGES:
+        result = results["pages"][page] = measure(_PAGE_BODY.format(path=os.path.join(ROOT, page)), args.repeats,
+                                                       setup=_PAGE_SETUP)
+        _report(page, result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def _report(name: str, result: Dict[str, Any]) -> None:
+    if "error" in result:
+        print(f"  {name:<44} failed: {result['error']}")
+    else:
+        heavy = ", ".join(result["heavy"]) or "-"
+        print(f"  {name:<44} {result['seconds'] * 1000:9.1f} ms   heavy imports: {heavy}")
+
+
+if __name__ == "__main__":
+    main()
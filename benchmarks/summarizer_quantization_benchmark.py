@@ -0,0 +1,115 @@
+"""
+Quality/latency comparison of the fp32 and int8-quantized CPU summarizers.
+
+Summarizes a fixed legal corpus with both modes and reports ROUGE-1/2/L
+of the int8 output against the fp32 output, plus generated tokens/sec.
+
+Usage:
+    python -m benchmarks.summarizer_quantization_benchmark --threads 4
+"""
+import argparse
+import time
+from collections import Counter
+from typing import List, Tuple
+
+from backend.processors.summarizer import Summarizer
+
+# Fixed corpus so runs are comparable across machines and commits
+LEGAL_CORPUS = [
+    "This Services Agreement is entered into by and between Acme Corporation, a Delaware corporation "
+    "(the \"Company\"), and Beta Consulting LLC (the \"Consultant\"). The Consultant shall provide the "
+    "services described in Exhibit A in a professional and workmanlike manner. The Company shall pay the "
+    "Consultant a monthly fee of $25,000 within thirty days of receipt of an undisputed invoice. Either party "
+    "may terminate this Agreement upon sixty days' written notice, or immediately upon a material breach "
+    "that remains uncured for fifteen days after notice. Upon termination, the Consultant shall return all "
+    "Confidential Information and the Company shall pay all fees accrued through the termination date.",
+
+    "The Receiving Party shall hold the Disclosing Party's Confidential Information in strict confidence and "
+    "shall not disclose it to any third party except to its employees and advisors who have a need to know "
+    "and are bound by obligations of confidentiality no less restrictive than those set forth herein. "
+    "Confidential Information does not include information that is or becomes publicly available through no "
+    "fault of the Receiving Party, was known to the Receiving Party before disclosure, or is independently "
+    "developed. The obligations in this Section survive for five years after expiration of this Agreement.",
+
+    "Plaintiff John Smith brings this action against Defendant Global Logistics Inc. for breach of contract "
+    "and violation of 42 U.S.C. § 1983. Plaintiff alleges that Defendant failed to deliver goods valued at "
+    "$1,200,000 by the agreed date of March 1, 2023, and that Defendant's agents unlawfully detained "
+    "Plaintiff's property. This Court has jurisdiction under 28 U.S.C. § 1331. Plaintiff seeks compensatory "
+    "damages, punitive damages, reasonable attorneys' fees, and such other relief as the Court deems just.",
+
+    "Each party shall indemnify, defend and hold harmless the other party and its officers, directors and "
+    "employees from and against any and all losses, damages, liabilities and expenses, including reasonable "
+    "attorneys' fees, arising out of any third-party claim resulting from the indemnifying party's gross "
+    "negligence, willful misconduct or breach of its representations and warranties. In no event shall either "
+    "party be liable for indirect, incidental or consequential damages, and each party's aggregate liability "
+    "shall not exceed the fees paid in the twelve months preceding the claim.",
+]
+
+
+def _ngrams(tokens: List[str], n: int) -> Counter:
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def _f1(overlap: int, candidate_total: int, reference_total: int) -> float:
+    if not overlap:
+        return 0.0
+    precision = overlap / candidate_total
+    recall = overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(candidate: str, reference: str, n: int) -> float:
+    """ROUGE-N F1 between two texts"""
+    cand = _ngrams(candidate.lower().split(), n)
+    ref = _ngrams(reference.lower().split(), n)
+    return _f1(sum((cand & ref).values()), sum(cand.values()), sum(ref.values()))
+
+
+def rouge_l(candidate: str, reference: str) -> float:
+    """ROUGE-L F1 (longest common subsequence) between two texts"""
+    cand = candidate.lower().split()
+    ref = reference.lower().split()
+    previous = [0] * (len(ref) + 1)
+    for token in cand:
+        current = [0]
+        for j, ref_token in enumerate(ref):
+            current.append(previous[j] + 1 if token == ref_token else max(previous[j + 1], current[j]))
+        previous = current
+    return _f1(previous[-1], len(cand), len(ref))
+
+
+def run_mode(summarizer: Summarizer) -> Tuple[List[str], float, int]:
+    """Summarize the corpus, returning summaries, elapsed seconds and generated tokens"""
+    summaries = []
+    tokens = 0
+    started = time.perf_counter()
+    for text in LEGAL_CORPUS:
+        summary = summarizer.generate_summary(text)
+        summaries.append(summary)
+        tokens += len(summarizer.tokenizer(summary).input_ids)
+    return summaries, time.perf_counter() - started, tokens
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in Summarizer.MODES:
+        summarizer = Summarizer(mode=mode, num_threads=args.threads)
+        # Warm up so one-time initialization isn't counted
+        summarizer.generate_summary(LEGAL_CORPUS[0])
+        results[mode] = run_mode(summarizer)
+
+    reference, _, _ = results["fp32"]
+    for mode, (summaries, seconds, tokens) in results.items():
+        r1 = sum(rouge_n(c, r, 1) for c, r in zip(summaries, reference)) / len(reference)
+        r2 = sum(rouge_n(c, r, 2) for c, r in zip(summaries, reference)) / len(reference)
+        rl = sum(rouge_l(c, r) for c, r in zip(summaries, reference)) / len(reference)
+        print(f"{mode:<9} {seconds:7.2f}s  {tokens / seconds:7.1f} tokens/s  "
+              f"ROUGE-1 {r1:.3f}  ROUGE-2 {r2:.3f}  ROUGE-L {rl:.3f}  (vs fp32)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Throughput and per-worker memory of the pre-fork analysis pool.
+
+Analyzes a synthetic corpus with pools of different sizes and reports
+documents per second, the unique memory (USS) each worker adds on top
+of the shared models, and how many such workers fit in a node's memory.
+
+Usage:
+    python -m benchmarks.worker_pool_benchmark --workers 1 2 4 --documents 16
+    python -m benchmarks.worker_pool_benchmark --workers 4 --threads 1 --node-memory-gb 16
+"""
+import argparse
+import time
+
+from benchmarks.corpus import generate_corpus
+from backend.processors.worker_pool import AnalysisWorkerPool
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, help="torch threads per worker (default: CPUs / workers)")
+    parser.add_argument("--documents", type=int, default=16)
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--time-budget", type=float, help="Seconds per document summary")
+    parser.add_argument("--node-memory-gb", type=float, default=16.0)
+    args = parser.parse_args()
+
+    documents = [(doc["id"], doc["content"]) for doc in generate_corpus(args.documents, sections=args.sections)]
+
+    print(f"{'workers':>7} {'threads':>7} {'docs/s':>8} {'parent rss':>11} {'worker uss':>11} "
+          f"{'total pss':>10} {'fit':>5}")
+    for workers in args.workers:
+        with AnalysisWorkerPool(workers, args.threads) as pool:
+            started = time.perf_counter()
+            for _ in pool.analyze_many(documents, ordered=False, time_budget=args.time_budget):
+                pass
+            elapsed = time.perf_counter() - started
+
+            # Measured after the run, when each worker holds its parses and activations
+            report = pool.memory_report()
+            fit = pool.workers_that_fit(args.node_memory_gb * 1024)
+            print(f"{workers:>7} {pool.threads_per_worker:>7} {len(documents) / elapsed:>8.2f} "
+                  f"{report['parent'].get('rss_mb', 0):>8.0f} MB {report['max_worker_uss_mb']:>8.0f} MB "
+                  f"{report['total_pss_mb']:>7.0f} MB {fit:>5}")
+
+
+if __name__ == "__main__":
+    main()
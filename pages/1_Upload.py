@@ -4,6 +4,7 @@ import os
 import uuid
 from backend.processors.document_processor import DocumentProcessor
 from backend.database.db_handler import db_handler
+from backend.database.dedup_index import minhash_signature
 
 # Set page configuration
 st.set_page_config(
@@ -32,6 +33,12 @@ if uploaded_file is not None:
     
     st.write("File Details:", file_details)
     
+    # A new version of an existing document is linked to it, so only changed sections are re-analyzed
+    revision_options = {"": "None (new document)"}
+    for doc in db_handler.list_documents():
+        revision_options[doc["id"]] = f"{doc['filename']} (version {doc.get('version', 1)}, uploaded {doc.get('upload_date', '')[:10]})"
+    parent_id = st.selectbox("Revision of", options=list(revision_options), format_func=revision_options.get)
+    
     # Process document button
     if st.button("Process Document"):
         with st.spinner("Processing document..."):
@@ -46,6 +53,10 @@ if uploaded_file is not None:
                 # Preprocess text
                 document_text = document_processor.preprocess_text(document_text)
                 
+                # Flag copies of documents that are already stored; the signature is indexed on save
+                signature = minhash_signature(document_text)
+                duplicates = db_handler.find_duplicates(document_text, limit=1, signature=signature)
+                
                 # Save document to database
                 doc_info = {
                     "id": document_id,
@@ -53,11 +64,27 @@ if uploaded_file is not None:
                     "content": document_text,
                     "upload_date": db_handler.get_current_time()
                 }
-                db_handler.save_document(doc_info)
+                if parent_id:
+                    doc_info["parent_id"] = parent_id
+                if duplicates:
+                    # Its analysis can reuse the duplicate's results for unchanged sections
+                    doc_info["duplicate_of"] = duplicates[0]["document_id"]
+                    doc_info["duplicate_similarity"] = duplicates[0]["similarity"]
+                db_handler.save_document(doc_info, signature=signature)
                 
                 # Success message
                 st.success(f"Document processed successfully!")
                 
+                if duplicates:
+                    duplicate = db_handler.get_document(duplicates[0]["document_id"], include_content=False)
+                    duplicate_name = duplicate["filename"] if duplicate else duplicates[0]["document_id"]
+                    if duplicates[0]["exact"]:
+                        st.warning(f"This document is an exact duplicate of **{duplicate_name}**.")
+                    else:
+                        st.warning(f"This document is a near duplicate ({duplicates[0]['similarity']:.0%} similar) "
+                                   f"of **{duplicate_name}**.")
+                    st.markdown(f"[View {duplicate_name}](/Document_View?doc_id={duplicates[0]['document_id']})")
+                
                 # Create columns for buttons
                 col1, col2 = st.columns(2)
                 
@@ -75,6 +102,9 @@ if uploaded_file is not None:
                     st.text_area("Document content", document_text[:5000] + ("..." if len(document_text) > 5000 else ""), 
                                 height=300)
                 
+            except ValueError as e:
+                # e.g. the selected earlier version was deleted meanwhile; no traceback needed
+                st.error(f"Error processing document: {str(e)}")
             except Exception as e:
                 st.error(f"Error processing document: {str(e)}")
                 st.exception(e)
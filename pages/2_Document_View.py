@@ -2,9 +2,15 @@ import streamlit as st
 import pandas as pd
 import time
 from backend.database.db_handler import db_handler
-from backend.processors.summarizer import Summarizer
-from backend.processors.entity_extractor import EntityExtractor
-from backend.processors.clause_identifier import ClauseIdentifier
+from backend.database.document_search import document_searcher
+# Processors are shared across sessions and built on first use, so browsing
+# the library or reading a document never waits for models to load
+from backend.processors import (get_summarizer, get_extractive_summarizer, get_entity_extractor,
+                                get_clause_identifier, get_incremental_analyzer, index_key_clauses, start_prewarm)
+from backend.processors.instrumentation import record_stages, start_metrics_server
+
+# The quick preview summarizes at most this much of the start of a document
+PREVIEW_CHARS = 2_000_000
 
 # Set page configuration
 st.set_page_config(
@@ -13,10 +19,11 @@ st.set_page_config(
     layout="wide",
 )
 
-# Initialize processors
-summarizer = Summarizer()
-entity_extractor = EntityExtractor()
-clause_identifier = ClauseIdentifier()
+# Prometheus endpoint, if LEGALEASE_METRICS_PORT is set
+start_metrics_server()
+
+# Load models in the background, if LEGALEASE_PREWARM=1
+start_prewarm()
 
 # Initialize session state if not exists
 if 'analysis_complete' not in st.session_state:
@@ -64,9 +71,48 @@ if doc_id is None:
         if selected_doc_id:
             # Use markdown link for compatibility
             st.markdown(f"[View Document](/Document_View?doc_id={selected_doc_id})")
+
+        # Full-text search across all documents
+        st.subheader("Search All Documents")
+        corpus_query = st.text_input("Search terms", help='Use "quotes" for phrases and a trailing * for prefixes, e.g. "liquidated damages" indemn*')
+
+        if corpus_query:
+            results = db_handler.search_documents(corpus_query, limit=20)
+
+            if results:
+                st.success(f"Found {len(results)} matching documents")
+                for result in results:
+                    st.markdown(f"**[{result['filename']}](/Document_View?doc_id={result['document_id']})** "
+                                f"({result['matches']} matches)")
+                    if result.get('snippet'):
+                        snippet = result['snippet']
+                        start, end = result['highlights'][0]
+                        st.markdown(f"...{snippet[:start]}**{snippet[start:end]}**{snippet[end:]}...")
+            else:
+                st.info("No documents match your search")
+        
+        # Entity lookup across all analyzed documents
+        st.subheader("Find Documents by Entity")
+        entity_col1, entity_col2 = st.columns([3, 1])
+        with entity_col1:
+            entity_query = st.text_input("Party, court or citation", help='e.g. Acme Corp or 42 U.S.C. § 1983')
+        with entity_col2:
+            entity_label = st.selectbox("Entity type", ["All Types", "ORG", "PERSON", "PARTY", "COURT", "GPE",
+                                                        "CASE_CITATION", "STATUTE_CITATION", "REGULATION_CITATION"])
+        
+        if entity_query:
+            matches = db_handler.find_documents_by_entity(entity_query,
+                                                          label=None if entity_label == "All Types" else entity_label)
+            if matches:
+                st.success(f"Found {len(matches)} documents mentioning {entity_query}")
+                for match in matches:
+                    st.markdown(f"**[{match['filename'] or match['document_id']}](/Document_View?doc_id={match['document_id']})** "
+                                f"({match['count']} mentions as {', '.join(match['labels'])})")
+            else:
+                st.info("No analyzed documents mention this entity")
 else:
-    # Get document from database
-    document = db_handler.get_document(doc_id)
+    # Get document metadata from database; content is read on demand
+    document = db_handler.get_document(doc_id, include_content=False)
     
     if document is None:
         st.error(f"Document with ID {doc_id} not found")
@@ -75,6 +121,13 @@ else:
         # Document found, display it
         st.title(f"📄 {document['filename']}")
         
+        # Version history of revised documents
+        revisions = db_handler.get_revisions(doc_id)
+        if len(revisions) > 1:
+            st.caption("Versions: " + " · ".join(
+                f"**v{rev.get('version', 1)}**" if rev["id"] == doc_id else f"[v{rev.get('version', 1)}](/Document_View?doc_id={rev['id']})"
+                for rev in revisions))
+        
         # Check if analysis exists for this document
         analysis = db_handler.get_analysis(doc_id)
         
@@ -84,38 +137,122 @@ else:
             analysis = db_handler.get_analysis(doc_id)  # Refresh analysis
             st.session_state.analysis_complete = False
         
+        # Summary options: a deadline (traded against model size and beams) and focus areas
+        time_budget = None
+        focus_areas = None
+        profile_analysis = False
+        if analysis is None:
+            time_budget = st.number_input("Summary time budget (seconds, 0 = unlimited)",
+                                          min_value=0, value=0, step=5) or None
+            focus_input = st.text_input("Focus areas (comma-separated, optional)",
+                                        placeholder="e.g. termination, indemnification")
+            focus_areas = [area.strip() for area in focus_input.split(",") if area.strip()] or None
+            
+            # Chunk summaries saved by an interrupted run are reused on the next run
+            partial_summary = db_handler.get_partial_summary(doc_id)
+            if partial_summary:
+                st.info(f"A previous summarization was interrupted after {len(partial_summary)} section(s). "
+                        "Analyzing again will resume where it stopped.")
+            
+            profile_analysis = st.checkbox("Profile this analysis (cProfile)",
+                                           help="Writes Python profiler statistics to data/profiles")
+        
         # If analysis button was clicked or analyze parameter is true, run analysis
         if analysis is None and (st.button("🔍 Analyze Document") or analyze):
+            # Show a quick extractive preview while the full analysis runs
+            st.subheader("Quick Preview")
+            st.write(get_extractive_summarizer().generate_summary(db_handler.read_span(doc_id, 0, PREVIEW_CHARS),
+                                                           max_length=150, focus_areas=focus_areas))
+            
             with st.spinner("Analyzing document..."):
-                # Get document text
-                document_text = document['content']
-                
-                # Identify document type
-                from backend.processors.document_processor import DocumentProcessor
-                document_processor = DocumentProcessor()
-                document_type = document_processor.identify_document_type(document_text)
-                
-                # Generate summary
-                summary = summarizer.generate_summary(document_text)
-                
-                # Extract entities
-                entities = entity_extractor.extract_entities(document_text)
-                
-                # Identify key clauses
-                key_clauses = clause_identifier.identify_key_clauses(document_text, document_type)
+                def run_analysis():
+                    # Very large filings are read and analyzed a section at a time, within $LEGALEASE_MEMORY_BUDGET_MB
+                    from backend.processors.bounded_analysis import BoundedAnalyzer
+                    content_length = document.get("content_length")
+                    if content_length is None:
+                        content_length = len(db_handler.read_span(doc_id))
+                    if BoundedAnalyzer.should_use(content_length):
+                        return BoundedAnalyzer().analyze(content_length,
+                                                         lambda start, end: db_handler.read_span(doc_id, start, end),
+                                                         document_id=doc_id, focus_areas=focus_areas)
+                    
+                    # Get document text
+                    document_text = db_handler.read_span(doc_id)
+                    
+                    # A revision or near duplicate of an analyzed document only re-analyzes the sections that differ
+                    parent_id = document.get("parent_id")
+                    base_id = parent_id or document.get("duplicate_of")
+                    base_analysis = db_handler.get_analysis(base_id) if base_id else None
+                    if base_analysis is not None and not focus_areas:
+                        revision_analysis = get_incremental_analyzer().analyze(document_text, db_handler.read_span(base_id),
+                                                                               base_analysis)
+                        revision_analysis["document_id"] = doc_id
+                        # A near duplicate only lends its results; it doesn't join this document's revision chain
+                        revision_analysis["revision"]["parent_id" if parent_id else "duplicate_of"] = base_id
+                        return revision_analysis
+                    
+                    # Identify document type
+                    from backend.processors.document_processor import DocumentProcessor
+                    document_processor = DocumentProcessor()
+                    document_type = document_processor.identify_document_type(document_text)
+                    
+                    # Generate summary, showing each chunk summary as it is produced
+                    summarizer = get_summarizer()
+                    st.subheader("Summary (in progress)")
+                    progress_bar = st.progress(0.0)
+                    summary_placeholder = st.empty()
+                    
+                    completed = db_handler.get_partial_summary(doc_id)
+                    chunk_summaries = []
+                    summary_chunks = []
+                    summary_settings = {}
+                    for part in summarizer.iter_summary(document_text, focus_areas=focus_areas,
+                                                        time_budget=time_budget, completed=completed):
+                        # The run's settings come last, after every chunk summary
+                        if "settings" in part:
+                            summary_settings = part["settings"]
+                            continue
+                        
+                        chunk_summaries.append(part["summary"])
+                        summary_chunks.append({"start": part["start"], "end": part["end"], "summary": part["summary"]})
+                        summary_placeholder.write(" ".join(chunk_summaries))
+                        progress_bar.progress(part["progress"], text=f"Summarized {part['index'] + 1} of {part['total']} sections")
+                        
+                        # Persist progress so a reload resumes instead of restarting
+                        if not part["resumed"]:
+                            completed[part["key"]] = part["summary"]
+                            db_handler.save_partial_summary(doc_id, completed)
+                    
+                    summary = summarizer.combine_summaries(chunk_summaries, focus_areas)
+                    
+                    # Extract entities
+                    entities = get_entity_extractor().extract_entities(document_text)
+                    
+                    # Identify key clauses
+                    key_clauses = get_clause_identifier().identify_key_clauses(document_text, document_type)
+                    
+                    return {
+                        "document_id": doc_id,
+                        "summary": summary,
+                        "summary_chunks": summary_chunks,
+                        "key_clauses": key_clauses,
+                        "entities": entities,
+                        "document_type": document_type,
+                        "summary_settings": summary_settings
+                    }
                 
-                # Save analysis
-                analysis_result = {
-                    "document_id": doc_id,
-                    "summary": summary,
-                    "key_clauses": key_clauses,
-                    "entities": entities,
-                    "document_type": document_type
-                }
-                db_handler.save_analysis(doc_id, analysis_result)
+                def analyze_and_index():
+                    # Time, CPU and memory of each stage are stored with the analysis
+                    with record_stages(profile=profile_analysis, profile_name=doc_id) as recorder:
+                        result = run_analysis()
+                        
+                        # Make the key clauses searchable across the corpus
+                        index_key_clauses(db_handler, doc_id, result["key_clauses"])
+                    result["metrics"] = recorder.summary()
+                    return result
                 
-                # Update analysis variable
-                analysis = analysis_result
+                # Compute and save the analysis; concurrent requests for this document share one run
+                analysis = db_handler.get_or_create_analysis(doc_id, analyze_and_index)
                 st.session_state.analysis_complete = True
                 
                 # Try to use rerun if available, otherwise use JavaScript
@@ -131,45 +268,110 @@ else:
                         unsafe_allow_html=True
                     )
         
-        # Create tabs for different views
-        doc_tab, summary_tab, clauses_tab, entities_tab = st.tabs(["Document", "Summary", "Key Clauses", "Entities"])
+        # Select a view; only the selected view runs, so analysis sections load on demand
+        view = st.radio("View", ["Document", "Summary", "Key Clauses", "Entities"], horizontal=True,
+                        label_visibility="collapsed")
         
-        # Document tab
-        with doc_tab:
+        # Document view
+        if view == "Document":
             # Add text search functionality
-            search_term = st.text_input("Search in document:")
+            search_col, mode_col = st.columns([3, 1])
+            with search_col:
+                search_term = st.text_input("Search in document:")
+            with mode_col:
+                search_mode = st.selectbox("Match", ["literal", "word", "regex"],
+                                           format_func=lambda m: {"literal": "Text", "word": "Whole words", "regex": "Regex"}[m])
             
             # Display document content
             if search_term:
-                import re
-                # Highlight search terms
-                content = document['content']
-                matches = list(re.finditer(search_term, content, re.IGNORECASE))
+                # Start from the first page whenever the query changes
+                if st.session_state.get("search_key") != (doc_id, search_term, search_mode):
+                    st.session_state.search_key = (doc_id, search_term, search_mode)
+                    st.session_state.search_page = 1
+                search_page = st.session_state.search_page
+                try:
+                    results = document_searcher.search(
+                        doc_id, search_term,
+                        load_content=lambda: db_handler.read_span(doc_id),
+                        version=(document.get('upload_date'), document.get('content_length')),
+                        mode=search_mode,
+                        page=search_page,
+                    )
+                except (ValueError, TimeoutError) as e:
+                    st.error(str(e))
+                    results = None
                 
-                if matches:
-                    st.success(f"Found {len(matches)} matches")
-                    # Show context around first few matches
-                    for i, match in enumerate(matches[:5]):
-                        start = max(0, match.start() - 100)
-                        end = min(len(content), match.end() + 100)
-                        context = content[start:end]
-                        highlighted = context.replace(match.group(), f"**{match.group()}**")
-                        st.markdown(f"Match {i+1}: ...{highlighted}...")
-                else:
+                if results and results['total']:
+                    more = "+" if results['truncated'] else ""
+                    st.success(f"Found {results['total']}{more} matches")
+                    if results['page_count'] > 1:
+                        st.number_input("Results page", min_value=1, max_value=results['page_count'],
+                                        step=1, key="search_page")
+                    # Show context around each match on this page, highlighting the exact span
+                    for match in results['matches']:
+                        st.markdown(f"Match {match['number']}: ...{match['before']}**{match['text']}**{match['after']}...")
+                elif results is not None:
                     st.info("No matches found")
             
-            # Always show document content
+            # Always show document content, one page at a time
             with st.expander("Full Document", expanded=not search_term):
-                st.text_area("Document Content", document['content'], height=500)
+                page_chars = 20000
+                content_length = document.get('content_length')
+                if content_length is None:
+                    content_length = len(db_handler.read_span(doc_id))
+                page_count = max(1, -(-content_length // page_chars))
+                doc_page = 1
+                if page_count > 1:
+                    doc_page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1)
+                start = (doc_page - 1) * page_chars
+                st.text_area("Document Content", db_handler.read_span(doc_id, start, start + page_chars), height=500)
         
-        # Summary tab
-        with summary_tab:
+        # Summary view
+        if view == "Summary":
             if analysis:
                 st.subheader("Document Summary")
                 st.write(analysis['summary'])
                 
                 st.subheader("Document Type")
                 st.info(analysis['document_type'].replace('_', ' ').title())
+                
+                settings = analysis.get('summary_settings')
+                if settings:
+                    coverage = f", {int(settings['coverage']*100)}% of chunks abstractive" if settings['chunks_total'] else ""
+                    beams = f", {settings['num_beams']} beams" if settings['num_beams'] else ""
+                    st.caption(f"Summarized with {settings['backend']}{beams}{coverage} "
+                               f"in {settings['elapsed_seconds']:.1f}s")
+                
+                revision = analysis.get('revision')
+                if revision:
+                    st.caption(f"Incremental analysis: {revision['sections_changed']} of {revision['sections_total']} "
+                               f"sections differ from the version it was based on; reused {revision['entities_reused']} entities, "
+                               f"{revision['clauses_reused']} clauses and {revision['summary_chunks_reused']} summary chunks")
+                
+                memory = analysis.get('memory')
+                if memory:
+                    budget = f" within a {memory['budget_mb']:.0f} MB budget" if memory['budget_mb'] else ""
+                    st.caption(f"Large document: analyzed in {memory['sections']} sections{budget} "
+                               f"(peak {memory['peak_rss_mb']:.0f} MB)")
+                
+                metrics = analysis.get('metrics')
+                if metrics:
+                    # Analyses stored before the rename have peak_rss_mb
+                    process_peak = metrics.get('process_peak_rss_mb', metrics.get('peak_rss_mb', 0))
+                    with st.expander(f"Analysis performance ({metrics['wall_seconds']:.1f}s, "
+                                     f"process peak {process_peak:.0f} MB)"):
+                        st.dataframe(pd.DataFrame([
+                            {
+                                "Stage": "  " * stage.get("depth", 0) + stage["stage"],
+                                "Wall (s)": stage["wall_seconds"],
+                                "CPU (s)": stage["cpu_seconds"],
+                                "RSS change (MB)": stage["rss_delta_mb"],
+                                "Input size": stage["input_size"],
+                                "Items": stage["items"],
+                            } for stage in metrics['stages']
+                        ]))
+                        if metrics.get('profile'):
+                            st.caption(f"Profile written to {metrics['profile']}")
             else:
                 st.info("Please analyze the document to view the summary")
                 if st.button("Generate Summary"):
@@ -185,8 +387,8 @@ else:
                         unsafe_allow_html=True
                     )
         
-        # Key clauses tab
-        with clauses_tab:
+        # Key clauses view
+        if view == "Key Clauses":
             if analysis:
                 st.subheader("Key Clauses")
                 
@@ -196,39 +398,36 @@ else:
                         st.write(f"**Importance:** {int(clause['importance']*100)}%")
                         st.write(f"**Type:** {clause['type'].replace('_', ' ').title()}")
                         st.write(clause['text'])
+                        
+                        # Similar clauses in other documents
+                        if st.button("Find similar clauses", key=f"similar_{i}"):
+                            similar = db_handler.find_similar_clauses(get_clause_identifier().embed_text(clause['text']),
+                                                                      limit=5, exclude=doc_id)
+                            if similar:
+                                for match in similar:
+                                    st.markdown(f"**[{match['filename'] or match['document_id']}](/Document_View?doc_id={match['document_id']})** "
+                                                f"· {match['title']} ({int(match['similarity']*100)}% similar)")
+                                    st.caption(match['text'][:300] + ("..." if len(match['text']) > 300 else ""))
+                            else:
+                                st.info("No similar clauses in other documents")
             else:
                 st.info("Please analyze the document to view key clauses")
         
-        # Entities tab
-        with entities_tab:
+        # Entities view
+        if view == "Entities":
             if analysis:
                 st.subheader("Legal Entities")
                 
+                # Distinct entities with counts, precomputed by the entity index
+                entity_counts = db_handler.get_entity_counts(doc_id)
+                
                 # Filter entities by type
-                entity_types = set(e['label'] for e in analysis['entities'])
+                entity_types = set(e['label'] for e in entity_counts)
                 selected_type = st.selectbox("Filter by entity type:", ["All Types"] + sorted(list(entity_types)))
                 
-                # Create dataframe for entities
-                filtered_entities = [e for e in analysis['entities'] 
+                grouped_entities = [e for e in entity_counts
                                     if selected_type == "All Types" or e['label'] == selected_type]
                 
-                # Group similar entities
-                entity_groups = {}
-                for e in filtered_entities:
-                    key = (e['text'], e['label'])
-                    if key in entity_groups:
-                        entity_groups[key]['count'] += 1
-                    else:
-                        entity_groups[key] = {
-                            'text': e['text'],
-                            'label': e['label'],
-                            'definition': e.get('definition', ''),
-                            'count': 1
-                        }
-                
-                # Convert to list
-                grouped_entities = list(entity_groups.values())
-                
                 # Create dataframe
                 if grouped_entities:
                     df = pd.DataFrame(grouped_entities)
@@ -0,0 +1,64 @@
+import os
+import functools
+
+import pytest
+import spacy
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-slow", action="store_true", help="Also run tests marked slow (minutes each)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long-running test, skipped unless --run-slow is given")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip = pytest.mark.skip(reason="slow; run with --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
+
+
+@functools.lru_cache(maxsize=None)
+def _blank_pipeline():
+    """Small English pipeline with the legal components, so tests don't need en_core_web_lg"""
+    from backend.processors.nlp import LEGAL_ENTITY_PATTERNS, add_legal_rules
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    # Without a tagger, patterns on part of speech can't match
+    nlp.add_pipe("entity_ruler").add_patterns([pattern for pattern in LEGAL_ENTITY_PATTERNS
+                                               if not any("POS" in token for token in pattern["pattern"])])
+    add_legal_rules(nlp)
+    return nlp
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """
+    Run each test in its own directory, since stores and caches default to ./data
+
+    Modules that create a store when imported (doc_cache, db_handler) are
+    therefore imported inside the tests.
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def nlp(monkeypatch, data_dir):
+    """Route every processor to the blank pipeline, with fresh shared instances and parse cache"""
+    import backend.processors as processors
+    from backend.processors import nlp as nlp_module, doc_cache, clause_identifier, entity_extractor, summarizer
+
+    for module in (nlp_module, doc_cache, clause_identifier, entity_extractor, summarizer):
+        monkeypatch.setattr(module, "load_pipeline", _blank_pipeline)
+    monkeypatch.setattr(doc_cache.parsed_doc_cache, "_nlp", _blank_pipeline())
+    monkeypatch.setattr(doc_cache.parsed_doc_cache, "directory", str(data_dir / "parsed"))
+    os.makedirs(doc_cache.parsed_doc_cache.directory)
+    doc_cache.parsed_doc_cache.clear_memory()
+    monkeypatch.setattr(processors, "_instances", {})
+    return _blank_pipeline()
@@ -0,0 +1,97 @@
+import threading
+
+import pytest
+import spacy
+
+# Memory allowed on top of the loaded pipeline, as in benchmarks/memory_budget_benchmark.py
+HEADROOM_MB = 512
+
+
+def _text(length: int) -> str:
+    sentence = "The Tenant shall pay the rent of $1,200 on the first day of each month. "
+    return (sentence * (length // len(sentence) + 1))[:length]
+
+
+def test_threshold_is_spacy_max_length():
+    from backend.processors.bounded_analysis import LARGE_DOCUMENT_CHARS
+
+    assert LARGE_DOCUMENT_CHARS == spacy.blank("en").max_length
+
+
+def test_should_use_at_boundary():
+    from backend.processors.bounded_analysis import BoundedAnalyzer, LARGE_DOCUMENT_CHARS
+
+    assert not BoundedAnalyzer.should_use(LARGE_DOCUMENT_CHARS)
+    assert BoundedAnalyzer.should_use(LARGE_DOCUMENT_CHARS + 1)
+    assert not BoundedAnalyzer.should_use(None)
+
+
+def test_full_parse_at_boundary(nlp):
+    from backend.processors.bounded_analysis import LARGE_DOCUMENT_CHARS
+    from backend.processors.doc_cache import parsed_doc_cache
+
+    # The longest document routed to a full analysis still parses in one go
+    doc = parsed_doc_cache.get_doc(_text(LARGE_DOCUMENT_CHARS))
+    assert len(doc.text) == LARGE_DOCUMENT_CHARS
+
+
+def test_bounded_analysis_past_boundary(nlp, tmp_path):
+    from backend.processors.bounded_analysis import BoundedAnalyzer, LARGE_DOCUMENT_CHARS
+
+    text = _text(LARGE_DOCUMENT_CHARS + 1)
+    analysis = BoundedAnalyzer(spill_dir=str(tmp_path)).analyze(len(text), lambda start, end: text[start:end])
+
+    assert analysis["memory"]["sections"] > 1
+    money = [entity for entity in analysis["entities"] if entity["label"] == "MONEY"]
+    assert money
+    assert all(text[entity["start_char"]:entity["end_char"]] == entity["text"] for entity in money)
+
+
+class _RssSampler:
+    """Largest resident memory seen by a background thread sampling every few milliseconds"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        from backend.processors.instrumentation import current_rss
+
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+@pytest.mark.parametrize("size_mb", [pytest.param(2, id="2MB"),
+                                     pytest.param(100, id="100MB", marks=pytest.mark.slow)])
+def test_peak_memory_within_budget(nlp, tmp_path, size_mb):
+    from benchmarks.memory_budget_benchmark import generate_document
+    from backend.database.content_store import ContentStore
+    from backend.processors.bounded_analysis import BoundedAnalyzer
+    from backend.processors.instrumentation import current_rss
+
+    # The document is streamed into the store, so the test never holds it whole either
+    store = ContentStore(str(tmp_path / "content"))
+    length = store.write_stream("large", generate_document(int(size_mb * 1e6)))
+
+    analyzer = BoundedAnalyzer(spill_dir=str(tmp_path / "spill"))
+    analyzer.memory_budget_mb = current_rss() / 2**20 + HEADROOM_MB
+
+    with _RssSampler() as sampler:
+        analysis = analyzer.analyze(length, lambda start, end: store.read_span("large", start, end),
+                                    document_id="large")
+
+    assert analysis["memory"]["within_budget"]
+    assert analysis["memory"]["peak_rss_mb"] <= analyzer.memory_budget_mb
+    assert sampler.peak / 2**20 <= analyzer.memory_budget_mb
+    assert analysis["memory"]["sections"] >= length // analyzer.section_chars
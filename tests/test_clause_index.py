@@ -0,0 +1,45 @@
+import sqlite3
+
+import numpy as np
+
+from backend.database.clause_index import ClauseIndex
+
+DIMENSIONS = 8
+
+
+def _clauses(count):
+    return [{"start_char": i * 10, "end_char": i * 10 + 5, "type": "payment", "title": f"Section {i}"}
+            for i in range(count)]
+
+
+def _vectors(seed, count):
+    return np.random.default_rng(seed).standard_normal((count, DIMENSIONS)).astype(np.float32)
+
+
+def test_interrupted_append_is_ignored_and_overwritten(tmp_path):
+    index = ClauseIndex(str(tmp_path), dimensions=DIMENSIONS)
+    index.add_document("a", _clauses(3), _vectors(0, 3))
+
+    # A writer that died after writing part of its vectors and none of its codes
+    with open(index.vectors_path, "ab") as f:
+        f.write(b"\x00" * (DIMENSIONS * 4 + 6))
+    assert index.stats()["rows"] == 3
+    assert index.search(_vectors(0, 3)[1])[0]["title"] == "Section 1"
+
+    vectors = _vectors(1, 2)
+    index.add_document("b", _clauses(2), vectors)
+    assert index.stats() == {"rows": 5, "clauses": 5, "tombstones": 0}
+    for row in range(2):
+        best = index.search(vectors[row], k=1)[0]
+        assert (best["document_id"], best["title"]) == ("b", f"Section {row}")
+        assert abs(best["similarity"] - 1.0) < 1e-5
+
+
+def test_row_count_of_index_without_state(tmp_path):
+    index = ClauseIndex(str(tmp_path), dimensions=DIMENSIONS)
+    index.add_document("a", _clauses(4), _vectors(0, 4))
+    with sqlite3.connect(index.db_path) as conn:
+        conn.execute("DROP TABLE state")
+
+    # Rows with metadata are the committed ones
+    assert ClauseIndex(str(tmp_path), dimensions=DIMENSIONS).stats()["rows"] == 4
@@ -0,0 +1,32 @@
+import random
+
+from backend.database.content_store import ContentStore
+
+
+def test_write_stream_matches_write(tmp_path):
+    store = ContentStore(str(tmp_path), frame_chars=64)
+    rng = random.Random(0)
+    text = "".join(rng.choice("abcdé §\n") for _ in range(5000))
+
+    # Pieces smaller than, equal to and much larger than a frame
+    pieces, position = [], 0
+    while position < len(text):
+        size = rng.choice([1, 7, 64, 200, 1500])
+        pieces.append(text[position:position + size])
+        position += size
+
+    assert store.write_stream("streamed", iter(pieces)) == len(text)
+    store.write("whole", text)
+    with open(store.path("streamed"), "rb") as a, open(store.path("whole"), "rb") as b:
+        assert a.read() == b.read()
+
+
+def test_read_span_slices_like_str(tmp_path):
+    store = ContentStore(str(tmp_path), frame_chars=16)
+    text = "".join(chr(ord("a") + i % 26) for i in range(100))
+    store.write("doc", text)
+
+    offsets = [None, -150, -100, -37, -1, 0, 1, 15, 16, 17, 63, 99, 100, 150]
+    for start in offsets:
+        for end in offsets:
+            assert store.read_span("doc", start or 0, end) == text[start:end], (start, end)
@@ -0,0 +1,15 @@
+import pytest
+
+
+def test_revision_of_missing_document_is_rejected():
+    from backend.database.db_handler import DatabaseHandler
+
+    db = DatabaseHandler("data")
+    with pytest.raises(ValueError, match="no longer exists"):
+        db.save_document({"id": "revision", "filename": "lease.txt", "content": "The Tenant shall pay rent.",
+                          "parent_id": "deleted"})
+
+    # Nothing was stored, and the document can be saved again
+    assert db.get_document("revision") is None
+    db.save_document({"id": "revision", "filename": "lease.txt", "content": "The Tenant shall pay rent."})
+    assert db.get_document("revision")["content"] == "The Tenant shall pay rent."
@@ -0,0 +1,37 @@
+def _contract(variant: str) -> str:
+    return " ".join(f"Section {i}. The Tenant shall pay {variant} rent for month {i} to the Landlord."
+                    for i in range(40))
+
+
+def test_upload_computes_the_signature_once(monkeypatch):
+    from backend.database import dedup_index
+    from backend.database.db_handler import DatabaseHandler
+
+    db = DatabaseHandler("data")
+    db.save_document({"id": "original", "filename": "lease.txt", "content": _contract("monthly")})
+
+    text = _contract("the monthly")
+    signature = dedup_index.minhash_signature(text)
+    calls = []
+    monkeypatch.setattr(dedup_index, "minhash_signature", lambda text: calls.append(text))
+
+    # As on the Upload page: check for duplicates, then save with the same signature
+    duplicates = db.find_duplicates(text, limit=1, signature=signature)
+    db.save_document({"id": "copy", "filename": "lease-2.txt", "content": text, "duplicate_of": "original"},
+                     signature=signature)
+
+    assert not calls
+    assert duplicates[0]["document_id"] == "original"
+    assert db.find_duplicates(text, exclude="original", signature=signature)[0]["document_id"] == "copy"
+
+
+def test_near_duplicate_is_not_a_revision():
+    from backend.database.db_handler import DatabaseHandler
+
+    db = DatabaseHandler("data")
+    db.save_document({"id": "original", "filename": "lease.txt", "content": _contract("monthly")})
+    db.save_document({"id": "copy", "filename": "lease-2.txt", "content": _contract("the monthly"),
+                      "duplicate_of": "original"})
+
+    assert [doc["id"] for doc in db.get_revisions("copy")] == ["copy"]
+    assert db.get_document("copy", include_content=False).get("parent_id") is None
@@ -0,0 +1,44 @@
+import pytest
+
+
+def test_regex_search_reuses_one_helper_process():
+    from backend.database.document_search import DocumentSearcher
+
+    searcher = DocumentSearcher(regex_timeout=30.0)
+    content = "Rent is $1,200. Deposit is $2,400."
+    result = searcher.search("doc", r"\$\d[\d,]*", lambda: content, mode="regex")
+    assert [match["text"] for match in result["matches"]] == ["$1,200", "$2,400"]
+
+    process = searcher._regex_helper._process
+    result = searcher.search("doc", r"deposit", lambda: content, mode="regex")
+    assert result["total"] == 1
+    assert searcher._regex_helper._process is process
+    assert process.is_alive()
+
+
+def test_regex_timeout_replaces_the_helper():
+    from backend.database.document_search import DocumentSearcher
+
+    searcher = DocumentSearcher(regex_timeout=30.0)
+    searcher.search("doc", "a", lambda: "a" * 30 + "b", mode="regex")
+
+    # Catastrophic backtracking never finishes
+    searcher.regex_timeout = 0.5
+    with pytest.raises(TimeoutError):
+        searcher.search("doc", r"(a+)+$", lambda: "a" * 30 + "b", mode="regex")
+
+    searcher.regex_timeout = 30.0
+    result = searcher.search("doc", r"a+b", lambda: "a" * 30 + "b", mode="regex")
+    assert result["total"] == 1
+
+
+def test_literal_search_stops_at_max_matches(monkeypatch):
+    from backend.database import document_search
+    from backend.database.document_search import DocumentSearcher
+
+    monkeypatch.setattr(document_search, "MAX_MATCHES", 5)
+    # "İ" lowers to two characters, so the search goes through re
+    content = "İ " + "ß " * 20
+    result = DocumentSearcher().search("doc", "ß", lambda: content)
+    assert result["total"] == 5
+    assert result["truncated"]
@@ -0,0 +1,44 @@
+def _document(sections):
+    return "\n\n".join(f"Section {number}. Payment\n{body}" for number, body in enumerate(sections, 1))
+
+
+def _analyzers():
+    from backend.processors.clause_identifier import ClauseIdentifier
+    from backend.processors.document_processor import DocumentProcessor
+    from backend.processors.entity_extractor import EntityExtractor
+    from backend.processors.incremental_analysis import IncrementalAnalyzer
+    from backend.processors.summarizer import Summarizer
+
+    clause_identifier = ClauseIdentifier()
+    incremental = IncrementalAnalyzer(Summarizer(backend="extractive", fallback_backends=()), EntityExtractor(),
+                                      clause_identifier)
+    return incremental, clause_identifier, DocumentProcessor()
+
+
+def test_edit_moves_clause_into_top_ten(nlp):
+    incremental, clause_identifier, document_processor = _analyzers()
+
+    # Ten sections score 0.7 (an amount and "shall"); two lower-ranked ones fall outside the top ten
+    important = "The Tenant shall make a payment of $500 to the Landlord each month."
+    sections = [important] * 10 + ["The Tenant shall and must make a payment on time.",
+                                   "The Tenant shall make a payment on time."]
+    previous_text = _document(sections)
+    document_type = document_processor.identify_document_type(previous_text)
+    previous_analysis = {
+        "document_type": document_type,
+        "entities": incremental.entity_extractor.extract_entities(previous_text),
+        "key_clauses": clause_identifier.identify_key_clauses(previous_text, document_type),
+    }
+    assert [clause["start_char"] for clause in previous_analysis["key_clauses"]] == [
+        previous_text.index(f"Section {number}.") for number in range(1, 11)]
+
+    # The edit drops section 3 below section 11, which was never a key clause before
+    sections[2] = "The payment is described in the schedule."
+    text = _document(sections)
+    analysis = incremental.analyze(text, previous_text, previous_analysis)
+
+    assert analysis["key_clauses"] == clause_identifier.identify_key_clauses(text, document_type)
+    starts = [clause["start_char"] for clause in analysis["key_clauses"]]
+    assert text.index("Section 11.") in starts
+    assert text.index("Section 3.") not in starts
+    assert analysis["revision"]["clauses_reused"] == 9
@@ -0,0 +1,71 @@
+import time
+
+
+def test_generator_stage_excludes_consumer_time():
+    from backend.processors.instrumentation import record_stages, stage
+
+    @stage("produce")
+    def produce():
+        for i in range(3):
+            time.sleep(0.01)
+            yield i
+
+    with record_stages() as recorder:
+        for _ in produce():
+            # Work of the consumer, e.g. rendering a chunk summary
+            time.sleep(0.1)
+
+    record, = recorder.stages
+    assert record["items"] == 3
+    assert 0.03 <= record["wall_seconds"] < 0.2
+
+
+def test_generator_stage_recorded_when_consumer_stops_early():
+    from backend.processors.instrumentation import record_stages, stage
+
+    closed = []
+
+    @stage("produce")
+    def produce():
+        try:
+            yield from range(10)
+        finally:
+            closed.append(True)
+
+    with record_stages() as recorder:
+        for i in produce():
+            if i == 1:
+                break
+
+    assert closed
+    assert recorder.stages[0]["items"] == 2
+
+
+def test_peak_memory_is_labelled_as_the_process_peak():
+    from backend.processors.instrumentation import record_stages, stage
+
+    @stage("work")
+    def work():
+        return []
+
+    with record_stages() as recorder:
+        work()
+
+    # getrusage only knows the peak over the whole life of the process
+    assert "process_peak_rss_mb" in recorder.stages[0]
+    assert "peak_rss_mb" not in recorder.stages[0]
+    assert "process_peak_rss_mb" in recorder.summary()
+
+
+def test_metrics_server_binds_to_localhost_by_default(monkeypatch):
+    from backend.processors import instrumentation
+
+    monkeypatch.setattr(instrumentation, "_server", None)
+    monkeypatch.delenv(instrumentation.METRICS_HOST_ENV, raising=False)
+    monkeypatch.setenv(instrumentation.METRICS_PORT_ENV, "0")
+    server = instrumentation.start_metrics_server()
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,41 @@
+import pytest
+
+from backend.processors.legal_rules import LEGAL_RULES_PATTERN, normalize_match
+
+
+def _money(text):
+    return [fields for label, fields in map(normalize_match, LEGAL_RULES_PATTERN.finditer(text)) if label == "MONEY"]
+
+
+@pytest.mark.parametrize("text", ["The parcel weighs 5 pounds.", "A 10 pound weight", "Lift 50 Pounds"])
+def test_pounds_without_currency_context_is_not_money(text):
+    assert _money(text) == []
+
+
+@pytest.mark.parametrize("text, amount", [
+    ("a fee of 5 pounds sterling", 5.0),
+    ("a fee of 1,250 Pounds Sterling", 1250.0),
+    ("a fee of £5", 5.0),
+    ("a fee of GBP 5m", 5e6),
+])
+def test_pounds_with_currency_context(text, amount):
+    assert [(fields["currency"], fields["amount"]) for fields in _money(text)] == [("GBP", amount)]
+
+
+@pytest.mark.parametrize("text, amount", [
+    ("USD 10m", 10e6),
+    ("$2.5m", 2.5e6),
+    ("$3bn", 3e9),
+    ("EUR 4 bn", 4e9),
+    ("$7mm", 7e6),
+    ("$6b", 6e9),
+    ("$5k", 5e3),
+    ("10m dollars", 10e6),
+    ("$5 million", 5e6),
+])
+def test_scale_suffixes(text, amount):
+    assert [fields["amount"] for fields in _money(text)] == [amount]
+
+
+def test_single_letter_scale_needs_no_space():
+    assert [fields["amount"] for fields in _money("advised on a USD 5 M&A deal")] == [5.0]
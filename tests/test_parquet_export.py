@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+
+def _analysis(document_type, clauses=0, entities=0):
+    return {
+        "summary": "Summary.",
+        "document_type": document_type,
+        "key_clauses": [{"title": f"Section {i}", "text": "", "type": "payment", "confidence": 0.5,
+                         "importance": 0.7, "start_char": i, "end_char": i + 1} for i in range(clauses)],
+        "entities": [{"text": "Acme", "label": "ORG", "start_char": i, "end_char": i + 4} for i in range(entities)],
+    }
+
+
+def test_reanalysis_supersedes_rows_in_every_table(data_dir):
+    from backend.database.db_handler import DatabaseHandler
+    from backend.database.parquet_export import ParquetExporter, read_table
+
+    db = DatabaseHandler(str(data_dir / "data"))
+    ids = [db.save_document({"id": name, "filename": f"{name}.txt", "content": f"Agreement {name}. " * 20,
+                             "upload_date": "2024-03-01T00:00:00"}) for name in ("a", "b")]
+    for document_id in ids:
+        db.save_analysis(document_id, _analysis("contract", clauses=2, entities=3))
+
+    exporter = ParquetExporter(db, str(data_dir / "exports"))
+    exporter.export()
+
+    # Re-classified, and now without clauses or entities: no new rows in those tables
+    time.sleep(0.05)
+    db.save_analysis(ids[0], _analysis("court_filing"))
+    assert exporter.export()["documents"] == 1
+
+    out = str(data_dir / "exports")
+    assert set(read_table(out, "clauses")["doc_id"]) == {ids[1]}
+    assert set(read_table(out, "entities")["doc_id"]) == {ids[1]}
+    assert len(read_table(out, "entities", latest_only=False)) == 6
+
+    contracts = read_table(out, "entities", filters=[("document_type", "==", "contract")], columns=["text"])
+    assert list(contracts.columns) == ["text"] and len(contracts) == 3
+    documents = read_table(out, "documents", filters=[("document_type", "==", "contract")])
+    assert list(documents["doc_id"]) == [ids[1]]
@@ -0,0 +1,19 @@
+import logging
+
+
+def test_failed_prewarm_step_is_logged(monkeypatch, caplog):
+    import backend.processors as processors
+
+    def broken():
+        raise OSError("model not found")
+
+    monkeypatch.setitem(processors.PREWARM_STEPS, "broken", broken)
+    monkeypatch.setitem(processors.PREWARM_STEPS, "working", lambda: None)
+
+    with caplog.at_level(logging.ERROR, logger="backend.processors"):
+        timings = processors.prewarm(["broken", "working"])
+
+    assert list(timings) == ["working"]
+    record, = caplog.records
+    assert record.getMessage() == "Prewarming broken failed"
+    assert "model not found" in caplog.text
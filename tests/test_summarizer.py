@@ -0,0 +1,35 @@
+def test_focused_summary_keeps_context(nlp):
+    from backend.processors.summarizer import Summarizer
+
+    summarizer = Summarizer(backend="extractive", fallback_backends=())
+    filler = " ".join(f"The parties met on day {i} to discuss the weather." for i in range(12))
+    text = (f"{filler} Either party may end this Agreement by termination notice. "
+            f"Notice must be given in writing. {filler}")
+
+    # The summary covers the matching sentence and its neighbours, not just the sentences naming the focus area
+    summary = summarizer.generate_summary(text, max_length=60, focus_areas=["termination"])
+    assert "termination notice" in summary
+    assert "in writing" in summary
+
+    # The run's settings are the last event, not state on the shared summarizer
+    *chunks, final = summarizer.iter_summary(text, max_length=60, focus_areas=["termination"])
+    assert all("summary" in chunk for chunk in chunks)
+    assert final["settings"]["sentences_summarized"] == 3
+    assert not hasattr(summarizer, "last_run")
+
+
+def _chunk_summary_tokens(summarizer, text, **options):
+    *_, final = summarizer.iter_summary(text, **options)
+    return final["settings"]["chunk_summary_tokens"]
+
+
+def test_chunk_summary_length_only_planned_under_a_budget(nlp):
+    from backend.processors.summarizer import Summarizer
+
+    summarizer = Summarizer(backend="extractive", fallback_backends=())
+    text = " ".join(f"The Landlord shall repair item {i} of the premises within thirty days of notice."
+                    for i in range(800))
+
+    # Without a budget every chunk keeps the fixed summary length
+    assert _chunk_summary_tokens(summarizer, text) == Summarizer.MAX_CHUNK_SUMMARY_TOKENS
+    assert _chunk_summary_tokens(summarizer, text, time_budget=60.0) < Summarizer.MAX_CHUNK_SUMMARY_TOKENS
@@ -0,0 +1,40 @@
+import pickle
+
+
+def _text(length: int) -> str:
+    sentence = "The Tenant shall pay the rent of $1,200 on the first day of each month. "
+    return (sentence * (length // len(sentence) + 1))[:length]
+
+
+def test_analyze_text_routes_large_documents_to_bounded_analysis(nlp):
+    from backend.processors.bounded_analysis import LARGE_DOCUMENT_CHARS
+    from backend.processors.worker_pool import analyze_text
+
+    # One character over spaCy's max_length; a single parse would raise E088
+    analysis = analyze_text(_text(LARGE_DOCUMENT_CHARS + 1), document_id="large")
+
+    assert analysis["document_id"] == "large"
+    assert analysis["memory"]["sections"] > 1
+    assert analysis["summary_settings"]["backend"] == "extractive"
+    assert any(entity["label"] == "MONEY" for entity in analysis["entities"])
+
+
+def test_worker_result_of_large_document_can_be_sent_to_parent(nlp):
+    from backend.processors.bounded_analysis import LARGE_DOCUMENT_CHARS
+    from backend.processors.worker_pool import _run_task
+
+    analysis = pickle.loads(pickle.dumps(_run_task(("large", _text(LARGE_DOCUMENT_CHARS + 1), {}))))
+
+    assert isinstance(analysis["entities"], list)
+    assert analysis["entities"]
+    assert analysis["metrics"]["worker"]["pid"]
+
+
+def test_only_the_workers_keep_objects_frozen(monkeypatch):
+    import gc
+    from backend.processors import worker_pool
+
+    monkeypatch.setattr(worker_pool, "prewarm", lambda steps: {})
+    with worker_pool.AnalysisWorkerPool(workers=1, threads_per_worker=1) as pool:
+        assert gc.get_freeze_count() == 0
+        assert pool._pool.apply(gc.get_freeze_count) > 0